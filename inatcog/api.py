@@ -1,12 +1,19 @@
 """Module to access iNaturalist API."""
+import asyncio
+from contextlib import aclosing
+from email.utils import parsedate_to_datetime
+from functools import partial
 from json import JSONDecodeError
 import logging
-from time import time
+import re
+from time import monotonic, time
 from types import SimpleNamespace
-from typing import List, Union
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Union
+from urllib.parse import urlsplit
 
 from aiohttp import (
     ClientConnectorError,
+    ClientResponse,
     ClientSession,
     ContentTypeError,
     ServerDisconnectedError,
@@ -14,10 +21,20 @@ from aiohttp import (
     TraceRequestStartParams,
 )
 from aiohttp_retry import RetryClient, ExponentialRetry
-from aiolimiter import AsyncLimiter
+from attrs import define
 from bs4 import BeautifulSoup
 import html2markdown
 
+from .breaker import BreakerState, CircuitBreaker
+from .budget import get_budget
+from .cache import TTLCache
+from .common import grouper
+from .decoder import JSONDecoder
+from .leaderboard import Leaderboard, get_result_count
+from .limiter import Priority, PriorityLimiter, api_priority, use_priority
+from .metrics import RequestMetrics, get_endpoint
+from .store import ResponseStore
+
 logger = logging.getLogger("red.dronefly." + __name__)
 
 API_BASE_URL = "https://api.inaturalist.org"
@@ -28,12 +45,153 @@ RETRY_EXCEPTIONS = [
     JSONDecodeError,
     TimeoutError,
 ]
+# Throttled requests (see is_throttled_status), and those answered with
+# Retry-After, are retried this many times in all before the failure is
+# reported:
+THROTTLED_ATTEMPTS = 4
+# Seconds to wait before retrying a throttled request when the response
+# doesn't say (i.e. no Retry-After), doubled on each attempt:
+THROTTLED_RETRY_AFTER = 2
+# Per-entity cache limits: (maximum entries, time-to-live in seconds)
+# - places & projects rarely change, but projects can be large (e.g. event
+#   projects with thousands of user_ids), so fewer of those are kept
+# - users change login or name from time to time, so expire them sooner
+CACHE_LIMITS = {
+    "places": (2000, 24 * 60 * 60),
+    "projects": (200, 60 * 60),
+    "users": (10000, 60 * 60),
+    "users_login": (10000, 60 * 60),
+    "taxa": (2000, 24 * 60 * 60),
+    # Validators of entity lookups by id (see VALIDATED_ENDPOINTS), which are
+    # only a few short strings each, with the ids of the entities looked up:
+    "validators": (10000, 24 * 60 * 60),
+    # Leaderboards are only kept long enough for users to compare stats, and
+    # aren't persisted:
+    "leaderboards": (50, 5 * 60),
+    # Requests known to find nothing (see INatAPI.missing_cache):
+    "missing": (10000, 6 * 60 * 60),
+}
+# Seconds past their time-to-live that entries may still be served stale by
+# the entity caches listed, while they are refreshed in the background at
+# bulk priority. Only entries older than both block the caller on a refresh.
+# - this is for display data like place names, project titles, and user
+#   logins, where a slightly stale value now beats waiting on the rate limiter
+STALE_TTLS = {
+    "places": 7 * 24 * 60 * 60,
+    "projects": 24 * 60 * 60,
+    "users": 24 * 60 * 60,
+}
+# Stale entries are refreshed in batches of up to this many ids:
+STALE_REFRESH_BATCH = 100
+# The validators (i.e. ETag and/or Last-Modified headers) of lookups by id
+# from these endpoints are kept in the "validators" cache, so that refreshing
+# unchanged entities costs only a 304 response with no body to transfer or
+# parse. The response is then rebuilt from the entity caches, which already
+# hold the entities, rather than kept again alongside its validators.
+VALIDATED_ENDPOINTS = ("/v1/places/", "/v1/projects/", "/v1/users/")
+# Leaderboards are fetched in pages of the most users the API returns at once
+# ...
+LEADERBOARD_PER_PAGE = 500
+# ... one at a time, only as far as needed, up to this many users (i.e. 10
+# pages), so that even the largest query takes a bounded share of the rate
+# budget.
+LEADERBOARD_MAX_RECORDS = 5000
+# Time-to-live in seconds of whole responses kept in the persistent store, by
+# endpoint path prefix. Only responses not already stored by an entity cache
+# (e.g. autocomplete results, which are keyed by query, not id) are listed.
+STORE_TTLS = {
+    "/v1/places/autocomplete": 24 * 60 * 60,
+    "/v1/projects/autocomplete": 60 * 60,
+}
+# Raised for requests failed fast while iNat is down (see INatAPI.breaker):
+NOT_RESPONDING_MSG = "iNat is not responding. Please try again later."
+# Raised for an entity known to be missing because it was omitted from the
+# results of a batch request, as for a lookup of the entity alone that 404'd:
+NOT_FOUND_MSG = "Lookup failed: Not found (404)"
+
+
+@define
+class RequestStats:
+    """Counters for requests made through INatAPI."""
+
+    # Requests sent to the API:
+    requests: int = 0
+    # Requests that shared the response of an identical request in flight:
+    coalesced: int = 0
+    # Responses indicating the API is throttling us or is overloaded:
+    throttled: int = 0
+    # Conditional requests answered with 304 Not Modified:
+    not_modified: int = 0
+
+
+def is_throttled_status(status: int) -> bool:
+    """Is the status one the API returns when throttling or overloaded?
+
+    i.e. worth retrying, unlike e.g. 500, which retrying a bad query won't
+    fix (unless the API asks for a retry with Retry-After).
+    """
+    return status == 429 or is_outage_status(status)
+
+
+def is_outage_status(status: int) -> bool:
+    """Is the status one the API returns when it's down, not for the request?
+
+    i.e. a gateway or availability error, unlike e.g. 500, which a bad query
+    may get all on its own.
+    """
+    return status in (502, 503, 504)
+
+
+def get_retry_after(response: ClientResponse) -> Optional[float]:
+    """Seconds to wait before retrying, if the Retry-After header says."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+            return max(retry_at.timestamp() - time(), 0.0)
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+def get_backoff(attempt: int) -> float:
+    """Seconds to wait before retrying when the response doesn't say."""
+    return THROTTLED_RETRY_AFTER * 2 ** (attempt - 1)
+
+
+# Lookups of entities by id, e.g. /v1/places/1,2,3
+PAT_ENTITY_IDS_PATH = re.compile(r"^/v1/(?P<entity>places|projects|users)/[\d,]+$")
+
+
+def get_entity_name(full_url: str) -> Optional[str]:
+    """Return the entity (e.g. "places") if the url is a lookup by id."""
+    mat = re.match(PAT_ENTITY_IDS_PATH, urlsplit(full_url).path)
+    return mat["entity"] if mat else None
+
+
+def get_request_key(full_url: str, params: dict) -> str:
+    """Normalize a request into a key identifying its response."""
+    query = "&".join(f"{key}={params[key]}" for key in sorted(params))
+    return f"{full_url}?{query}" if query else full_url
 
 
 class INatAPI:
-    """Access the iNat API and assets via (api|static).inaturalist.org."""
+    """Access the iNat API and assets via (api|static).inaturalist.org.
+
+    Parameters
+    ----------
+    cache_path: str
+        Optional path of a SQLite database in which to persist cached
+        responses, so they survive cog reloads and bot restarts.
+    base_url: str
+        Base url of the API, e.g. that of a stand-in server for testing.
+    """
 
-    def __init__(self):
+    def __init__(self, cache_path: Optional[str] = None, base_url: str = API_BASE_URL):
         # pylint: disable=unused-argument
         async def on_request_start(
             session: ClientSession,
@@ -45,6 +203,7 @@ class INatAPI:
                 logger.info(
                     "iNat request attempt #%d: %s", current_attempt, repr(params)
                 )
+                self.metrics.record_retry(get_endpoint(str(params.url)))
 
         trace_config = TraceConfig()
         trace_config.on_request_start.append(on_request_start)
@@ -52,12 +211,73 @@ class INatAPI:
             raise_for_status=False,
             trace_configs=[trace_config],
         )
+        self.base_url = base_url
+        self.decoder = JSONDecoder()
         self.request_time = time()
-        self.places_cache = {}
-        self.projects_cache = {}
-        self.users_cache = {}
-        self.users_login_cache = {}
-        self.taxa_cache = {}
+        self.request_stats = RequestStats()
+        self.metrics = RequestMetrics()
+        # request key -> task fetching the response, while the request is in flight
+        self._inflight = {}
+        self.store = ResponseStore(cache_path) if cache_path else None
+        # entity -> keys of stale entries waiting to be refreshed
+        self._stale_keys = {}
+        # background refreshes of stale entries, kept until done, as the loop
+        # holds only weak references to tasks
+        self._refresh_tasks = set()
+        # string key of a users cache entry -> get_users kwargs it was fetched
+        # with, other than the key, so that refreshing it repeats the request
+        self._user_requests = {}
+        self.places_cache = TTLCache(
+            "places",
+            *CACHE_LIMITS["places"],
+            store=self.store,
+            stale_ttl=STALE_TTLS["places"],
+            on_stale=partial(self._revalidate, "places"),
+        )
+        self.projects_cache = TTLCache(
+            "projects",
+            *CACHE_LIMITS["projects"],
+            store=self.store,
+            stale_ttl=STALE_TTLS["projects"],
+            on_stale=partial(self._revalidate, "projects"),
+        )
+        self.users_cache = TTLCache(
+            "users",
+            *CACHE_LIMITS["users"],
+            on_remove=self._unlink_user_logins,
+            store=self.store,
+            stale_ttl=STALE_TTLS["users"],
+            on_stale=partial(self._revalidate, "users"),
+        )
+        self.users_login_cache = TTLCache(
+            "users_login", *CACHE_LIMITS["users_login"], store=self.store
+        )
+        self.taxa_cache = TTLCache("taxa", *CACHE_LIMITS["taxa"], store=self.store)
+        self.validators_cache = TTLCache("validators", *CACHE_LIMITS["validators"])
+        self.leaderboards_cache = TTLCache(
+            "leaderboards", *CACHE_LIMITS["leaderboards"]
+        )
+        # Negative cache, so that deleted entities aren't asked for again and
+        # again, e.g. for every `,place list` that includes a deleted place:
+        # - request key of a place, project, or user lookup that returned 404
+        #   -> the error message to raise again instead
+        # - request key of the lookup of a single place, project, or user, or
+        #   of a single user's observers stats (see
+        #   bulk_load_users_from_observers) that was omitted from a batch
+        #   request -> NOT_FOUND_MSG
+        self.missing_cache = TTLCache(
+            "missing", *CACHE_LIMITS["missing"], store=self.store
+        )
+        self._caches = (
+            self.places_cache,
+            self.projects_cache,
+            self.users_cache,
+            self.users_login_cache,
+            self.taxa_cache,
+            self.validators_cache,
+            self.leaderboards_cache,
+            self.missing_cache,
+        )
         # api_v1_limiter:
         # ---------------
         # - Allow up to 50 requests over a 60 second time period (i.e.
@@ -65,52 +285,458 @@ class INatAPI:
         #   are throttled until more capacity is available)
         # - This honours "try to keep it to 60 requests per minute or lower"
         #   - https://api.inaturalist.org/v1/docs/
-        self.api_v1_limiter = AsyncLimiter(50, 60)
+        # - Requests are served in order of priority (see limiter.Priority)
+        #   when throttled, so interactive commands needn't wait behind
+        #   listeners and bulk loads.
+        self.api_v1_limiter = PriorityLimiter(50, 60)
+        # While iNat is down, fail fast instead of retrying every request:
+        self.breaker = CircuitBreaker()
 
-    async def _get_rate_limited(self, full_url, **kwargs):
-        """Query API, respecting 60 requests per minute rate limit."""
-        logger.debug('_get_rate_limited("%s", %s)', full_url, repr(kwargs))
-        async with self.api_v1_limiter:
-            # i.e. wait 0.1s, 0.2s, 0.4s, 0.8s, 1.6s, 3.2s, and finally give up
-            retry_options = ExponentialRetry(
-                attempts=6,
-                exceptions=RETRY_EXCEPTIONS,
+    async def load_store(self):
+        """Fill the caches from the persistent store, if enabled.
+
+        Stored entries past their ttl, or no longer stored, are dropped.
+        """
+        if not self.store:
+            return
+        stored_caches = [cache for cache in self._caches if cache.store]
+        ttls = {cache.name: cache.ttl + cache.stale_ttl for cache in stored_caches}
+        await self.store.load({**ttls, **STORE_TTLS})
+        for cache in stored_caches:
+            cache.load_stored()
+
+    async def close(self):
+        """Close the session and flush any persisted responses."""
+        for task in self._refresh_tasks:
+            task.cancel()
+        await self.session.close()
+        if self.store:
+            await self.store.close()
+
+    def _unlink_user_logins(self, key, json_data):
+        """Keep the login lookaside consistent with the main users cache.
+
+        When a user entry leaves the main cache (evicted, expired, or replaced)
+        any login linked to it would otherwise point at a missing or stale
+        entry, so the linkage is dropped along with it, as is the request the
+        entry was fetched by.
+        """
+        self._user_requests.pop(key, None)
+        for user in (json_data or {}).get("results") or []:
+            login = user.get("login")
+            if login and self.users_login_cache.peek(login) == key:
+                del self.users_login_cache[login]
+
+    def _revalidate(self, entity: str, key):
+        """Queue a background refresh of a stale entity cache entry."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        stale_keys = self._stale_keys.setdefault(entity, set())
+        if not stale_keys:
+            task = asyncio.ensure_future(self._refresh_stale(entity))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(partial(self._end_refresh, entity))
+        stale_keys.add(key)
+
+    def _end_refresh(self, entity: str, task: asyncio.Task):
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(
+                "Refresh of stale %s failed", entity, exc_info=task.exception()
             )
-            try:
-                async with self.session.get(
-                    full_url, params=kwargs, retry_options=retry_options
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        try:
-                            json = await response.json()
-                            msg = f"{json.get('error')} ({json.get('status')})"
-                        except ContentTypeError:
-                            data = await response.text()
-                            document = BeautifulSoup(data, "html.parser")
-                            # Only use the body, if present
-                            if document.body:
-                                text = document.body.find().text
+
+    async def _refresh_stale(self, entity: str):
+        """Refresh the stale entries queued for the entity cache."""
+        # Let the caller that found the first stale entry find the rest, so
+        # that they're refreshed together:
+        await asyncio.sleep(0)
+        stale_keys = self._stale_keys.pop(entity, set())
+        with use_priority(Priority.BULK):
+            if entity == "users":
+                # Users by id are refreshed in bulk, which leaves any without
+                # observations stale until they expire. Logins & searches are
+                # refreshed one by one, each by the request it was fetched by,
+                # if known (i.e. not loaded from the store), or else also left
+                # until it expires.
+                user_ids = [key for key in stale_keys if isinstance(key, int)]
+                requests = [
+                    self.get_users(key, refresh_cache=True, **self._user_requests[key])
+                    for key in stale_keys
+                    if key in self._user_requests
+                ]
+                if user_ids:
+                    requests.append(self.bulk_load_users_from_observers(user_ids))
+            else:
+                get_entities = (
+                    self.get_places if entity == "places" else self.get_projects
+                )
+                requests = [
+                    get_entities(
+                        [key for key in keys if key is not None], refresh_cache=True
+                    )
+                    for keys in grouper(stale_keys, STALE_REFRESH_BATCH)
+                ]
+            results = await asyncio.gather(*requests, return_exceptions=True)
+        for result in results:
+            if isinstance(result, LookupError):
+                logger.info("Refresh of stale %s failed: %s", entity, result)
+            elif isinstance(result, Exception):
+                logger.error("Refresh of stale %s failed: %s", entity, repr(result))
+
+    def cache_stats(self):
+        """Return stats for each entity cache, keyed by cache name."""
+        return {cache.name: cache.stats for cache in self._caches}
+
+    def _get_store_ttl(self, full_url: str):
+        """Return the persistent store namespace & ttl for the url, if any."""
+        if not self.store:
+            return (None, None)
+        path = urlsplit(full_url).path
+        prefix = next(
+            (prefix for prefix in STORE_TTLS if path.startswith(prefix)), None
+        )
+        return (prefix, STORE_TTLS.get(prefix))
+
+    async def _get_rate_limited(self, full_url, refresh_cache=False, **kwargs):
+        """Query API, respecting 60 requests per minute rate limit.
+
+        Responses from endpoints in STORE_TTLS are served from the persistent
+        store, if enabled, and known missing entities (see missing_cache)
+        raise LookupError without a request, unless `refresh_cache` is set.
+        """
+        logger.debug('_get_rate_limited("%s", %s)', full_url, repr(kwargs))
+        if urlsplit(full_url).path.startswith(VALIDATED_ENDPOINTS):
+            request_key = get_request_key(full_url, kwargs)
+            missing_msg = self.missing_cache.peek(request_key)
+            if missing_msg and not refresh_cache:
+                self.metrics.record_cached(get_endpoint(full_url))
+                raise LookupError(missing_msg)
+            if missing_msg:
+                del self.missing_cache[request_key]
+        namespace, ttl = self._get_store_ttl(full_url)
+        if namespace:
+            request_key = get_request_key(full_url, kwargs)
+            if not refresh_cache:
+                stored = self.store.get(namespace, request_key, ttl)
+                if stored:
+                    self.metrics.record_cached(get_endpoint(full_url))
+                    return stored[0]
+            json_data = await self._get_coalesced(full_url, **kwargs)
+            if json_data:
+                self.store.set(namespace, request_key, json_data)
+            return json_data
+        return await self._get_coalesced(full_url, **kwargs)
+
+    async def _get_coalesced(self, full_url, **kwargs):
+        """Query API, sharing one request among identical concurrent requests.
+
+        e.g. when an observation link is posted, autoobs in several channels
+        and users running `,obs` on it all request the same observation at
+        once, but need only one round trip and one rate limiter token. A
+        caller more urgent than the one that made the request promotes it
+        (see PriorityLimiter.promote), so that e.g. a command needn't wait on
+        a bulk load's place in the rate limiter's queue.
+
+        Within a request budget (see budget.use_budget), a new request is
+        counted against it, and the caller stops waiting when time runs out,
+        raising BudgetExceeded.
+        """
+        request_key = get_request_key(full_url, kwargs)
+        budget = get_budget()
+        inflight = self._inflight.get(request_key)
+        if inflight:
+            self.request_stats.coalesced += 1
+            self.metrics.record_cached(get_endpoint(full_url))
+            self.api_v1_limiter.promote(inflight, api_priority.get())
+        else:
+            if budget:
+                budget.spend()
+            inflight = asyncio.ensure_future(self._get_uncached(full_url, **kwargs))
+            self._inflight[request_key] = inflight
+            inflight.add_done_callback(partial(self._end_inflight, request_key))
+        timeout = budget.remaining() if budget else None
+        try:
+            # Shielded so that one cancelled caller doesn't cancel the request
+            # for all of the others waiting on it.
+            return await asyncio.wait_for(asyncio.shield(inflight), timeout)
+        except asyncio.TimeoutError:
+            if timeout is None:
+                raise
+            budget.exceed("time")
+
+    def _end_inflight(self, request_key: str, task: asyncio.Task):
+        self._inflight.pop(request_key, None)
+        # Mark any exception as retrieved, as every caller waiting on it may
+        # have been cancelled already.
+        if not task.cancelled():
+            task.exception()
+
+    def _is_missing(self, entity: str, entity_id: Union[int, str]) -> bool:
+        """Is the entity (e.g. a place) known not to exist?"""
+        return self._entity_key(entity, entity_id) in self.missing_cache
+
+    def _set_found(self, entity: str, entity_ids: Iterable[Union[int, str]]):
+        """Forget any entities found by a batch request were missing."""
+        for entity_id in entity_ids:
+            key = self._entity_key(entity, entity_id)
+            if key in self.missing_cache:
+                del self.missing_cache[key]
+
+    def _set_missing(self, entity: str, entity_ids: List[Union[int, str]]):
+        """Record entities omitted from a batch request as missing."""
+        for entity_id in entity_ids:
+            self.missing_cache[self._entity_key(entity, entity_id)] = NOT_FOUND_MSG
+
+    def _entity_key(self, entity: str, entity_id: Union[int, str]) -> str:
+        # Same as the key of a request for just that entity, so that a later
+        # request for it finds it missing.
+        return get_request_key(f"{self.base_url}/v1/{entity}/{entity_id}", {})
+
+    def _get_cached_response(self, full_url: str, entity_ids: List[int]):
+        """Rebuild a lookup by id from the entity caches, if they hold it all."""
+        cache = {
+            "places": self.places_cache,
+            "projects": self.projects_cache,
+            "users": self.users_cache,
+        }[get_entity_name(full_url)]
+        results = []
+        for entity_id in entity_ids:
+            json_data = cache.peek(entity_id)
+            if not json_data or not json_data.get("results"):
+                return None
+            results.append(json_data["results"][0])
+        return {
+            "total_results": len(results),
+            "page": 1,
+            "per_page": len(results),
+            "results": results,
+        }
+
+    def _get_validators(self, full_url: str, request_key: str):
+        """Return conditional request headers & the response they validate.
+
+        The response is only validated if the entities it returned are all
+        still cached, as otherwise there is no body to answer a 304 with.
+        """
+        if not get_entity_name(full_url):
+            return ({}, None)
+        validators = self.validators_cache.get(request_key)
+        if not validators:
+            return ({}, None)
+        cached = self._get_cached_response(full_url, validators["ids"])
+        if not cached:
+            return ({}, None)
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return (headers, cached)
+
+    def _set_validators(
+        self, full_url: str, request_key: str, response: ClientResponse, json_data
+    ):
+        """Keep the response's validators, if it has any."""
+        if not get_entity_name(full_url):
+            return
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self.validators_cache[request_key] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "ids": [
+                    result["id"]
+                    for result in (json_data or {}).get("results") or []
+                    if result.get("id")
+                ],
+            }
+
+    async def _get_uncached(self, full_url, **kwargs):
+        """Query API for a response that isn't stored.
+
+        A lookup by id with validators kept (see VALIDATED_ENDPOINTS) is
+        requested conditionally, and if not modified, rebuilt from the entity
+        caches.
+
+        If the API throttles the request (HTTP 429), or asks to retry after a
+        while (Retry-After), the rate limiter backs off for all callers, and
+        the request is retried once the limiter lets it through again. A
+        gateway or availability error (502, 503, or 504) without Retry-After
+        may be due to the request alone, so only this request backs off
+        before it's retried. Other errors, e.g. 500 for a bad query, fail the
+        request at once.
+
+        While the circuit breaker is open, the request fails fast, answered
+        with the response rebuilt from its validators if there is one. Each
+        request counts as a single failure of the breaker only once it has
+        been retried as far as it will be, and only if it couldn't connect or
+        was still answered by a gateway or availability error (see
+        is_outage_status), so a request that fails on its own can't open it.
+        """
+        self.request_stats.requests += 1
+        request_key = get_request_key(full_url, kwargs)
+        headers, cached = self._get_validators(full_url, request_key)
+        endpoint = get_endpoint(full_url)
+        backoff = 0.0
+        allowed, probe = self.breaker.admit()
+        if not allowed:
+            return self._get_fallback(cached)
+        try:
+            for attempt in range(1, THROTTLED_ATTEMPTS + 1):
+                if backoff:
+                    # Outside the limiter, so other requests can go meanwhile.
+                    await asyncio.sleep(backoff)
+                    backoff = 0.0
+                queued_at = monotonic()
+                async with self.api_v1_limiter:
+                    sent_at = monotonic()
+                    if not probe and self.breaker.state is not BreakerState.CLOSED:
+                        # It opened while this request backed off or waited
+                        # its turn.
+                        return self._get_fallback(cached)
+                    # i.e. wait 0.1s, 0.2s, 0.4s, 0.8s, 1.6s, 3.2s, and finally give up
+                    # - server errors are left for us to handle below, as retrying
+                    #   them here would bypass the rate limiter
+                    retry_options = ExponentialRetry(
+                        attempts=6,
+                        exceptions=RETRY_EXCEPTIONS,
+                        retry_all_server_errors=False,
+                    )
+                    try:
+                        async with self.session.get(
+                            full_url,
+                            params=kwargs,
+                            headers=headers,
+                            retry_options=retry_options,
+                        ) as response:
+                            self.metrics.record_request(
+                                endpoint,
+                                response.status,
+                                monotonic() - sent_at,
+                                sent_at - queued_at,
+                            )
+                            if response.status == 200:
+                                json_data = await self.decoder.json(response)
+                                self.breaker.record_success()
+                                self._set_validators(
+                                    full_url, request_key, response, json_data
+                                )
+                                return json_data
+                            if response.status == 304 and cached:
+                                self.breaker.record_success()
+                                self.request_stats.not_modified += 1
+                                # Restart the clock on the validators, as the
+                                # caller does on the entities they validate:
+                                validators = self.validators_cache.get(request_key)
+                                if validators:
+                                    self.validators_cache[request_key] = validators
+                                return cached
+                            retry_after = get_retry_after(response)
+                            if (
+                                is_throttled_status(response.status)
+                                or retry_after is not None
+                            ) and attempt < THROTTLED_ATTEMPTS:
+                                if response.status == 429 or retry_after is not None:
+                                    if retry_after is None:
+                                        retry_after = get_backoff(attempt)
+                                    self.api_v1_limiter.throttle(retry_after)
+                                else:
+                                    retry_after = backoff = get_backoff(attempt)
+                                logger.warning(
+                                    "iNat request throttled (%d); retry #%d in %.1fs: %s",
+                                    response.status,
+                                    attempt,
+                                    retry_after,
+                                    full_url,
+                                )
+                                self.request_stats.throttled += 1
+                                continue
+                            if is_outage_status(response.status):
+                                self.breaker.record_failure(f"HTTP {response.status}")
                             else:
-                                text = document
-                            # Treat as much as we can as markdown
-                            markdown = html2markdown.convert(text)
-                            # Punt the rest back to bs4 to drop unhandled tags
-                            msg = BeautifulSoup(markdown, "html.parser").text
-                        lookup_failed_msg = f"Lookup failed: {msg}"
-                        logger.error(lookup_failed_msg)
-                        raise LookupError(lookup_failed_msg)
-            except Exception as e:  # pylint: disable=broad-except,invalid-name
-                if any(isinstance(e, exc) for exc in retry_options.exceptions):
-                    attempts = retry_options.attempts
-                    msg = f"iNat not responding after {attempts} attempts. Please try again later."
-                    logger.error(msg)
-                    raise LookupError(msg) from e
-                raise e
+                                self.breaker.record_success()
+                            try:
+                                json = await self.decoder.json(response)
+                                msg = f"{json.get('error')} ({json.get('status')})"
+                            except ContentTypeError:
+                                data = await response.text()
+                                document = BeautifulSoup(data, "html.parser")
+                                # Only use the body, if present
+                                if document.body:
+                                    text = document.body.find().text
+                                else:
+                                    text = document
+                                # Treat as much as we can as markdown
+                                markdown = html2markdown.convert(text)
+                                # Punt the rest back to bs4 to drop unhandled tags
+                                msg = BeautifulSoup(markdown, "html.parser").text
+                            lookup_failed_msg = f"Lookup failed: {msg}"
+                            logger.error(lookup_failed_msg)
+                            if response.status == 404 and urlsplit(
+                                full_url
+                            ).path.startswith(VALIDATED_ENDPOINTS):
+                                self.missing_cache[request_key] = lookup_failed_msg
+                            raise LookupError(lookup_failed_msg)
+                    except Exception as e:  # pylint: disable=broad-except,invalid-name
+                        if any(isinstance(e, exc) for exc in retry_options.exceptions):
+                            self.breaker.record_failure(type(e).__name__)
+                            self.metrics.record_request(
+                                endpoint,
+                                "error",
+                                monotonic() - sent_at,
+                                sent_at - queued_at,
+                            )
+                            attempts = retry_options.attempts
+                            msg = (
+                                f"iNat not responding after {attempts} attempts."
+                                " Please try again later."
+                            )
+                            logger.error(msg)
+                            raise LookupError(msg) from e
+                        raise e
+        finally:
+            if probe:
+                self.breaker.release()
 
         return None
 
+    def _get_fallback(self, cached: Optional[dict]):
+        """Answer a request failed fast while iNat is down, if possible."""
+        self.breaker.stats.rejected += 1
+        if cached:
+            self.breaker.stats.fallbacks += 1
+            return cached
+        raise LookupError(NOT_RESPONDING_MSG)
+
+    def cache_response(self, full_url: str, json_data: dict):
+        """Cache the entities from a response to a lookup by id made elsewhere.
+
+        e.g. by the pyinaturalist client (see transport.SharedSession), so
+        that places, projects, and users it has fetched aren't fetched again.
+        """
+        entity = get_entity_name(full_url)
+        if not entity or not json_data:
+            return
+        for result in json_data.get("results") or []:
+            entity_id = result.get("id")
+            if not entity_id:
+                continue
+            if entity == "users":
+                self.users_cache[entity_id] = {"results": [result]}
+                if result.get("login"):
+                    self.users_login_cache[result["login"]] = entity_id
+                continue
+            cache = self.places_cache if entity == "places" else self.projects_cache
+            cache[entity_id] = {
+                "total_results": 1,
+                "page": 1,
+                "per_page": 1,
+                "results": [result],
+            }
+
     async def get_observations(self, *args, **kwargs):
         """Query API for observations.
 
@@ -126,9 +752,94 @@ class INatAPI:
 
         endpoint = "/v1/observations"
         id_arg = f"/{args[0]}" if args else ""
-        full_url = f"{API_BASE_URL}{endpoint}{id_arg}"
+        full_url = f"{self.base_url}{endpoint}{id_arg}"
         return await self._get_rate_limited(full_url, **kwargs)
 
+    async def iter_observation_pages(
+        self,
+        *args,
+        max_records: Optional[int] = None,
+        per_page: int = 200,
+        read_ahead: bool = True,
+        **kwargs,
+    ) -> AsyncIterator[List[dict]]:
+        """Iterate over the results of an observations query, page by page.
+
+        Each next page is requested while the current one is consumed, so at
+        most two pages are held at once however large the result set is.
+
+        Parameters
+        ----------
+        *args
+            - As for `get_observations`, e.g. "observers" to iterate over the
+              /v1/observations/observers endpoint.
+
+        max_records: int
+            - Stop after this many results. By default, iterate over all.
+
+        per_page: int
+            - Results requested per API call.
+
+        read_ahead: bool
+            - Request the next page while the current one is consumed. If not
+              set, it is requested only once the caller asks for it, e.g. for
+              callers that stop as soon as they find what they need.
+
+        **kwargs
+            - All kwargs are passed as params on each API call.
+            - Plain observation queries without a sort order are paged with an
+              `id_above` cursor, which unlike `page` isn't capped at 10,000
+              results by the API. Other queries are paged by `page` number,
+              starting from `page`, if given.
+        """
+        params = {**kwargs, "per_page": per_page}
+        use_id_above = not args and not {"page", "order_by"} & kwargs.keys()
+        if use_id_above:
+            params.update(order_by="id", order="asc")
+        else:
+            params.setdefault("page", 1)
+
+        def get_next_page():
+            return asyncio.ensure_future(self.get_observations(*args, **params))
+
+        pending = get_next_page()
+        count = 0
+        try:
+            while pending:
+                response = await pending or {}
+                pending = None
+                results = response.get("results") or []
+                if max_records is not None:
+                    results = results[: max_records - count]
+                count += len(results)
+                more = len(results) == per_page and (
+                    max_records is None or count < max_records
+                )
+                if more and use_id_above:
+                    params["id_above"] = results[-1]["id"]
+                elif more:
+                    more = params["page"] * per_page < response.get("total_results", 0)
+                    params["page"] += 1
+                if more and read_ahead:
+                    pending = get_next_page()
+                if results:
+                    yield results
+                if more and not pending:
+                    pending = get_next_page()
+        finally:
+            if pending:
+                pending.cancel()
+
+    async def iter_observations(self, *args, **kwargs) -> AsyncIterator[dict]:
+        """Iterate over the results of an observations query, one by one.
+
+        Parameters are as for `iter_observation_pages`.
+        """
+        async with aclosing(self.iter_observation_pages(*args, **kwargs)) as pages:
+            async for results in pages:
+                for result in results:
+                    yield result
+
     async def get_observation_bounds(self, taxon_ids):
         """Get the bounds for the specified observations."""
         kwargs = {
@@ -147,24 +858,39 @@ class INatAPI:
     async def get_places(
         self, query: Union[int, str, list], refresh_cache=False, **kwargs
     ):
-        """Get places for the specified ids or text query."""
+        """Get places for the specified ids or text query.
+
+        Stale cached places are returned at once and refreshed in the
+        background (see STALE_TTLS), unless `refresh_cache` is set.
+        """
 
         first_place_id = None
         if isinstance(query, list):
-            cached = set(query).issubset(set(self.places_cache))
-            request = f"/v1/places/{','.join(map(str, query))}"
+            # Known missing places are left out of the request, unless it is
+            # to refresh them, as with a request for a single place:
+            requested_ids = [
+                int(place_id)
+                for place_id in query
+                if refresh_cache or not self._is_missing("places", int(place_id))
+            ]
+            cached = not refresh_cache and all(
+                place_id in self.places_cache for place_id in requested_ids
+            )
+            if not requested_ids:
+                return {}
+            request = f"/v1/places/{','.join(map(str, requested_ids))}"
         elif isinstance(query, int):
-            cached = query in self.places_cache
+            cached = not refresh_cache and query in self.places_cache
             if cached:
                 first_place_id = query
             request = f"/v1/places/{query}"
         else:
             cached = False
             request = f"/v1/places/{query}"
-        full_url = f"{API_BASE_URL}{request}"
+        full_url = f"{self.base_url}{request}"
 
         if refresh_cache or not cached:
-            results = await self._get_rate_limited(full_url, **kwargs)
+            results = await self._get_rate_limited(full_url, refresh_cache, **kwargs)
             if results:
                 places = results.get("results") or []
                 for place in places:
@@ -179,38 +905,63 @@ class INatAPI:
                             "results": [place],
                         }
                         self.places_cache[key] = record
+                if isinstance(query, list):
+                    found_ids = {place.get("id") for place in places}
+                    missing_ids = [
+                        place_id
+                        for place_id in requested_ids
+                        if place_id not in found_ids
+                    ]
+                    for place_id in missing_ids:
+                        if self.places_cache.peek(place_id):
+                            del self.places_cache[place_id]
+                    self._set_found("places", found_ids)
+                    self._set_missing("places", missing_ids)
 
         if isinstance(query, list):
             return {
-                place_id: self.places_cache[int(place_id)]
+                place_id: self.places_cache.peek(int(place_id))
                 for place_id in query
-                if int(place_id) in self.places_cache
+                if self.places_cache.peek(int(place_id))
             }
-        if first_place_id in self.places_cache:
-            return self.places_cache[first_place_id]
-        return None
+        return self.places_cache.peek(first_place_id)
 
     async def get_projects(
         self, query: Union[str, int, list], refresh_cache=False, **kwargs
     ):
-        """Get projects for the specified ids or text query."""
+        """Get projects for the specified ids or text query.
+
+        Stale cached projects are returned at once and refreshed in the
+        background (see STALE_TTLS), unless `refresh_cache` is set.
+        """
 
         first_project_id = None
         if isinstance(query, list):
-            cached = set(query).issubset(set(self.projects_cache))
-            request = f"/v1/projects/{','.join(map(str, query))}"
+            # Known missing projects are left out of the request, unless it is
+            # to refresh them, as with a request for a single project:
+            requested_ids = [
+                int(project_id)
+                for project_id in query
+                if refresh_cache or not self._is_missing("projects", int(project_id))
+            ]
+            cached = not refresh_cache and all(
+                project_id in self.projects_cache for project_id in requested_ids
+            )
+            if not requested_ids:
+                return {}
+            request = f"/v1/projects/{','.join(map(str, requested_ids))}"
         elif isinstance(query, int):
-            cached = query in self.projects_cache
+            cached = not refresh_cache and query in self.projects_cache
             if cached:
                 first_project_id = query
             request = f"/v1/projects/{query}"
         else:
             cached = False
             request = f"/v1/projects/{query}"
-        full_url = f"{API_BASE_URL}{request}"
+        full_url = f"{self.base_url}{request}"
 
         if refresh_cache or not cached:
-            results = await self._get_rate_limited(full_url, **kwargs)
+            results = await self._get_rate_limited(full_url, refresh_cache, **kwargs)
             if results:
                 projects = results.get("results") or []
                 for project in projects:
@@ -225,37 +976,170 @@ class INatAPI:
                             "results": [project],
                         }
                         self.projects_cache[key] = record
+                if isinstance(query, list):
+                    found_ids = {project.get("id") for project in projects}
+                    missing_ids = [
+                        project_id
+                        for project_id in requested_ids
+                        if project_id not in found_ids
+                    ]
+                    for project_id in missing_ids:
+                        if self.projects_cache.peek(project_id):
+                            del self.projects_cache[project_id]
+                    self._set_found("projects", found_ids)
+                    self._set_missing("projects", missing_ids)
 
         if isinstance(query, list):
             return {
-                project_id: self.projects_cache[int(project_id)]
+                project_id: self.projects_cache.peek(int(project_id))
                 for project_id in query
-                if self.projects_cache.get(int(project_id))
+                if self.projects_cache.peek(int(project_id))
             }
-        if first_project_id in self.projects_cache:
-            return self.projects_cache[first_project_id]
-        return None
+        return self.projects_cache.peek(first_project_id)
 
-    async def get_observers_stats(self, **kwargs):
-        """Query API for user counts & rankings."""
-        request = "/v1/observations/observers"
-        # TODO: validate kwargs includes project_id
-        # TODO: support queries with > 500 observers (one page, default)
-        full_url = f"{API_BASE_URL}{request}"
-        return await self._get_rate_limited(full_url, **kwargs)
+    async def get_leaderboard(
+        self,
+        view: str = "observers",
+        refresh_cache=False,
+        max_records: int = LEADERBOARD_MAX_RECORDS,
+        records: int = 1,
+        user_id: Optional[int] = None,
+        user_count: Optional[int] = None,
+        **kwargs,
+    ) -> Leaderboard:
+        """Get observers or identifiers leaderboard, as far as needed.
+
+        Pages are fetched one at a time, only until there are `records` users,
+        and the user with `user_id` is ranked, so that most lookups cost just
+        the first page. The leaderboard is cached for a few minutes, and later
+        calls carry on from the pages already fetched, so that users can
+        compare their stats or page through it without refetching it.
+
+        Parameters
+        ----------
+        view: str
+            - Either "observers" or "identifiers".
+
+        refresh_cache: bool
+            - Fetch the leaderboard even if it is cached.
+
+        max_records: int
+            - Fetch at most this many users.
+
+        records: int
+            - Fetch at least this many users, if there are that many.
+
+        user_id: int
+            - Fetch until this user is ranked, if they are at all.
+
+        user_count: int
+            - The count the user with `user_id` is ranked by, to stop once
+              past where they would be ranked, e.g. if they aren't at all.
+
+        **kwargs
+            - All kwargs are passed as params on each API call.
+        """
+        if view not in ("observers", "identifiers"):
+            raise ValueError(f"Not a leaderboard: {view}")
+        full_url = f"{self.base_url}/v1/observations/{view}"
+        key = get_request_key(full_url, {**kwargs, "max_records": max_records})
+        params = {**kwargs, "per_page": LEADERBOARD_PER_PAGE}
+        if not refresh_cache and key in self.leaderboards_cache:
+            leaderboard = self.leaderboards_cache[key]
+        else:
+            first_page = await self.get_observations(view, **params, page=1) or {}
+            # Copied, as the response may be shared with other callers:
+            leaderboard = Leaderboard(
+                [*(first_page.get("results") or [])][:max_records],
+                first_page.get("total_results") or 0,
+            )
+            self.leaderboards_cache[key] = leaderboard
+
+        def wanted():
+            if leaderboard.complete or len(leaderboard.results) >= max_records:
+                return False
+            if len(leaderboard.results) < records:
+                return True
+            if not user_id or leaderboard.rank(user_id):
+                return False
+            if user_count is None or not leaderboard.results:
+                return True
+            last = leaderboard.results[-1]
+            return get_result_count(last, kwargs.get("order_by")) >= user_count
+
+        while wanted():
+            page = leaderboard.pages + 1
+            # Without read-ahead, as each page may be the last one needed:
+            pages = self.iter_observation_pages(
+                view,
+                max_records=max_records - len(leaderboard.results),
+                per_page=LEADERBOARD_PER_PAGE,
+                read_ahead=False,
+                page=page,
+                **kwargs,
+            )
+            async with aclosing(pages):
+                async for results in pages:
+                    if page != leaderboard.pages + 1:
+                        # Another caller added the page while this one waited,
+                        # so carry on from wherever they left off.
+                        break
+                    leaderboard.extend(results)
+                    page += 1
+                    if not wanted():
+                        break
+                else:
+                    # Fewer users than counted, e.g. since the first page.
+                    break
+        return leaderboard
 
     async def get_search_results(self, **kwargs):
         """Get site search results."""
         if "is_active" in kwargs and kwargs["is_active"] == "any":
-            full_url = f"{API_BASE_URL}/v1/taxa"
+            full_url = f"{self.base_url}/v1/taxa"
         else:
-            full_url = f"{API_BASE_URL}/v1/search"
+            full_url = f"{self.base_url}/v1/search"
         return await self._get_rate_limited(full_url, **kwargs)
 
+    def _get_cached_user(self, key: Union[int, str], count: bool = False):
+        """Return cached users for key, or None if not cached.
+
+        Only when `count` is set is the lookup counted in the cache stats.
+        """
+        if count and key in self.users_cache:
+            return self.users_cache[key]
+        json_data = self.users_cache.peek(key)
+        if json_data:
+            return json_data
+        # - Lookaside for login is only consulted if not found in the main
+        #   users_cache.
+        # - This is important, since a lookup by user_id could prime the
+        #   lookaside cache with the single login entry, and then a subsequent
+        #   search by login could return multiple results into the main cache.
+        #   From then on, searching for the login should return the cached
+        #   multiple results from the main cache, not the single result that the
+        #   lookaside users_login_cache supports.
+        # - This shortcut seems like it would return incomplete results depending
+        #   on the order in which lookups are performed. However, since the login
+        #   lookaside is primarily in support of iNat login lookups from already
+        #   cached project members, this is OK. The load of the whole project
+        #   membership at once (get_observers_from_projects) for that use case
+        #   ensures all relevant matches are already individually cached.
+        if count and key in self.users_login_cache:
+            return self.users_cache.peek(self.users_login_cache[key])
+        user_id = self.users_login_cache.peek(key)
+        if user_id is not None:
+            return self.users_cache.peek(user_id)
+        return None
+
     async def get_users(
         self, query: Union[int, str], refresh_cache=False, by_login_id=False, **kwargs
     ):
-        """Get the users for the specified login, user_id, or query."""
+        """Get the users for the specified login, user_id, or query.
+
+        A stale cached result is returned at once and refreshed in the
+        background (see STALE_TTLS), unless `refresh_cache` is set.
+        """
         request = f"/v1/users/{query}"
         if isinstance(query, int) or query.isnumeric():
             user_id = int(query)
@@ -267,13 +1151,10 @@ class INatAPI:
             user_id = None
             request = f"/v1/users/autocomplete?q={query}"
             key = query
-        full_url = f"{API_BASE_URL}{request}"
+        full_url = f"{self.base_url}{request}"
 
-        if refresh_cache or (
-            key not in self.users_cache and key not in self.users_login_cache
-        ):
-            # TODO: provide means to expire the cache (other than reloading the cog).
-            json_data = await self._get_rate_limited(full_url, **kwargs)
+        if refresh_cache or not self._get_cached_user(key, count=True):
+            json_data = await self._get_rate_limited(full_url, refresh_cache, **kwargs)
 
             if json_data:
                 results = json_data.get("results")
@@ -295,9 +1176,17 @@ class INatAPI:
                         # simpler code.
                         if user["login"] != key:
                             self.users_cache[key] = json_data
+                            self._user_requests[key] = {
+                                "by_login_id": by_login_id,
+                                **kwargs,
+                            }
                     else:
                         # Cache multiple results matched by string.
                         self.users_cache[key] = json_data
+                        self._user_requests[key] = {
+                            "by_login_id": by_login_id,
+                            **kwargs,
+                        }
                         # Additional synthesized cache results per matched user, as
                         # if they were queried individually.
                         for user in results:
@@ -322,80 +1211,122 @@ class INatAPI:
                         self.users_login_cache[user["login"]] = key
                     self.request_time = time()
 
-        if key in self.users_cache:
-            return self.users_cache[key]
-        # - Lookaside for login is only consulted if not found in the main
-        #   users_cache.
-        # - This is important, since a lookup by user_id could prime the
-        #   lookaside cache with the single login entry, and then a subsequent
-        #   search by login could return multiple results into the main cache.
-        #   From then on, searching for the login should return the cached
-        #   multiple results from the main cache, not the single result that the
-        #   lookaside users_login_cache supports.
-        # - This shortcut seems like it would return incomplete results depending
-        #   on the order in which lookups are performed. However, since the login
-        #   lookaside is primarily in support of iNat login lookups from already
-        #   cached project members, this is OK. The load of the whole project
-        #   membership at once (get_observers_from_projects) for that use case
-        #   ensures all relevant matches are already individually cached.
-        if key in self.users_login_cache:
-            user_id = self.users_login_cache[key]
-            return self.users_cache[user_id]
-        return None
+        return self._get_cached_user(key)
+
+    def _get_observer_key(self, user_id: int) -> str:
+        # Users missing from the observers stats have no observations (or were
+        # deleted), so aren't necessarily missing from a /v1/users lookup.
+        return get_request_key(
+            f"{self.base_url}/v1/observations/observers", {"user_id": user_id}
+        )
 
-    async def bulk_load_users_from_observers(self, user_ids: List):
+    async def bulk_load_users_from_observers(
+        self,
+        user_ids: List,
+        on_progress: Optional[Callable[[List[dict], List[int]], None]] = None,
+    ):
         """Bulk load users that are observers.
 
         This method can be used to prime the cache prior to fetching multiple
         users at once by id, greatly reducing the API cost over an individual
         API call per user.
+
+        The ids are requested in chunks of up to 500 at a time, all at once,
+        leaving it to the rate limiter to pace them at bulk priority.
+
+        Parameters
+        ----------
+        user_ids: List
+            - iNat user ids to load.
+
+        on_progress: Callable[[List[dict], List[int]], None]
+            - Called as each chunk lands with the users loaded and the ids
+              missing from it, so callers can start on those users before
+              all of the chunks have landed.
         """
-        logger.info("Bulk user load individual users count: %d", len(user_ids))
-        remaining_user_ids = [*user_ids] if user_ids else []
-        remaining_user_ids_page = []
-        more = True
-        users = []
-        missing_user_ids = []
+        # Duplicates are dropped, but the order of the ids is kept:
+        requested_user_ids = list(dict.fromkeys(user_ids)) if user_ids else []
+        # Users known to be missing from the observers stats are skipped:
+        known_missing_user_ids = [
+            user_id
+            for user_id in requested_user_ids
+            if self._get_observer_key(user_id) in self.missing_cache
+        ]
+        if known_missing_user_ids:
+            known_missing = set(known_missing_user_ids)
+            requested_user_ids = [
+                user_id
+                for user_id in requested_user_ids
+                if user_id not in known_missing
+            ]
+            if on_progress:
+                on_progress([], known_missing_user_ids)
+        logger.info(
+            "Bulk user load individual users count: %d", len(requested_user_ids)
+        )
         per_page = 500
-        while more:
-            params = {"per_page": per_page}
-            if remaining_user_ids:
-                # The max we can fetch at once is 500, but we specify slices
-                # of all requested user ids instead of passing page=#; some
-                # requested users may not be included in the results, so the
-                # actual number returned per API call may be less than 500.
-                remaining_user_ids_page = remaining_user_ids[0:per_page]
-                remaining_user_ids = remaining_user_ids[per_page:]
-                params["user_id"] = ",".join(map(str, remaining_user_ids_page))
-            response = await self.get_observations("observers", **params)
-            results = response.get("results") or []
-            for observer in results:
-                user = observer.get("user")
-                if user:
-                    user_id = user.get("id")
+        # The max we can fetch at once is 500, but we specify chunks of all
+        # requested user ids instead of passing page=#; some requested users
+        # may not be included in the results, so the actual number returned
+        # per API call may be less than 500.
+        chunks = [
+            [user_id for user_id in chunk if user_id is not None]
+            for chunk in grouper(requested_user_ids, per_page)
+        ]
+        if not user_ids:
+            chunks = [[]]
+
+        async def load_chunk(chunk: List):
+            params = {}
+            if chunk:
+                params["user_id"] = ",".join(map(str, chunk))
+            chunk_users = []
+            with use_priority(Priority.BULK):
+                # At most one page per chunk, unless none were requested, in
+                # which case that's the first page of all observers:
+                async for observer in self.iter_observations(
+                    "observers",
+                    max_records=len(chunk) or per_page,
+                    per_page=per_page,
+                    **params,
+                ):
+                    user = observer.get("user")
+                    user_id = user and user.get("id")
                     if user_id:
-                        # Synthesize a single result as if returned by a get_users
-                        # lookup of a single user_id, and cache it:
-                        user_json = {}
-                        user_json["results"] = [user]
-                        users.append(user)
-                        self.users_cache[user_id] = user_json
+                        # Synthesize a single result as if returned by a
+                        # get_users lookup of a single user_id, and cache it:
+                        self.users_cache[user_id] = {"results": [user]}
                         self.users_login_cache[user["login"]] = user_id
-                        if user_ids:
-                            remaining_user_ids_page.remove(user_id)
-            # Record any users that weren't retrieved in this page as missing:
-            if remaining_user_ids_page:
-                missing_user_ids.extend(remaining_user_ids_page)
-
-            # Stop when there are none left over
-            if not remaining_user_ids:
-                more = False
+                        chunk_users.append(user)
+            # Record any users that weren't retrieved in this chunk as missing:
+            loaded_user_ids = {user["id"] for user in chunk_users}
+            chunk_missing_user_ids = [
+                user_id for user_id in chunk if user_id not in loaded_user_ids
+            ]
+            for user_id in chunk_missing_user_ids:
+                self.missing_cache[self._get_observer_key(user_id)] = NOT_FOUND_MSG
+            if on_progress:
+                on_progress(chunk_users, chunk_missing_user_ids)
+            return (chunk_users, chunk_missing_user_ids)
+
+        users = []
+        missing_user_ids = []
+        for chunk_users, chunk_missing_user_ids in await asyncio.gather(
+            *(load_chunk(chunk) for chunk in chunks)
+        ):
+            users.extend(chunk_users)
+            missing_user_ids.extend(chunk_missing_user_ids)
         if missing_user_ids:
             logger.info(
                 "Bulk user load missing these %d ids (no obs or deleted): %s",
                 len(missing_user_ids),
                 ", ".join([str(id) for id in missing_user_ids]),
             )
+        if known_missing_user_ids:
+            logger.info(
+                "Bulk user load skipped %d ids known to be missing",
+                len(known_missing_user_ids),
+            )
         logger.info("Bulk user load total users loaded: %d", len(users))
 
         # Return all users that both exist and have observations as a single page.
@@ -0,0 +1,140 @@
+"""Module for the circuit breaker that fails fast while iNat is down."""
+from enum import Enum
+import logging
+from time import monotonic, time
+from typing import Optional, Tuple
+
+from attrs import define
+
+logger = logging.getLogger("red.dronefly." + __name__)
+
+# Consecutive failures (i.e. requests that couldn't connect, or were still
+# answered 502, 503 or 504, after retrying) after which the API is considered
+# down:
+FAILURE_THRESHOLD = 5
+# Seconds to fail fast before probing whether the API has recovered ...
+RESET_TIMEOUT = 30
+# ... doubled each time a probe fails, up to:
+MAX_RESET_TIMEOUT = 5 * 60
+
+
+class BreakerState(Enum):
+    """States of a CircuitBreaker."""
+
+    # Requests are sent as usual.
+    CLOSED = "closed"
+    # Requests fail fast without being sent.
+    OPEN = "open"
+    # A single probe request is sent; the rest fail fast until it's answered.
+    HALF_OPEN = "half-open"
+
+
+@define
+class BreakerStats:
+    """Counters for a CircuitBreaker."""
+
+    # Times the breaker opened, including reopening after a failed probe:
+    opened: int = 0
+    # Requests failed fast while the breaker was open:
+    rejected: int = 0
+    # Requests that failed fast, but were answered from a cached response:
+    fallbacks: int = 0
+    # Wall-clock time of the last change of state:
+    changed_at: Optional[float] = None
+    last_failure: Optional[str] = None
+
+
+class CircuitBreaker:
+    """Fail fast while the API is down, instead of piling up requests.
+
+    After `failure_threshold` consecutive failures, the breaker opens, and
+    requests fail fast for `reset_timeout` seconds. Then it lets through a
+    single probe request (half-open): if that succeeds, the breaker closes,
+    and if not, it opens again for twice as long as before.
+
+    Each request's outcome is recorded once, after it has been retried as
+    far as it will be. Any response other than a gateway or availability
+    error counts as a success, as it shows the API is answering.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+        max_reset_timeout: float = MAX_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = BreakerState.CLOSED
+        self.stats = BreakerStats()
+        self.failures = 0
+        self._timeout = reset_timeout
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the breaker next lets a probe through, if open."""
+        if self.state is not BreakerState.OPEN:
+            return 0.0
+        return max(self._opened_at + self._timeout - monotonic(), 0.0)
+
+    def admit(self) -> Tuple[bool, bool]:
+        """Should a request be sent, and is it the probe?
+
+        A request sent must have its outcome recorded after. The probe must
+        also be released if it ends without one, e.g. if it was cancelled.
+        """
+        if self.state is BreakerState.CLOSED:
+            return (True, False)
+        if self.state is BreakerState.OPEN and not self.retry_in:
+            self._set_state(BreakerState.HALF_OPEN)
+        if self.state is BreakerState.HALF_OPEN and not self._probing:
+            self._probing = True
+            return (True, True)
+        return (False, False)
+
+    def record_success(self):
+        self.failures = 0
+        self._probing = False
+        if self.state is not BreakerState.CLOSED:
+            logger.info("iNat is responding again; circuit breaker closed")
+            self._timeout = self.reset_timeout
+            self._set_state(BreakerState.CLOSED)
+
+    def record_failure(self, reason: str):
+        self.failures += 1
+        self.stats.last_failure = reason
+        if self.state is BreakerState.HALF_OPEN:
+            self._probing = False
+            self._timeout = min(self._timeout * 2, self.max_reset_timeout)
+            self._open()
+        elif (
+            self.state is BreakerState.CLOSED
+            and self.failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def release(self):
+        """Let another request probe, if the probe ended without an answer.
+
+        e.g. if it was cancelled, or failed before it was sent. Only the probe
+        may release, or a request sent before the breaker opened could let a
+        second probe through while the first is still waiting.
+        """
+        self._probing = False
+
+    def _open(self):
+        logger.warning(
+            "iNat not responding (%s); circuit breaker open for %ss",
+            self.stats.last_failure,
+            self._timeout,
+        )
+        self._opened_at = monotonic()
+        self.stats.opened += 1
+        self._set_state(BreakerState.OPEN)
+
+    def _set_state(self, state: BreakerState):
+        self.state = state
+        self.stats.changed_at = time()
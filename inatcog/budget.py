@@ -0,0 +1,103 @@
+"""Module for limiting the time and API requests spent on a command."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+from time import monotonic
+from typing import Iterator, Optional
+
+from attrs import define, field
+
+from .limiter import Priority, api_priority
+
+logger = logging.getLogger("red.dronefly." + __name__)
+
+# Seconds a command may keep a user waiting on the API, ...
+COMMAND_TIMEOUT = 20
+# ... and requests it may send, i.e. well under the per-minute rate limit, so
+# that one command can't drain the budget shared by every guild:
+COMMAND_MAX_REQUESTS = 20
+
+
+class BudgetExceeded(LookupError):
+    """Raised when a request would exceed the budget it's made under."""
+
+
+@define
+class RequestBudget:
+    """Time and API requests that may be spent on one command.
+
+    Only requests actually sent count: those answered from a cache, or that
+    share the response of an identical request in flight, are free.
+    """
+
+    timeout: Optional[float] = COMMAND_TIMEOUT
+    max_requests: Optional[int] = COMMAND_MAX_REQUESTS
+    requests: int = 0
+    # What was exceeded, if anything: "time" or "requests"
+    exceeded: Optional[str] = None
+    started_at: float = field(factory=monotonic)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None if there is no time limit."""
+        if self.timeout is None:
+            return None
+        return max(self.started_at + self.timeout - monotonic(), 0.0)
+
+    @property
+    def message(self) -> str:
+        if self.exceeded == "requests":
+            return f"stopped after {self.requests} iNat API requests"
+        return f"stopped after {self.timeout:g}s waiting on iNat"
+
+    def check(self):
+        """Raise BudgetExceeded if no time or requests are left."""
+        if self.max_requests is not None and self.requests >= self.max_requests:
+            self.exceed("requests")
+        if self.remaining() == 0:
+            self.exceed("time")
+
+    def spend(self):
+        """Count a request about to be sent, if there's budget left for it."""
+        self.check()
+        self.requests += 1
+
+    def exceed(self, exceeded: str):
+        self.exceeded = exceeded
+        logger.info("Request budget exceeded: %s", self.message)
+        raise BudgetExceeded(self.message)
+
+
+api_budget: ContextVar[Optional[RequestBudget]] = ContextVar("api_budget", default=None)
+
+
+def get_budget() -> Optional[RequestBudget]:
+    """Return the budget that API requests made now must respect, if any.
+
+    Bulk requests are exempt, as they already yield to the rest at the rate
+    limiter, and nobody is waiting on them.
+    """
+    if api_priority.get() is Priority.BULK:
+        return None
+    return api_budget.get()
+
+
+@contextmanager
+def use_budget(
+    timeout: Optional[float] = COMMAND_TIMEOUT,
+    max_requests: Optional[int] = COMMAND_MAX_REQUESTS,
+) -> Iterator[RequestBudget]:
+    """Limit the API requests made within the block.
+
+    Within a block that already has a budget, that budget applies instead, so
+    that work a command delegates can't spend more than the command may.
+    """
+    budget = api_budget.get()
+    if budget:
+        yield budget
+        return
+    budget = RequestBudget(timeout, max_requests)
+    token = api_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        api_budget.reset(token)
@@ -0,0 +1,187 @@
+"""Module for bounded, expiring caches of iNat API entities."""
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from time import monotonic, time
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+from attrs import define
+
+from .store import ResponseStore
+
+
+@define
+class CacheStats:
+    """Hit, miss, and eviction counters for a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    # Hits on stale entries, served while they are refreshed:
+    stale: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TTLCache(MutableMapping):
+    """Dict-like cache with a maximum size, time-to-live, and LRU eviction.
+
+    Callers test membership before deciding whether to fetch from the API, so
+    membership tests (`key in cache`) are what count as hits & misses. Item
+    access after a successful test (or after storing a fetched entry) is not
+    counted again.
+
+    Parameters
+    ----------
+    name: str
+        Name of the cache, for reporting.
+    max_size: int
+        Maximum number of entries; the least recently used entry is evicted
+        when the cache is full.
+    ttl: float
+        Seconds an entry remains valid after it is stored.
+    stale_ttl: float
+        Seconds past ttl that a stale entry may still be served, as long as
+        `on_stale` is given to refresh it. Only after both have passed does
+        the entry expire.
+    on_remove: Callable[[Hashable, Any], None]
+        Called with the key and old value whenever an entry is evicted,
+        expires, is deleted, or is replaced by a new value.
+    on_stale: Callable[[Hashable], None]
+        Called with the key whenever a membership test finds a stale entry,
+        which is then served as a hit, e.g. to refresh it in the background.
+    store: ResponseStore
+        Optional persistent tier. Entries are written through to it, and the
+        cache is filled from it once, by `load_stored`, after the store is
+        loaded. Entries evicted only to make room in memory are kept in the
+        store, to be loaded again after a reload.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int = 1000,
+        ttl: float = 3600,
+        on_remove: Optional[Callable[[Hashable, Any], None]] = None,
+        store: Optional[ResponseStore] = None,
+        timer: Callable[[], float] = monotonic,
+        stale_ttl: float = 0,
+        on_stale: Optional[Callable[[Hashable], None]] = None,
+    ):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        # Stale entries are only served if they'll be refreshed:
+        self.stale_ttl = stale_ttl if on_stale else 0
+        self.on_remove = on_remove
+        self.on_stale = on_stale
+        self.store = store
+        self.stats = CacheStats()
+        self._timer = timer
+        # key -> (time stored, value), least recently used first
+        self._entries: OrderedDict = OrderedDict()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self._timer() - stored_at >= self.ttl + self.stale_ttl
+
+    def _stale(self, stored_at: float) -> bool:
+        return self._timer() - stored_at >= self.ttl
+
+    def _remove(self, key: Hashable, keep_stored: bool = False):
+        _stored_at, value = self._entries.pop(key)
+        if self.store and not keep_stored:
+            self.store.delete(self.name, key)
+        if self.on_remove:
+            self.on_remove(key, value)
+
+    def _insert(self, key: Hashable, value: Any, stored_at: float):
+        if key in self._entries:
+            self._remove(key, keep_stored=True)
+        self._entries[key] = (stored_at, value)
+        while len(self._entries) > self.max_size:
+            oldest_key = next(iter(self._entries))
+            self.stats.evictions += 1
+            self._remove(oldest_key, keep_stored=True)
+
+    def load_stored(self):
+        """Fill the cache with its entries from the loaded store, if any.
+
+        Entries already in the cache, which are newer, are kept.
+        """
+        if self.store is None:
+            return
+        now = time()
+        # Oldest first, so that the newest are the ones kept if there are more
+        # than fit:
+        for key, fetched_at, value in self.store.take(self.name):
+            if key not in self._entries:
+                self._insert(key, value, self._timer() - (now - fetched_at))
+
+    def _live_entry(self, key: Hashable):
+        """Return the entry for key, dropping it if it has expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry[0]):
+            self.stats.expirations += 1
+            self._remove(key)
+            return None
+        return entry
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._live_entry(key)
+        if entry is None:
+            self.stats.misses += 1
+            return False
+        self.stats.hits += 1
+        self._entries.move_to_end(key)
+        if self.on_stale and self._stale(entry[0]):
+            self.stats.stale += 1
+            self.on_stale(key)
+        return True
+
+    def __getitem__(self, key: Hashable):
+        entry = self._live_entry(key)
+        if entry is None:
+            raise KeyError(key)
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self._insert(key, value, self._timer())
+        if self.store:
+            self.store.set(self.name, key, value)
+
+    def __delitem__(self, key: Hashable):
+        if key not in self._entries:
+            raise KeyError(key)
+        self._remove(key)
+
+    def __iter__(self) -> Iterator:
+        return iter(
+            [
+                key
+                for key, (stored_at, _value) in self._entries.items()
+                if not self._expired(stored_at)
+            ]
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, key: Hashable, default: Any = None):
+        """Return a live value without counting a lookup or refreshing recency."""
+        entry = self._entries.get(key)
+        if entry is None or self._expired(entry[0]):
+            return default
+        return entry[1]
+
+    def clear(self):
+        for key in list(self._entries):
+            self._remove(key)
+        if self.store:
+            self.store.purge_expired(self.name, 0)
@@ -1,28 +1,139 @@
 from contextlib import asynccontextmanager
-from functools import partial
-from typing import Optional, Union
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Dict, List, Optional, Type, Union
 
 import asyncio
 import discord
 from dronefly.core.clients.inat import iNatClient as CoreiNatClient
 from dronefly.core.commands import Context as DroneflyContext
+from dronefly.core.controllers.inat.observation_controller import (
+    ObservationController as CoreObservationController,
+    ObservationPaginator,
+)
+from dronefly.core.paginator import IDPaginator, Paginator
+from pyinaturalist.constants import (
+    MAX_IDS_PER_REQUEST,
+    V1_OBS_ORDER_BY_PROPERTIES,
+    MultiInt,
+)
+from pyinaturalist.controllers import TaxonController as pyiNatTaxonController
+from pyinaturalist.converters import ensure_list
+from pyinaturalist.models import Observation, T, Taxon
+from pyinaturalist.paginator import (
+    IDPaginator as pyiNatIDPaginator,
+    Paginator as pyiNatPaginator,
+)
+from pyinaturalist.request_params import validate_multiple_choice_param
+from pyinaturalist.v1 import get_observations, get_taxa_by_id
 from redbot.core import commands
 
+from .budget import get_budget
 from .config import ContextConfig
+from .executor import ClientExecutor
 from .utils import get_dronefly_user
 
+# Command contexts of the client's caller (see iNatClient.ctx & red_ctx):
+client_ctx: ContextVar[Optional[DroneflyContext]] = ContextVar(
+    "inat_client_ctx", default=None
+)
+client_red_ctx: ContextVar[Optional[commands.Context]] = ContextVar(
+    "inat_client_red_ctx", default=None
+)
+
 
 def asyncify(self, method):
     async def async_wrapper(*args, **kwargs):
-        future = self.loop.run_in_executor(None, partial(method, *args, **kwargs))
+        # Each request the call sends is counted against the caller's budget
+        # (see transport.SharedLimiter), but only here can it stop waiting.
+        budget = get_budget()
+        if budget:
+            budget.check()
+        timeout = budget.remaining() if budget else None
         try:
-            return await asyncio.wait_for(future, timeout=20)
-        except TimeoutError:
-            raise LookupError("iNaturalist API request timed out")
+            return await asyncio.wait_for(
+                self.executor.run(method, *args, **kwargs), timeout
+            )
+        except asyncio.TimeoutError:
+            if timeout is None:
+                raise
+            budget.exceed("time")
 
     return async_wrapper
 
 
+class ExecutorPaginatorMixin:
+    """Paginator that fetches its pages in the client's executor.
+
+    pyinaturalist's paginators fetch them in a thread pool of their own, made
+    for each iteration, which neither copies the caller's context (e.g. the
+    priority and budget of its API requests) nor is bounded by the client's.
+    """
+
+    def __init__(self, *args, client: "iNatClient", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.client = client
+
+    async def async_next_page(self) -> List[T]:
+        return await asyncify(self.client, self.next_page)()
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        while not self.exhausted:
+            for result in await self.async_next_page():
+                yield result
+
+
+class ExecutorPaginator(ExecutorPaginatorMixin, Paginator):
+    """Paginator with async_one, fetching its pages in the client's executor."""
+
+
+class ExecutorIDPaginator(ExecutorPaginatorMixin, IDPaginator):
+    """IDPaginator with async_one, fetching its pages in the client's executor."""
+
+
+class ExecutorObservationPaginator(ExecutorPaginatorMixin, ObservationPaginator):
+    """ObservationPaginator fetching its pages in the client's executor."""
+
+
+# Paginator class passed to paginate() -> executor-backed class made instead
+EXECUTOR_PAGINATORS: Dict[Type[pyiNatPaginator], Type[Paginator]] = {
+    pyiNatPaginator: ExecutorPaginator,
+    Paginator: ExecutorPaginator,
+    pyiNatIDPaginator: ExecutorIDPaginator,
+    IDPaginator: ExecutorIDPaginator,
+}
+
+
+class TaxonController(pyiNatTaxonController):
+    """Taxon controller making executor-backed paginators."""
+
+    def from_ids(self, taxon_ids: MultiInt, **params) -> Paginator[Taxon]:
+        params = self.client.add_defaults(get_taxa_by_id, params)
+        return ExecutorIDPaginator(
+            get_taxa_by_id,
+            Taxon,
+            ids=ensure_list(taxon_ids),
+            ids_per_request=MAX_IDS_PER_REQUEST,
+            client=self.client,
+            **params,
+        )
+
+
+class ObservationController(CoreObservationController):
+    """Observation controller making executor-backed paginators."""
+
+    def search(self, **params) -> Paginator[Observation]:
+        params = validate_multiple_choice_param(
+            params, "order_by", V1_OBS_ORDER_BY_PROPERTIES
+        )
+        params = self.client.add_defaults(get_observations, params)
+        return ExecutorObservationPaginator(
+            loop=self.client.loop,
+            annotation_callback=self.client.annotations.lookup,
+            client=self.client,
+            **params,
+        )
+
+
 async def get_dronefly_ctx(
     red_ctx: commands.Context,
     user: Optional[Union[discord.Member, discord.User]] = None,
@@ -38,13 +149,86 @@ async def get_dronefly_ctx(
 
 
 class iNatClient(CoreiNatClient):
-    def __init__(self, *args, **kwargs):
+    """Client shared by all commands, each with its own command contexts.
+
+    The contexts (`ctx` & `red_ctx`) are context-local, so that commands
+    running at once, and menu pages made later in tasks of their own, each
+    see their own instead of whichever was set last. Calls run in the
+    client's executor see those of the task that made them, and code running
+    in a task that never set them (e.g. some menu buttons) sees none, so
+    requests it makes use the default iNat parameters.
+    """
+
+    def __init__(self, *args, executor: Optional[ClientExecutor] = None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.ctx = None
-        self.red_ctx = None
+        self.executor = executor or ClientExecutor()
+
+        # Paginators are made both by paginate() and directly by some
+        # controller methods, so override those the cog uses, too.
+        self.taxa = TaxonController(self)
+        self.observations = ObservationController(self)
 
+        # dronefly-core's client runs these in the loop's default executor, so
+        # wrap their synchronous methods again to run them in ours instead.
+        for controller, name, sync_name in (
+            (self.annotations, "async_all", "all"),
+            (self.taxa, "populate", "populate"),
+            (self.observations, "taxon_summary", "taxon_summary"),
+            (self.observations, "life_list", "life_list"),
+            (self.observations, "species_count", "species_count"),
+        ):
+            method = getattr(type(controller), sync_name).__get__(controller)
+            setattr(controller, name, asyncify(self, method))
+
+        # Async counterparts of the synchronous client methods the cog uses, so
+        # that none of them send requests from the event loop thread. The
+        # rest are made async by dronefly-core's client, or return paginators
+        # that send their requests from our executor when iterated, e.g. by
+        # async_all() or async_one().
         self.projects.add_users = asyncify(self, self.projects.add_users)
         self.projects.delete_users = asyncify(self, self.projects.delete_users)
+        # i.e. `self.taxa(taxon_id)` to get a single taxon by id
+        self.taxa.async_get = asyncify(self, self.taxa.__call__)
+
+    @property
+    def ctx(self) -> Optional[DroneflyContext]:
+        return client_ctx.get()
+
+    @ctx.setter
+    def ctx(self, ctx: Optional[DroneflyContext]):
+        client_ctx.set(ctx)
+
+    @property
+    def red_ctx(self) -> Optional[commands.Context]:
+        return client_red_ctx.get()
+
+    @red_ctx.setter
+    def red_ctx(self, red_ctx: Optional[commands.Context]):
+        client_red_ctx.set(red_ctx)
+
+    def paginate(
+        self,
+        request_function: Callable,
+        model: Type[T],
+        auth: bool = False,
+        cls: Type[pyiNatPaginator] = Paginator,
+        **kwargs,
+    ) -> pyiNatPaginator[T]:
+        """Return a paginator that fetches its pages in our executor."""
+        kwargs = self.add_defaults(request_function, kwargs, auth)
+        executor_cls = EXECUTOR_PAGINATORS.get(cls)
+        if executor_cls is None:
+            # Not one the cog uses, so leave it to fetch pages its own way.
+            return cls(request_function, model, loop=self.loop, **kwargs)
+        return executor_cls(
+            request_function, model, loop=self.loop, client=self, **kwargs
+        )
+
+    async def async_count(self, paginator: pyiNatPaginator) -> int:
+        """Count paginator's results without blocking the event loop."""
+        if paginator.total_results is not None:
+            return paginator.total_results
+        return await asyncify(self, paginator.count)()
 
     @asynccontextmanager
     async def set_ctx_from_user(
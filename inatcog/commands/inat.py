@@ -2,12 +2,13 @@
 
 import json
 import pprint
+from datetime import datetime
 from typing import Optional, Union
 
 import discord
 from redbot.core import checks, commands
 from redbot.core.utils.menus import DEFAULT_CONTROLS, menu, start_adding_reactions
-from redbot.core.utils.chat_formatting import pagify
+from redbot.core.utils.chat_formatting import box, pagify
 
 from dronefly.discord.embeds import make_embed
 
@@ -42,7 +43,7 @@ class CommandsInat(INatEmbeds, MixinMeta):
 
         Just include a link to an observation in your message, and it will be looked up as if you typed `[p]obs <link>`
 
-        Only the first link per message is looked up.
+        Up to 5 links per message are looked up, shown one per page.
 
         Server mods and owners can set this up. See:
         `[p]help inat set autoobs server` and
@@ -460,6 +461,141 @@ class CommandsInat(INatEmbeds, MixinMeta):
         ):
             start_adding_reactions(msg, ["\N{THREE BUTTON MOUSE}"])
 
+    @inat.group(name="debug")
+    @checks.is_owner()
+    async def inat_debug(self, ctx):
+        """Diagnose `iNat` performance problems (owner)."""
+
+    @inat_debug.command(name="watchdog")
+    async def debug_watchdog(self, ctx, state: Optional[bool] = None):
+        """Show or set event loop stall detection.
+
+        When on, the bot is checked continuously for code that blocks it from responding, and the worst such stalls are kept for `[p]inat debug stalls`. The setting persists across restarts.
+        """  # noqa: E501
+        if state is not None:
+            await self.config.watchdog.set(state)
+            if state:
+                self.watchdog.start()
+            else:
+                self.watchdog.stop()
+        value = "on" if self.watchdog.running else "off"
+        stats = self.watchdog.stats
+        await ctx.send(
+            f"Event loop stall detection is {value}."
+            f" Lag: mean {stats.mean_lag * 1000:.1f}ms,"
+            f" max {stats.max_lag * 1000:.1f}ms;"
+            f" {stats.stalls} stall(s) over {self.watchdog.threshold}s."
+        )
+
+    @inat_debug.command(name="stalls")
+    async def debug_stalls(self, ctx, number: Optional[int] = None):
+        """Show the worst event loop stalls detected.
+
+        Stalls are listed longest first, with the command or listener that caused them. Given the *number* of a stall in the list, show the stack captured for it.
+        """  # noqa: E501
+        stalls = self.watchdog.worst()
+        if not stalls:
+            await ctx.send("No event loop stalls detected.")
+            return
+        if number is None:
+            lines = [
+                f"{i}. {stall.duration:.2f}s{'' if stall.ended else '+'}"
+                f" {stall.source}"
+                f" at {datetime.fromtimestamp(stall.detected_at):%Y-%m-%d %H:%M:%S}"
+                for i, stall in enumerate(stalls, 1)
+            ]
+        elif 1 <= number <= len(stalls):
+            lines = "".join(stalls[number - 1].stack).splitlines()
+        else:
+            await ctx.send(f"Stall number must be from 1 to {len(stalls)}.")
+            return
+        for page in pagify("\n".join(lines), shorten_by=10):
+            await ctx.send(box(page, lang="py" if number else ""))
+
+    @inat_debug.command(name="api")
+    async def debug_api(self, ctx, minutes: int = 60):
+        """Show iNat API request metrics.
+
+        Requests over the past *minutes* (up to 60) are summarized by endpoint: how many were sent, what share were answered from cache instead, median & 95th percentile latency, mean time waiting on the rate limiter, retries, and status codes. Totals since the cog loaded follow for the caches, rate limiter, and client worker threads.
+        """  # noqa: E501
+        summary = self.api.metrics.summary(max(minutes, 1) * 60)
+        lines = [
+            f"{'Endpoint':<32} {'Reqs':>5} {'Hit%':>4} {'p50':>5} {'p95':>5}"
+            f" {'Wait':>5} {'Rtry':>4} Statuses"
+        ]
+        for endpoint, metrics in sorted(
+            summary.items(), key=lambda item: item[1].requests, reverse=True
+        ):
+            statuses = " ".join(
+                f"{status}:{count}" for status, count in metrics.statuses.items()
+            )
+            lines.append(
+                f"{endpoint[:32]:<32} {metrics.requests:>5}"
+                f" {metrics.hit_ratio:>4.0%} {metrics.percentile(0.5):>5.2f}"
+                f" {metrics.percentile(0.95):>5.2f} {metrics.mean_wait:>5.2f}"
+                f" {metrics.retries:>4} {statuses}"
+            )
+        if not summary:
+            lines.append("(no requests)")
+        caches = ", ".join(
+            f"{name} {stats.hit_ratio:.0%}"
+            for name, stats in {
+                **self.api.cache_stats(),
+                self.obs_embed_cache.name: self.obs_embed_cache.stats,
+            }.items()
+            if stats.hits or stats.misses
+        )
+        waits = ", ".join(
+            f"{priority.name.lower()} {stats.acquired} mean {stats.mean_wait:.2f}s"
+            f" max {stats.max_wait:.2f}s ({stats.queued} queued)"
+            for priority, stats in self.api.api_v1_limiter.stats.items()
+        )
+        lines += ["", f"Cache hits: {caches or 'none'}", f"Limiter: {waits}"]
+        executor = self.inat_client.executor
+        lines.append(
+            f"Client threads: {executor.active_workers}/{executor.max_workers} busy,"
+            f" {executor.queue_depth} queued, mean latency"
+            f" {executor.stats.mean_latency:.2f}s"
+        )
+        for page in pagify("\n".join(lines), shorten_by=10):
+            await ctx.send(box(page))
+
+    @inat_debug.command(name="listener")
+    async def debug_listener(self, ctx):
+        """Show how messages were classified by the listener.
+
+        Messages from users are classified by cheap checks for what they may contain: an observation link (`obs_link`), a `.taxon.` lookup (`dot_taxon`), both, or `none`, in which case they're ignored without further work.
+        """  # noqa: E501
+        total = sum(self.message_classes.values())
+        lines = [f"Messages classified since the cog loaded: {total}"]
+        for message_class, count in self.message_classes.most_common():
+            lines.append(f"{str(message_class):<20} {count:>8} {count / total:>6.1%}")
+        await ctx.send(box("\n".join(lines)))
+
+    @inat_debug.command(name="breaker")
+    async def debug_breaker(self, ctx):
+        """Show the iNat API circuit breaker state.
+
+        After repeated failures to reach iNat, the breaker opens, and requests fail fast until a single probe request shows iNat has recovered.
+        """  # noqa: E501
+        breaker = self.api.breaker
+        stats = breaker.stats
+        lines = [f"Circuit breaker is {breaker.state.value}"]
+        if breaker.retry_in:
+            lines[0] += f"; probing again in {breaker.retry_in:.0f}s"
+        if stats.changed_at:
+            lines.append(
+                f"Since: {datetime.fromtimestamp(stats.changed_at):%Y-%m-%d %H:%M:%S}"
+            )
+        lines.append(f"Consecutive failures: {breaker.failures}")
+        if stats.last_failure:
+            lines.append(f"Last failure: {stats.last_failure}")
+        lines.append(
+            f"Opened {stats.opened} time(s); failed fast {stats.rejected} request(s),"
+            f" {stats.fallbacks} answered from cache"
+        )
+        await ctx.send(box("\n".join(lines)))
+
     @inat_set.command(name="bot_prefixes")
     @checks.admin_or_permissions(manage_messages=True)
     async def set_bot_prefixes(self, ctx, *, prefixes: str):
@@ -479,7 +615,7 @@ class CommandsInat(INatEmbeds, MixinMeta):
         config = self.config.guild(ctx.guild)
 
         if prefixes:
-            await config.bot_prefixes.set(prefixes)
+            await self.listener_settings.set_guild(ctx.guild, "bot_prefixes", prefixes)
         else:
             prefixes = await config.bot_prefixes()
 
@@ -504,9 +640,7 @@ class CommandsInat(INatEmbeds, MixinMeta):
         if ctx.author.bot or ctx.guild is None:
             return
 
-        config = self.config.guild(ctx.guild)
-
-        await config.listen.set(scope)
+        await self.listener_settings.set_guild(ctx.guild, "listen", scope)
         await ctx.send(f"Message listening is {LISTEN_VALUE[scope]}.")
 
     async def _set_role(self, ctx, config_item: str, role: Union[discord.Role, str]):
@@ -635,8 +769,7 @@ class CommandsInat(INatEmbeds, MixinMeta):
         if ctx.author.bot or ctx.guild is None:
             return
 
-        config = self.config.guild(ctx.guild)
-        await config.bot_prefixes.clear()
+        await self.listener_settings.clear_guild(ctx.guild, "bot_prefixes")
 
         await ctx.send("Server ignored bot prefixes cleared.")
 
@@ -672,8 +805,7 @@ class CommandsInat(INatEmbeds, MixinMeta):
         if ctx.author.bot or ctx.guild is None:
             return
 
-        config = self.config.channel(ctx.channel)
-        await config.autoobs.set(state)
+        await self.listener_settings.set_channel(ctx.channel, "autoobs", state)
 
         if state is None:
             server_state = await self.config.guild(ctx.guild).autoobs()
@@ -703,8 +835,7 @@ class CommandsInat(INatEmbeds, MixinMeta):
         if ctx.author.bot or ctx.guild is None:
             return
 
-        config = self.config.channel(ctx.channel)
-        await config.autoobs_preview.set(state)
+        await self.listener_settings.set_channel(ctx.channel, "autoobs_preview", state)
 
         if state is None:
             server_state = await self.config.guild(ctx.guild).autoobs_preview()
@@ -731,8 +862,7 @@ class CommandsInat(INatEmbeds, MixinMeta):
         if ctx.author.bot or ctx.guild is None:
             return
 
-        config = self.config.guild(ctx.guild)
-        await config.autoobs.set(state)
+        await self.listener_settings.set_guild(ctx.guild, "autoobs", state)
         await ctx.send(
             f"Server observation auto-display is {'on' if state else 'off'}."
         )
@@ -753,8 +883,7 @@ class CommandsInat(INatEmbeds, MixinMeta):
         if ctx.author.bot or ctx.guild is None:
             return
 
-        config = self.config.guild(ctx.guild)
-        await config.autoobs_preview.set(state)
+        await self.listener_settings.set_guild(ctx.guild, "autoobs_preview", state)
         await ctx.send(
             f"Server observation auto-display includes image preview is {'on' if state else 'off'}."
         )
@@ -780,8 +909,7 @@ class CommandsInat(INatEmbeds, MixinMeta):
         if ctx.author.bot or ctx.guild is None:
             return
 
-        config = self.config.channel(ctx.channel)
-        await config.dot_taxon.set(state)
+        await self.listener_settings.set_channel(ctx.channel, "dot_taxon", state)
 
         if state is None:
             server_state = await self.config.guild(ctx.guild).dot_taxon()
@@ -806,8 +934,7 @@ class CommandsInat(INatEmbeds, MixinMeta):
         if ctx.author.bot or ctx.guild is None:
             return
 
-        config = self.config.guild(ctx.guild)
-        await config.dot_taxon.set(state)
+        await self.listener_settings.set_guild(ctx.guild, "dot_taxon", state)
         await ctx.send(f"Server .taxon. lookup is {'on' if state else 'off'}.")
         return
 
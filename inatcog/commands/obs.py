@@ -35,12 +35,17 @@ from dronefly.discord.menus import (
     TaxonListSource,
 )
 from pyinaturalist import RANK_EQUIVALENTS, RANK_LEVELS
-from inatcog.menus.generic import EmbedListMenu, EmbedListSource, EmbedMenu, EmbedSource
+from inatcog.menus.generic import (
+    EmbedListMenu,
+    EmbedListSource,
+    EmbedMenu,
+    EmbedSource,
+    LazyEmbedListSource,
+)
 from redbot.core import checks, commands
 from redbot.core.commands import BadArgument
-from redbot.core.utils.menus import menu, DEFAULT_CONTROLS
 
-from ..common import grouper
+from ..api import LEADERBOARD_MAX_RECORDS
 from ..converters.reply import EmptyArgument, TaxonReplyConverter
 from ..embeds.common import apologize, add_reactions_with_cancel
 from ..embeds.inat import INatEmbed, INatEmbeds
@@ -230,7 +235,11 @@ class CommandsObs(INatEmbeds, MixinMeta):
                 observations = ctx.inat_client.observations.search(
                     limit=200, **obs_args
                 )
-                if not observations:
+                # The source counts the observations when it's made, but from
+                # the total counted here, without blocking on a request.
+                if not observations or not await ctx.inat_client.async_count(
+                    observations
+                ):
                     raise LookupError(
                         f"No observations {query_response.obs_query_description()}"
                     )
@@ -298,7 +307,7 @@ class CommandsObs(INatEmbeds, MixinMeta):
     async def top_identifiers(self, ctx, *, query: Optional[TaxonReplyConverter]):
         """Top observations IDed per IDer (alias `[p]topids`).
 
-        • Leaderboard of up to 500 top identifiers of observations matching the *query* terms not made by themselves.
+        • Leaderboard of top identifiers of observations matching the *query* terms not made by themselves.
         • Species counts shown in parentheses are per community taxon of the observations, *not* per taxon of the IDer's identifications.
         • See `[p]query` and `[p]taxon_query` for help with *query* terms.
 
@@ -318,7 +327,7 @@ class CommandsObs(INatEmbeds, MixinMeta):
     async def top_observers(self, ctx, *, query: Optional[TaxonReplyConverter]):
         """Top observations per observer (alias `[p]topobs`).
 
-        • Leaderboard of up to 500 top observers by observation count matching the *query* terms.
+        • Leaderboard of top observers by observation count matching the *query* terms.
         • See `[p]query` and `[p]taxon_query` for help with *query* terms.
 
         e.g.
@@ -336,7 +345,7 @@ class CommandsObs(INatEmbeds, MixinMeta):
     async def top_species(self, ctx, *, query: Optional[TaxonReplyConverter]):
         """Top species per observer (alias `[p]topspp`).
 
-        • Leaderboard of up to 500 top observers by species count matching the *query* terms.
+        • Leaderboard of top observers by species count matching the *query* terms.
         • See `[p]query` and `[p]taxon_query` for help with *query* terms.
 
         e.g.
@@ -528,73 +537,88 @@ class CommandsObs(INatEmbeds, MixinMeta):
             await apologize(ctx, error_msg)
 
     async def _tabulate_query(self, ctx, query, view="obs"):
-        def format_pages(user_links, users_count, entity_counted, view):
-            pages = []
-            pages_len = int((len(user_links) - 1) / 10) + 1
-            for page, links in enumerate(grouper(user_links, 10), start=1):
-                header = "**{} top {}{}{}**".format(
-                    "First 500" if users_count > 500 else users_count,
-                    entity_counted,
-                    " by species" if view == "spp" else "",
-                    f" (page {page} of {pages_len})" if pages_len > 1 else "",
-                )
-                page = "\n".join([header, TAXON_COUNTS_HEADER, *filter(None, links)])
-                pages.append(page)
-            return pages
-
-        embeds = []
+        per_page = 10
         error_msg = None
         async with ctx.typing():
             _query = query or await TaxonReplyConverter.convert(ctx, "")
             try:
                 query_response = await self.query.get(ctx, _query)
-                obs_opt_view = "identifiers" if view == "ids" else "observers"
+                leaderboard_view = "identifiers" if view == "ids" else "observers"
                 obs_opt = query_response.obs_args()
-                users = await self.api.get_observations(obs_opt_view, **obs_opt)
-                # We count identifications when we tabulate identifiers, but link
-                # to the observations tab on the web to show the observations
-                # they identified, as there's no tidy way to link directly
-                # to the identifications instead.
-                if view == "ids":
-                    obs_opt_view = "observations"
-                users_count = users.get("total_results")
+                taxon = query_response.taxon
+                species_only = (
+                    taxon and RANK_LEVELS[taxon.rank] <= RANK_LEVELS["species"]
+                )
+                leaderboard_opt = {**obs_opt}
+                if view == "spp" and not species_only:
+                    # Ranked by the API, as the leaderboard is only fetched as
+                    # far as it's paged through, so can't be sorted here.
+                    leaderboard_opt["order_by"] = "species_count"
+                leaderboard = await self.api.get_leaderboard(
+                    leaderboard_view, records=per_page, **leaderboard_opt
+                )
+                users_count = leaderboard.total_results
                 if not users_count:
                     raise LookupError(
                         f"No observations found {query_response.obs_query_description()}"
                     )
+                # We count identifications when we tabulate identifiers, but link
+                # to the observations tab on the web to show the observations
+                # they identified, as there's no tidy way to link directly
+                # to the identifications instead.
+                obs_opt_view = "observations" if view == "ids" else leaderboard_view
                 obs_opt["view"] = obs_opt_view
                 url = obs_url_from_v1(obs_opt)
-                taxon = query_response.taxon
-                species_only = (
-                    taxon and RANK_LEVELS[taxon.rank] <= RANK_LEVELS["species"]
-                )
-                user_links = get_formatted_user_counts(users, url, species_only, view)
                 query_description = query_response.obs_query_description()
                 if view == "ids":
                     entity_counted = "identifiers"
                 else:
                     entity_counted = obs_opt_view
                 full_title = f"{entity_counted.capitalize()} {query_description}"
-                pages = format_pages(user_links, users_count, entity_counted, view)
-
+                users_shown = min(users_count, LEADERBOARD_MAX_RECORDS)
+                pages_len = int((users_shown - 1) / per_page) + 1
                 summary_counts = await self.summarize_obs_spp_counts(taxon, obs_opt)
-                embeds = [
-                    make_embed(
+
+                async def make_page_embed(page):
+                    # Each page fetches more of the leaderboard only if needed.
+                    first = page * per_page
+                    last = first + per_page
+                    _leaderboard = await self.api.get_leaderboard(
+                        leaderboard_view, records=last, **leaderboard_opt
+                    )
+                    users = {"results": _leaderboard.results[first:last]}
+                    links = get_formatted_user_counts(
+                        users, url, species_only, view, first_rank=first + 1
+                    )
+                    header = "**{} top {}{}{}**".format(
+                        (
+                            f"First {users_shown:,}"
+                            if users_count > users_shown
+                            else users_count
+                        ),
+                        entity_counted,
+                        " by species" if view == "spp" else "",
+                        f" (page {page + 1} of {pages_len})" if pages_len > 1 else "",
+                    )
+                    description = "\n".join([header, TAXON_COUNTS_HEADER, *links])
+                    return make_embed(
                         title=full_title,
                         url=url,
-                        description=f"{summary_counts}\n{page}",
+                        description=f"{summary_counts}\n{description}",
                     )
-                    for page in pages
-                ]
+
+                source = LazyEmbedListSource(list(range(pages_len)), make_page_embed)
+                if pages_len == 1:
+                    embed = await source.get_page(0)
             except (BadArgument, LookupError) as err:
                 error_msg = str(err)
 
         if error_msg:
             await apologize(ctx, error_msg)
-        elif len(embeds) > 1:
-            await menu(ctx, embeds, DEFAULT_CONTROLS)
+        elif pages_len > 1:
+            await EmbedListMenu(source=source).start(ctx=ctx)
         else:
-            await ctx.send(embed=embeds[0])
+            await ctx.send(embed=embed)
 
     @commands.command(name="topids", hidden=True)
     @use_client
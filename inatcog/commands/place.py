@@ -13,6 +13,7 @@ from ..common import grouper
 from ..embeds.common import apologize
 from ..embeds.inat import INatEmbeds
 from ..interfaces import MixinMeta
+from ..limiter import Priority, use_priority
 from ..menus.generic import EmbedListMenu, EmbedListSource
 from ..places import RESERVED_PLACES
 from ..utils import get_home_server, get_hub_server, has_valid_user_config
@@ -130,7 +131,8 @@ class CommandsPlace(INatEmbeds, MixinMeta):
         for place_id_group in place_id_groups:
             try:
                 async with ctx.typing():
-                    await self.api.get_places(place_id_group)
+                    with use_priority(Priority.BULK):
+                        await self.api.get_places(place_id_group)
             except LookupError as err:
                 # Deleted places should not raise here, but should simply be dropped
                 # from the results, so this is something else (e.g. API failed to
@@ -16,6 +16,7 @@ from ..converters.base import MemberConverter
 from ..embeds.common import apologize
 from ..embeds.inat import INatEmbeds
 from ..interfaces import MixinMeta
+from ..limiter import Priority, use_priority
 from ..places import RESERVED_PLACES
 from ..utils import get_home_server, get_hub_server, has_valid_user_config
 
@@ -142,7 +143,8 @@ class CommandsProject(INatEmbeds, MixinMeta):
         for proj_id_group in proj_id_groups:
             try:
                 async with ctx.typing():
-                    await self.api.get_projects(proj_id_group)
+                    with use_priority(Priority.BULK):
+                        await self.api.get_projects(proj_id_group)
             except LookupError as err:
                 # Deleted places should not raise here, but should simply be dropped
                 # from the results, so this is something else (e.g. API failed to
@@ -208,7 +208,7 @@ class CommandsTaxon(INatEmbeds, MixinMeta):
                             #   excessive API demands
                             # - TODO: switch to using a local DB built from full taxonomy dump
                             #   so we can lift this restriction
-                            if _descendants.count() > 2500:
+                            if await ctx.inat_client.async_count(_descendants) > 2500:
                                 short_description = "Children"
                                 await ctx.send(
                                     f"Too many {self.p.plural(_per_rank)}. "
@@ -273,7 +273,7 @@ class CommandsTaxon(INatEmbeds, MixinMeta):
             if query_response:
                 base_taxon_map_url = "https://bonap.net/MapGallery/County/"
                 base_species_maps_url = "https://bonap.net/NAPA/TaxonMaps/Genus/County/"
-                taxon = ctx.inat_client.taxa(
+                taxon = await ctx.inat_client.taxa.async_get(
                     query_response.taxon.id, refresh=True, all_names=True
                 )
                 name = taxon.name
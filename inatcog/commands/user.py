@@ -699,6 +699,7 @@ class CommandsUser(INatEmbeds, MixinMeta):
         filter_roles,
         filter_emoji,
         filter_message,
+        on_progress=None,
     ):
         def abbrevs_for_user(user_id: int, event_project_ids, projects):
             return [
@@ -856,8 +857,13 @@ class CommandsUser(INatEmbeds, MixinMeta):
         # Restrict event lists to only users registered in this server, but
         # allow `,user list` to show also `known_all` users.
         anywhere = prj_id in main_event_project_ids
+
+        async def on_wait():
+            # Report progress so far while the next members' users load:
+            await on_progress(non_matching_names, matching_names)
+
         async for (dmember, iuser) in self.user_table.get_member_pairs(
-            ctx.guild, all_users, anywhere
+            ctx.guild, all_users, anywhere, on_wait=on_wait if on_progress else None
         ):
             project_abbrevs = abbrevs_for_user(iuser.id, event_project_ids, projects)
             # Candidacy for event project membership is based on one of the
@@ -1066,8 +1072,35 @@ class CommandsUser(INatEmbeds, MixinMeta):
             )
             return
 
+        if abbrev in ["active", "inactive"]:
+            list_name = f"{abbrev.capitalize()} known server members"
+        elif abbrev:
+            list_name = f"Membership report for event: {abbrev}"
+        else:
+            list_name = "Known server members"
+
         error_msg = None
         pages = []
+        message = None
+        names_shown = 0
+
+        async def show_progress(non_matching_names, matching_names):
+            # Show the first page of the names so far while the rest load,
+            # then replace it with the whole list once they have.
+            nonlocal message, names_shown
+            names = [*non_matching_names, *matching_names]
+            if len(names) == names_shown:
+                return
+            names_shown = len(names)
+            embed = make_embed(
+                title=f"{list_name} (loading, {names_shown:,} so far)",
+                description="\n".join(filter(None, names[:10])),
+            )
+            if message:
+                await message.edit(embed=embed)
+            else:
+                message = await ctx.send(embed=embed)
+
         async with ctx.typing():
             # If filter_roles are given, resulting list of names will be partitioned
             # into matching and non matching names, where "non-matching" is any
@@ -1084,6 +1117,7 @@ class CommandsUser(INatEmbeds, MixinMeta):
                     filter_roles,
                     filter_emoji,
                     filter_message,
+                    on_progress=show_progress,
                 )
                 # Placing non matching names first allows an event manager to easily
                 # spot and correct mismatches.
@@ -1095,15 +1129,12 @@ class CommandsUser(INatEmbeds, MixinMeta):
                 error_msg = str(err)
 
         if error_msg:
+            if message:
+                with contextlib.suppress(discord.HTTPException):
+                    await message.delete()
             await apologize(ctx, error_msg)
         elif pages:
             pages_len = len(pages)
-            if abbrev in ["active", "inactive"]:
-                list_name = f"{abbrev.capitalize()} known server members"
-            elif abbrev:
-                list_name = f"Membership report for event: {abbrev}"
-            else:
-                list_name = "Known server members"
             embeds = [
                 make_embed(
                     title=f"{list_name} (page {index} of {pages_len})",
@@ -1111,7 +1142,7 @@ class CommandsUser(INatEmbeds, MixinMeta):
                 )
                 for index, page in enumerate(pages, start=1)
             ]
-            await menu(ctx, embeds, DEFAULT_CONTROLS)
+            await menu(ctx, embeds, DEFAULT_CONTROLS, message=message)
         else:
             await apologize(ctx, "No known members matched.")
 
@@ -0,0 +1,61 @@
+"""Module for decoding iNat API responses."""
+import asyncio
+import json
+from typing import Any, Callable, Optional
+
+from aiohttp import ClientResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bodies this large (e.g. a page of 500 observers, or a project with thousands
+# of member user_ids) are decoded in a worker thread so that they don't hold
+# up the event loop, and with it message handling in every guild:
+THREAD_THRESHOLD = 256 * 1024
+
+
+def default_loads() -> Callable[[bytes], Any]:
+    """Return the fastest JSON decoder installed."""
+    if orjson is not None:
+        return orjson.loads
+    return json.loads
+
+
+class JSONDecoder:
+    """Decode JSON response bodies, off the event loop if they are large.
+
+    Parameters
+    ----------
+    loads: Callable[[bytes], Any]
+        Decoder for a bytes body. Defaults to orjson if installed, and
+        otherwise the standard library. Decoding errors from either are
+        instances of json.JSONDecodeError.
+    thread_threshold: int
+        Size in bytes from which a body is decoded in a worker thread.
+    """
+
+    def __init__(
+        self,
+        loads: Optional[Callable[[bytes], Any]] = None,
+        thread_threshold: int = THREAD_THRESHOLD,
+    ):
+        self.loads = loads or default_loads()
+        self.thread_threshold = thread_threshold
+
+    async def decode(self, body: bytes):
+        if len(body) >= self.thread_threshold:
+            return await asyncio.to_thread(self.loads, body)
+        return self.loads(body)
+
+    async def json(self, response: ClientResponse):
+        """Decode the response like `response.json()` does."""
+        if "json" not in (response.content_type or ""):
+            # Let aiohttp raise ContentTypeError as usual, e.g. for an HTML
+            # error page.
+            return await response.json()
+        body = await response.read()
+        if not body.strip():
+            return None
+        return await self.decode(body)
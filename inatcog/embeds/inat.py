@@ -11,7 +11,7 @@ from urllib.parse import parse_qs, urlsplit
 
 import discord
 from discord import DMChannel, File
-from dronefly.core.constants import RANK_LEVELS
+from dronefly.core.constants import INAT_DEFAULTS, RANK_LEVELS
 from dronefly.core.formatters.constants import WWW_BASE_URL
 from dronefly.core.formatters.generic import (
     format_taxon_name,
@@ -43,6 +43,7 @@ from pyinaturalist.models import Place, Taxon, User
 from redbot.core.commands import BadArgument, Context
 from redbot.core.utils.predicates import MessagePredicate
 
+from ..budget import BudgetExceeded, use_budget
 from ..embeds.common import (
     add_reactions_with_cancel,
     make_embed,
@@ -88,6 +89,11 @@ ID_BY_USER_ID_PAT = re.compile(
 )
 USER_ID_PAT = re.compile(r"\n\[[0-9 \(\)]+\]\(.*?[\?\&]user_id=(?P<user_id>\d+).*?\)")
 
+# Observation embeds built for display are reused for a few minutes, e.g. while
+# an observation is shared around, unless it's updated in the meantime:
+OBS_EMBED_CACHE_SIZE = 200
+OBS_EMBED_CACHE_TTL = 5 * 60
+
 REACTION_EMOJI = {
     "self": "\N{BUST IN SILHOUETTE}",
     "user": "\N{BUSTS IN SILHOUETTE}",
@@ -108,6 +114,13 @@ OBS_PLACE_REACTION_EMOJIS = NO_PARENT_TAXON_PLACE_REACTION_EMOJIS
 # - See https://github.com/PyCQA/pylint/issues/981
 
 
+def get_preferred_place_id(ctx) -> Optional[int]:
+    """Return the place of regional common names for the ctx's lookups."""
+    dronefly_ctx = getattr(getattr(ctx, "inat_client", None), "ctx", None)
+    defaults = dronefly_ctx.get_inat_defaults() if dronefly_ctx else INAT_DEFAULTS
+    return defaults.get("preferred_place_id")
+
+
 class INatEmbed(discord.Embed):
     """Base class for INat embeds."""
 
@@ -674,9 +687,9 @@ class INatEmbeds(MixinMeta):
         if not compact:
             taxon_summary = await ctx.inat_client.observations.taxon_summary(obs.id)
             if obs.community_taxon_id and obs.community_taxon_id != obs.taxon.id:
-                community_taxon = ctx.inat_client.taxa.from_ids(
-                    obs.community_taxon_id, limit=1
-                ).one()
+                community_taxon = await ctx.inat_client.taxa.async_get(
+                    obs.community_taxon_id
+                )
                 community_taxon_summary = (
                     await ctx.inat_client.observations.taxon_summary(
                         obs.id, community=1
@@ -750,12 +763,25 @@ class INatEmbeds(MixinMeta):
                 )
             else:
                 lang = await get_lang(ctx)
-                embed.title, summary = await self.format_obs(
-                    ctx, obs, lang=lang, with_link=True
-                )
-                if error:
-                    summary += "\n" + error
-                embed.description = summary
+                # Common names depend on the user's place as well as language.
+                key = (obs.id, preview, lang, get_preferred_place_id(ctx))
+                cached = None
+                if key in self.obs_embed_cache:
+                    cached = self.obs_embed_cache[key]
+                if cached and cached[0] == obs.updated_at:
+                    _updated_at, embed.title, embed.description = cached
+                else:
+                    embed.title, summary = await self.format_obs(
+                        ctx, obs, lang=lang, with_link=True
+                    )
+                    if error:
+                        summary += "\n" + error
+                    embed.description = summary
+                    self.obs_embed_cache[key] = (
+                        obs.updated_at,
+                        embed.title,
+                        embed.description,
+                    )
         else:
             mat = re.search(PAT_OBS_LINK, url)
             if mat:
@@ -901,9 +927,7 @@ class INatEmbeds(MixinMeta):
                 return response["total_results"]
             return "unknown"
 
-        stats = None
         rank = None
-        count = 0
 
         if category == "taxa":
             count = await get_unranked_count("species_counts")
@@ -911,39 +935,39 @@ class INatEmbeds(MixinMeta):
                 rank = "unranked"
             return (count, rank)
 
+        if category == "spp":
+            count = await get_unranked_count("species_counts", hrank="species")
+        else:
+            count = await get_unranked_count()  # obs
+        if not with_rank:
+            return (count, rank)
+        if not (isinstance(count, int) and count > 0):
+            # Not on the leaderboard, so don't page through it looking for them.
+            return (count, "unranked")
+
         kwargs = {}
         if category == "spp":
             kwargs["order_by"] = "species_count"
-        # TODO: cache for a short while so users can compare stats but not
-        # have to worry about stale data.
-        if with_rank:
-            if project_id:
-                kwargs["project_id"] = project_id
-            response = await self.api.get_observers_stats(**kwargs)
-            stats = response.get("results")
-            if stats:
-                rank = next(
-                    (
-                        index + 1
-                        for (index, d) in enumerate(stats)
-                        if d["user_id"] == user.id
-                    ),
-                    None,
-                )
-                if rank:
-                    ranked = stats[rank - 1]
-                    count = (
-                        ranked["species_count"]
-                        if category == "spp"
-                        else ranked["observation_count"]
-                    )
-        if not (with_rank and rank):
-            if category == "spp":
-                count = await get_unranked_count("species_counts", hrank="species")
-            else:
-                count = await get_unranked_count()  # obs
-        if with_rank and not rank:
-            rank = ">500" if count > 0 else "unranked"
+        if project_id:
+            kwargs["project_id"] = project_id
+        # The leaderboard is cached for a short while so users can compare
+        # stats without refetching it, and is only fetched as far as the
+        # user's count would rank them.
+        stats = await self.api.get_leaderboard(
+            "observers", user_id=user.id, user_count=count, **kwargs
+        )
+        rank = stats.rank(user.id)
+        if rank:
+            ranked = stats.get(user.id)
+            count = (
+                ranked["species_count"]
+                if category == "spp"
+                else ranked["observation_count"]
+            )
+        elif stats.complete:
+            rank = "unranked"
+        else:
+            rank = f">{len(stats.results):,}"
         return (count, rank)
 
     async def get_user_server_projects_stats(self, ctx, user):
@@ -978,15 +1002,19 @@ class INatEmbeds(MixinMeta):
                 is_member = True
             if is_member:
                 abbrev = projects_by_id[int(project_id)]
-                obs_stats = await self.get_user_project_stats(
-                    project_id, user, with_rank=False
-                )
-                spp_stats = await self.get_user_project_stats(
-                    project_id, user, category="spp", with_rank=False
-                )
-                taxa_stats = await self.get_user_project_stats(
-                    project_id, user, category="taxa", with_rank=False
-                )
+                try:
+                    obs_stats = await self.get_user_project_stats(
+                        project_id, user, with_rank=False
+                    )
+                    spp_stats = await self.get_user_project_stats(
+                        project_id, user, category="spp", with_rank=False
+                    )
+                    taxa_stats = await self.get_user_project_stats(
+                        project_id, user, category="taxa", with_rank=False
+                    )
+                except BudgetExceeded:
+                    # Return the stats for the projects done so far.
+                    break
                 emoji = event_projects[abbrev].get("emoji")
                 stats.append(
                     (project_id, abbrev, emoji, obs_stats, spp_stats, taxa_stats)
@@ -1017,7 +1045,8 @@ class INatEmbeds(MixinMeta):
             ):
                 description += f" {master_project_emoji}"
         embed = make_embed()
-        project_stats = await self.get_user_server_projects_stats(ctx, user)
+        with use_budget() as budget:
+            project_stats = await self.get_user_server_projects_stats(ctx, user)
         for (
             project_id,
             abbrev,
@@ -1048,6 +1077,8 @@ class INatEmbeds(MixinMeta):
             embed.add_field(
                 name=f"Obs / Spp / Leaf taxa ({abbrev})", value=fmt, inline=True
             )
+        if budget.exceeded:
+            description += f"\n*Some project stats not shown: {budget.message}.*"
         embed.description = description
         ids = user.identifications_count
         url = f"[{ids:,}]({WWW_BASE_URL}/identifications?user_id={user.id})"
@@ -1466,12 +1497,19 @@ class INatEmbeds(MixinMeta):
             if len(matches) > 1:
                 user_ids = ",".join(matches)
                 count_params["user_id"] = user_ids
-                formatted_counts = await format_user_taxon_counts(
-                    self,
-                    user_ids,
-                    taxon,
-                    **count_params,
-                )
+                try:
+                    with use_budget():
+                        formatted_counts = await format_user_taxon_counts(
+                            self,
+                            user_ids,
+                            taxon,
+                            **count_params,
+                        )
+                except BudgetExceeded as err:
+                    # The user's counts are updated, so show them without a
+                    # total rather than not at all.
+                    logger.info("Total omitted: %s", err)
+                    return description
                 description += f"\n{formatted_counts}"
                 return description
         return description
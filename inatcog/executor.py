@@ -0,0 +1,173 @@
+"""Module for the worker threads that run synchronous iNat client calls."""
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextvars
+from functools import partial
+import logging
+import threading
+from time import monotonic
+from typing import Callable, Optional
+
+from attrs import define, field
+
+logger = logging.getLogger("red.dronefly." + __name__)
+
+# Workers for client calls. Each one spends most of its time waiting on the
+# API, so a few are enough to keep several commands going at once, while a
+# slow iNat can never tie up more threads than this.
+MAX_WORKERS = 4
+# Calls that may wait for a worker. More than this are refused outright,
+# rather than queued behind a backlog they would most likely time out in.
+MAX_QUEUED = 32
+# Seconds a caller waits for a call to finish, including time queued:
+CALL_TIMEOUT = 20
+
+
+@define
+class ExecutorStats:
+    """Counters and timings for calls run by a ClientExecutor."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    # Calls refused because the queue was full:
+    rejected: int = 0
+    # Calls that timed out before a worker started them, and so never ran:
+    cancelled: int = 0
+    # Calls that timed out while running, whose results are discarded:
+    abandoned: int = 0
+    # Seconds from submitting to finishing calls that ran to the end:
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    # Seconds calls waited for a worker:
+    total_wait: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        finished = self.completed + self.failed
+        return self.total_latency / finished if finished else 0.0
+
+
+@define
+class _Call:
+    func: Callable
+    submitted_at: float = field(factory=monotonic)
+    started_at: Optional[float] = None
+    abandoned: bool = False
+
+
+class ClientExecutor:
+    """Bounded thread pool for synchronous iNat client calls.
+
+    Calls run in their own pool instead of the loop's default executor, which
+    Red and other cogs share, and are each run in a copy of the caller's
+    context so that e.g. the priority of their API requests (see
+    limiter.api_priority) carries over.
+
+    A call that times out before it starts is cancelled. One that is already
+    running can't be interrupted, so it is abandoned: it keeps its worker
+    until its request finishes, but its caller gets an error right away.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        max_queued: int = MAX_QUEUED,
+        timeout: float = CALL_TIMEOUT,
+    ):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.stats = ExecutorStats()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="inat-client"
+        )
+        # Guards the counts below and each call's state, which both the event
+        # loop and the workers update.
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a worker."""
+        return self._queued
+
+    @property
+    def active_workers(self) -> int:
+        """Workers running calls, including abandoned ones."""
+        return self._active
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run the call in a worker and return its result.
+
+        Raises LookupError if the queue is full or the call times out.
+        """
+        with self._lock:
+            if self._queued >= self.max_queued:
+                self.stats.rejected += 1
+                raise LookupError("iNaturalist client is too busy; try again later")
+            self._queued += 1
+            self.stats.submitted += 1
+        context = contextvars.copy_context()
+        call = _Call(partial(context.run, func, *args, **kwargs))
+        future = self._executor.submit(self._run_call, call)
+        future.add_done_callback(self._on_done)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=self.timeout
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError) as err:
+            # Either it timed out, or the caller gave up waiting on it.
+            with self._lock:
+                call.abandoned = True
+                started = call.started_at is not None
+                if started:
+                    self.stats.abandoned += 1
+                else:
+                    self.stats.cancelled += 1
+            if started:
+                logger.warning("iNat client call abandoned: %r", func)
+            if isinstance(err, asyncio.CancelledError):
+                raise
+            raise LookupError("iNaturalist API request timed out")
+
+    def _run_call(self, call: _Call):
+        with self._lock:
+            self._queued -= 1
+            if call.abandoned:
+                # Timed out just before it could be cancelled.
+                return None
+            call.started_at = monotonic()
+            self.stats.total_wait += call.started_at - call.submitted_at
+            self._active += 1
+        failed = False
+        try:
+            return call.func()
+        except Exception:
+            failed = True
+            raise
+        finally:
+            latency = monotonic() - call.submitted_at
+            with self._lock:
+                self._active -= 1
+                if not call.abandoned:
+                    if failed:
+                        self.stats.failed += 1
+                    else:
+                        self.stats.completed += 1
+                    self.stats.total_latency += latency
+                    self.stats.max_latency = max(self.stats.max_latency, latency)
+
+    def _on_done(self, future: Future):
+        if future.cancelled():
+            # Never started, so it's still counted as queued.
+            with self._lock:
+                self._queued -= 1
+
+    def shutdown(self):
+        """Cancel queued calls and stop accepting new ones.
+
+        Running calls are left to finish in the background.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
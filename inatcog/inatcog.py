@@ -2,14 +2,17 @@
 import asyncio
 import re
 from abc import ABC
+from collections import Counter
 from datetime import timedelta
 from functools import partial
 from typing import DefaultDict, Tuple
 
 import inflect
 from redbot.core import commands, Config
+from redbot.core.data_manager import cog_data_path
 from redbot.core.utils.antispam import AntiSpam
 from .api import INatAPI
+from .cache import TTLCache
 from .constants import COG_NAME
 from .client import iNatClient
 from .commands.event import CommandsEvent
@@ -22,14 +25,18 @@ from .commands.project import CommandsProject
 from .commands.search import CommandsSearch
 from .commands.taxon import CommandsTaxon
 from .commands.user import CommandsUser
+from .embeds.inat import OBS_EMBED_CACHE_SIZE, OBS_EMBED_CACHE_TTL
 from .obs_query import INatObsQuery
 from .places import INatPlaceTable
 from .projects import INatProjectTable
 from .query import INatQuery
 from .listeners import Listeners
+from .transport import SharedSession
 from .search import INatSiteSearch
+from .settings import ListenerSettings
 from .taxon_query import INatTaxonQuery
 from .users import INatUserTable
+from .watchdog import LoopWatchdog
 
 _SCHEMA_VERSION = 4
 _DEVELOPER_BOT_IDS = [614037008217800707, 620938327293558794]
@@ -76,8 +83,13 @@ class INatCog(
         super().__init__()
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1607)
-        self.api = INatAPI()
-        self.inat_client = iNatClient(loop=bot.loop, creds={"refresh": True})
+        self.api = INatAPI(cache_path=cog_data_path(self) / "api_cache.sqlite3")
+        self.inat_client = iNatClient(
+            loop=bot.loop,
+            creds={"refresh": True},
+            session=SharedSession(self.api, bot.loop),
+        )
+        self.watchdog = LoopWatchdog(bot.loop)
         self.interactions = dict()
         self.p = inflect.engine()  # pylint: disable=invalid-name
         self.obs_query = INatObsQuery(self)
@@ -89,13 +101,17 @@ class INatCog(
         self.site_search = INatSiteSearch(self)
         self.user_cache_init = {}  # Deprecated: no longer referenced
         self.reaction_locks = {}
+        self.message_classes = Counter()
+        self.obs_embed_cache = TTLCache(
+            "obs_embeds", OBS_EMBED_CACHE_SIZE, OBS_EMBED_CACHE_TTL
+        )
         self.predicate_locks = {}
         self.member_as: DefaultDict[Tuple[int, int], AntiSpam] = DefaultDict(
             partial(AntiSpam, self.spam_intervals)
         )
 
         self.config.register_global(
-            home=97394, schema_version=_SCHEMA_VERSION
+            home=97394, schema_version=_SCHEMA_VERSION, watchdog=False
         )  # North America
         self.config.register_guild(
             autoobs=False,
@@ -122,6 +138,7 @@ class INatCog(
             autoobs_preview=None,
             dot_taxon=None,
         )
+        self.listener_settings = ListenerSettings(self.config)
         self.config.register_user(
             home=None,
             inat_user_id=None,
@@ -140,9 +157,13 @@ class INatCog(
 
     async def initialize(self) -> None:
         """Initialization after bot is ready."""
+        await self.api.load_store()
         await self.bot.wait_until_ready()
         await self._migrate_config(await self.config.schema_version(), _SCHEMA_VERSION)
         await self._load_interactions()
+        await self.listener_settings.load()
+        if await self.config.watchdog():
+            self.watchdog.start()
         self._ready_event.set()
 
     async def _load_interactions(self) -> None:
@@ -218,5 +239,8 @@ class INatCog(
         if not self._cleaned_up:
             if self._init_task:
                 self._init_task.cancel()
-            await self.api.session.close()
+            await self.api.close()
+            self.inat_client.session.close()
+            self.inat_client.executor.shutdown()
+            self.watchdog.stop()
             self._cleaned_up = True
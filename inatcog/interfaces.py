@@ -2,21 +2,24 @@
 
 from abc import ABC
 from asyncio import Event
-from typing import DefaultDict, Tuple
+from typing import Counter, DefaultDict, Tuple
 
 from inflect import engine
 from redbot.core import Config
 from redbot.core.bot import Red
 from redbot.core.utils.antispam import AntiSpam
 from .api import INatAPI
+from .cache import TTLCache
 from .client import iNatClient
 from .obs_query import INatObsQuery
 from .places import INatPlaceTable
 from .projects import INatProjectTable
 from .search import INatSiteSearch
+from .settings import ListenerSettings
 from .taxon_query import INatTaxonQuery
 from .query import INatQuery
 from .users import INatUserTable
+from .watchdog import LoopWatchdog
 
 
 class MixinMeta(ABC):
@@ -46,3 +49,7 @@ class MixinMeta(ABC):
         self.member_as: DefaultDict[Tuple[int, int], AntiSpam]
         self._log_ignored_reactions: bool
         self._ready_event: Event
+        self.watchdog: LoopWatchdog
+        self.listener_settings: ListenerSettings
+        self.message_classes: Counter
+        self.obs_embed_cache: TTLCache
@@ -0,0 +1,69 @@
+"""Module for observer & identifier leaderboards."""
+from time import time
+from typing import Dict, List, Optional
+
+from attrs import define, field
+
+
+def get_result_user_id(result: dict) -> Optional[int]:
+    """Return the user id of an observers or identifiers result."""
+    # Observers results include the user_id; identifiers results only the user.
+    return result.get("user_id") or (result.get("user") or {}).get("id")
+
+
+def get_result_count(result: dict, order_by: Optional[str] = None) -> int:
+    """Return the count an observers or identifiers result is ranked by."""
+    # Identifiers results have only the one count.
+    if "count" in result:
+        return result["count"]
+    if order_by == "species_count":
+        return result["species_count"]
+    return result["observation_count"]
+
+
+@define
+class Leaderboard:
+    """Snapshot of a leaderboard, fetched a page at a time as far as needed.
+
+    Results are in the API's order (i.e. best first), and are indexed by user
+    id so that looking up a user's rank doesn't scan the whole leaderboard.
+    """
+
+    results: List[dict]
+    # Users on the leaderboard, which may exceed the results fetched:
+    total_results: int
+    fetched_at: float = field(factory=time)
+    # API pages fetched so far:
+    pages: int = 1
+    _ranks: Dict[int, int] = field(init=False, factory=dict)
+
+    def __attrs_post_init__(self):
+        self._index(0)
+
+    def _index(self, start: int):
+        for index, result in enumerate(self.results[start:], start):
+            user_id = get_result_user_id(result)
+            if user_id:
+                # Keep the best rank if pages shifted while they were fetched.
+                self._ranks.setdefault(user_id, index + 1)
+
+    def extend(self, results: List[dict]):
+        """Add the results of the next page."""
+        start = len(self.results)
+        self.results.extend(results)
+        self.pages += 1
+        self._index(start)
+
+    @property
+    def complete(self) -> bool:
+        """Were all users on the leaderboard fetched?"""
+        return len(self.results) >= self.total_results
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """Return the user's 1-based rank, or None if not fetched."""
+        return self._ranks.get(user_id)
+
+    def get(self, user_id: int) -> Optional[dict]:
+        """Return the user's result, or None if not fetched."""
+        rank = self.rank(user_id)
+        return self.results[rank - 1] if rank else None
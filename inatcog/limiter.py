@@ -0,0 +1,271 @@
+"""Module for the shared iNat API rate limiter."""
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from time import monotonic
+from typing import Dict, Optional
+from weakref import WeakKeyDictionary
+
+from attrs import define
+
+
+class Priority(IntEnum):
+    """Classes of API requests, most urgent first."""
+
+    # A user is waiting on a command or reaction.
+    INTERACTIVE = 0
+    # A message listener (e.g. autoobs, dot_taxon) is responding to chat.
+    LISTENER = 1
+    # Background work (e.g. prefetching, bulk loading) nobody is waiting on yet.
+    BULK = 2
+
+
+# Tokens in the bucket that each class may not use, keeping headroom for more
+# urgent classes so that a burst of background work never fills the bucket.
+RESERVED_TOKENS = {
+    Priority.INTERACTIVE: 0,
+    Priority.LISTENER: 5,
+    Priority.BULK: 10,
+}
+
+# When the API throttles us (HTTP 429) or asks us to retry later
+# (Retry-After), the rate is halved, down to this fraction of the full rate,
+# at most once per second (i.e. a burst of errors counts once) ...
+MIN_RATE_SCALE = 0.1
+# ... and then recovers by this fraction of the full rate per second, i.e.
+# from half rate back to full rate in 50 seconds.
+RECOVERY_PER_SEC = 0.01
+
+api_priority: ContextVar[Priority] = ContextVar(
+    "api_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def use_priority(priority: Priority):
+    """Make API requests within the block with the specified priority."""
+    token = api_priority.set(priority)
+    try:
+        yield
+    finally:
+        api_priority.reset(token)
+
+
+@define
+class LimiterStats:
+    """Queue depth and wait times for one priority class."""
+
+    queued: int = 0
+    acquired: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.acquired if self.acquired else 0.0
+
+
+class PriorityLimiter:
+    """Leaky bucket rate limiter with a separate queue per priority class.
+
+    All classes share one budget of `max_rate` requests per `time_period`
+    seconds. Whenever capacity frees up, it goes to the most urgent class
+    with requests waiting, so interactive commands jump the queue ahead of
+    listeners and bulk work.
+
+    The rate adapts to the API's responses: `throttle()` temporarily shrinks
+    it for all callers, and pauses them entirely for any Retry-After period
+    given, after which it gradually recovers to the full rate.
+
+    Acquire with `async with limiter:` to use the priority of the current
+    context (see `use_priority`), or `await limiter.acquire(priority)`. A
+    task's requests can be made more urgent later with `promote()`.
+    """
+
+    def __init__(self, max_rate: float = 50, time_period: float = 60):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self.rate_scale = 1.0
+        self.throttled = 0
+        self._level = 0.0
+        self._last_check = monotonic()
+        self._last_throttle = 0.0
+        self._blocked_until = 0.0
+        self._waiters: Dict[Priority, deque] = {
+            priority: deque() for priority in Priority
+        }
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        # task -> most urgent priority its requests are made with (see promote)
+        self._promoted: WeakKeyDictionary = WeakKeyDictionary()
+        self.stats: Dict[Priority, LimiterStats] = {
+            priority: LimiterStats() for priority in Priority
+        }
+
+    @property
+    def _rate_per_sec(self) -> float:
+        return self.max_rate / self.time_period * self.rate_scale
+
+    def _leak(self):
+        now = monotonic()
+        elapsed = now - self._last_check
+        if self._level:
+            self._level = max(self._level - elapsed * self._rate_per_sec, 0)
+        if self.rate_scale < 1:
+            self.rate_scale = min(self.rate_scale + elapsed * RECOVERY_PER_SEC, 1.0)
+        self._last_check = now
+
+    def _has_capacity(self, priority: Priority) -> bool:
+        self._leak()
+        if monotonic() < self._blocked_until:
+            return False
+        return self._level + 1 <= self.max_rate - RESERVED_TOKENS[priority]
+
+    def throttle(self, retry_after: float = 0.0):
+        """Back off after the API throttled a request or failed under load.
+
+        Parameters
+        ----------
+        retry_after: float
+            Seconds to pause all requests, e.g. from a Retry-After header.
+        """
+        self._leak()
+        now = monotonic()
+        self.throttled += 1
+        if now - self._last_throttle >= 1:
+            self.rate_scale = max(self.rate_scale / 2, MIN_RATE_SCALE)
+            self._last_throttle = now
+        self._blocked_until = max(self._blocked_until, now + retry_after)
+        if any(self._waiters.values()):
+            self._schedule_dispatch(reschedule=True)
+
+    def _take(self, priority: Priority, waited: float):
+        self._level += 1
+        stats = self.stats[priority]
+        stats.acquired += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+
+    def _dispatch(self):
+        """Hand out any capacity that has freed up, most urgent class first."""
+        self._wakeup = None
+        for priority in Priority:
+            waiters = self._waiters[priority]
+            while waiters and self._has_capacity(priority):
+                future, queued_at, _task = waiters.popleft()
+                self.stats[priority].queued -= 1
+                if not future.done():
+                    self._take(priority, monotonic() - queued_at)
+                    future.set_result(None)
+            if waiters:
+                # Less urgent classes wait until this class is served.
+                break
+        self._schedule_dispatch()
+
+    def _schedule_dispatch(self, reschedule: bool = False):
+        if self._wakeup and reschedule:
+            # A more urgent request may need to be woken sooner.
+            self._wakeup.cancel()
+            self._wakeup = None
+        if self._wakeup or not any(self._waiters.values()):
+            return
+        priority = next(priority for priority in Priority if self._waiters[priority])
+        self._leak()
+        tokens_needed = self._level + 1 - (self.max_rate - RESERVED_TOKENS[priority])
+        delay = max(
+            tokens_needed / self._rate_per_sec, self._blocked_until - monotonic(), 0
+        )
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def queue_depth(self, priority: Priority) -> int:
+        return self.stats[priority].queued
+
+    def _queue(self, priority: Priority, waiter: tuple):
+        """Queue the waiter behind those of the priority queued before it."""
+        waiters = self._waiters[priority]
+        index = next(
+            (
+                index
+                for index, (_future, queued_at, _task) in enumerate(waiters)
+                if queued_at > waiter[1]
+            ),
+            len(waiters),
+        )
+        waiters.insert(index, waiter)
+        self.stats[priority].queued += 1
+
+    def _unqueue(self, waiter: tuple) -> bool:
+        """Remove the waiter from whichever queue it's in, if any."""
+        for priority, waiters in self._waiters.items():
+            if waiter in waiters:
+                waiters.remove(waiter)
+                self.stats[priority].queued -= 1
+                return True
+        return False
+
+    def promote(self, task: asyncio.Task, priority: Priority):
+        """Make the task's requests at least as urgent as the priority.
+
+        e.g. when a more urgent caller joins in waiting on a request the task
+        is making. A request the task has queued moves to the more urgent
+        queue, behind only those queued before it, and its later requests
+        (e.g. retries) are made with that priority too.
+        """
+        promoted = self._promoted.get(task)
+        if task.done() or (promoted is not None and promoted <= priority):
+            return
+        self._promoted[task] = priority
+        moved = False
+        for queued_priority in Priority:
+            if queued_priority <= priority:
+                continue
+            for waiter in list(self._waiters[queued_priority]):
+                if waiter[2] is task:
+                    self._unqueue(waiter)
+                    self._queue(priority, waiter)
+                    moved = True
+        if moved:
+            self._schedule_dispatch(reschedule=True)
+
+    def acquire_nowait(self, priority: Optional[Priority] = None):
+        """Take a token at once, even if that overdraws the budget.
+
+        Only for callers that can't wait, e.g. synchronous requests on the
+        event loop thread. Later requests wait longer to make up for it.
+        """
+        if priority is None:
+            priority = api_priority.get()
+        self._leak()
+        self._take(priority, 0.0)
+
+    async def acquire(self, priority: Optional[Priority] = None):
+        """Wait until a request of the given priority may proceed."""
+        if priority is None:
+            priority = api_priority.get()
+        task = asyncio.current_task()
+        priority = min(priority, self._promoted.get(task, priority))
+        more_urgent_waiting = any(
+            self._waiters[_priority] for _priority in Priority if _priority <= priority
+        )
+        if not more_urgent_waiting and self._has_capacity(priority):
+            self._take(priority, 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (future, monotonic(), task)
+        self._queue(priority, waiter)
+        self._schedule_dispatch(reschedule=True)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not self._unqueue(waiter) and not future.cancelled():
+                # Granted just as we were cancelled; give the token back.
+                self._level = max(self._level - 1, 0)
+            raise
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info):
+        return None
@@ -5,6 +5,7 @@ from typing import Optional, Tuple, Union
 import asyncio
 import contextlib
 from copy import copy
+from enum import Flag, auto
 import logging
 import re
 
@@ -17,8 +18,14 @@ from .converters.base import NaturalQueryConverter
 from .embeds.common import NoRoomInDisplay
 from .embeds.inat import INatEmbed, INatEmbeds, REACTION_EMOJI
 from .interfaces import MixinMeta
-from .menus.generic import EmbedMenu, EmbedSource
-from .obs import maybe_match_obs
+from .limiter import Priority, api_priority, use_priority
+from .menus.generic import (
+    EmbedListMenu,
+    EmbedMenu,
+    EmbedSource,
+    LazyEmbedListSource,
+)
+from .obs import match_obs_links
 from dronefly.core.query import prepare_query_for_count, prepare_query_for_taxon
 from dronefly.core.query.formatters import (
     get_query_count_formatter,
@@ -37,6 +44,10 @@ logger = logging.getLogger("red.dronefly." + __name__)
 # Minimum 4 characters, first dot must not be followed by a space. Last dot
 # must not be preceded by a space.
 DOT_TAXON_PAT = re.compile(r"(^|\s)\.(?P<query>[^\s\.].{2,}?[^\s\.])\.(\s|$)")
+# Shortest text DOT_TAXON_PAT matches, e.g. ".abcd.":
+MIN_DOT_TAXON_LEN = 6
+# Shortest text PAT_OBS_LINK matches, on one of the shortest partner domains:
+MIN_OBS_LINK_LEN = len("http://inaturalist.ca/observations/1")
 KNOWN_REACTION_EMOJIS = REACTION_EMOJI.values()
 UNKNOWN_REACTION_MSG = "Not a known reaction."
 
@@ -44,6 +55,36 @@ UNKNOWN_REACTION_MSG = "Not a known reaction."
 # - See https://github.com/PyCQA/pylint/issues/981
 
 
+class MessageClass(Flag):
+    """What a message may contain for the listeners to act on."""
+
+    NONE = 0
+    OBS_LINK = auto()
+    DOT_TAXON = auto()
+
+    def __str__(self):
+        if not self:
+            return "none"
+        return "+".join(
+            member.name.lower() for member in MessageClass if member and member in self
+        )
+
+
+def classify_message(content: str) -> MessageClass:
+    """Classify a message with substring & length checks only.
+
+    A message is only a candidate for a listener if it passes these checks,
+    but may still not match once the listener applies its regex.
+    """
+    message_class = MessageClass.NONE
+    length = len(content)
+    if length >= MIN_OBS_LINK_LEN and "/observations/" in content.lower():
+        message_class |= MessageClass.OBS_LINK
+    if length >= MIN_DOT_TAXON_LEN and content.count(".") >= 2:
+        message_class |= MessageClass.DOT_TAXON
+    return message_class
+
+
 @define
 class PartialMessage:
     """Partial Message to satisfy bot & guild checks."""
@@ -79,16 +120,27 @@ class Listeners(INatEmbeds, MixinMeta):
         await self._ready_event.wait()
         if message.author.bot:
             return
+        # Most messages are rejected here, before any regex or Config read.
+        message_class = classify_message(message.content)
+        self.message_classes[message_class] += 1
+        if not message_class:
+            return
+        # Each listener runs in a task of its own, so this only affects API
+        # requests made on behalf of this message.
+        api_priority.set(Priority.LISTENER)
 
         guild = message.guild
         channel = message.channel
 
+        # Settings are read from a snapshot, so ignoring a message costs no
+        # Config reads.
+        settings = self.listener_settings.get(guild, channel)
+
         # Autoobs and dot_taxon features both need embed_links:
         if guild:
             if not channel.permissions_for(guild.me).embed_links:
                 return
-            guild_config = self.config.guild(guild)
-            server_listen_scope = await guild_config.listen()
+            server_listen_scope = settings.listen
             if server_listen_scope is False or (
                 server_listen_scope is None
                 and not isinstance(message.channel, discord.Thread)
@@ -98,72 +150,66 @@ class Listeners(INatEmbeds, MixinMeta):
             # - on_message_without_command only ignores bot prefixes for this instance
             # - implementation as suggested by Trusty:
             #   - https://cogboard.red/t/approved-dronefly/541/5?u=syntheticbee
-            bot_prefixes = await guild_config.bot_prefixes()
-
-            if bot_prefixes:
-                prefixes = r"|".join(
-                    re.escape(bot_prefix) for bot_prefix in bot_prefixes
-                )
-                prefix_pattern = re.compile(r"^({prefixes})".format(prefixes=prefixes))
-                if re.match(prefix_pattern, message.content):
-                    return
-
-        if guild:
-            channel_autoobs = await self.config.channel(channel).autoobs()
-            channel_autoobs_preview = await self.config.channel(
-                channel
-            ).autoobs_preview()
-        else:
-            # i.e. channel is a DM: always enable the feature and assume a preview image
-            # will be attached by Discord, so don't include a preview image in the
-            # observation auto-display
-            channel_autoobs = True
-            channel_autoobs_preview = False
-        if channel_autoobs is None:
-            autoobs = await guild_config.autoobs()
-        else:
-            autoobs = channel_autoobs
-        if channel_autoobs_preview is None:
-            autoobs_preview = await guild_config.autoobs_preview()
-        else:
-            autoobs = channel_autoobs
-            autoobs_preview = channel_autoobs_preview
+            # - prefixes are kept as a tuple, matched with str.startswith, which
+            #   is much cheaper than a regex for every message
+            bot_prefixes = settings.bot_prefixes
+            if bot_prefixes and message.content.startswith(bot_prefixes):
+                return
 
-        if autoobs:
+        if settings.autoobs and MessageClass.OBS_LINK in message_class:
             ctx = PartialContext(
                 self.bot, guild, channel, message.author, message, "msg autoobs", None
             )
-            obs, url = await maybe_match_obs(self, ctx, message.content)
-            if obs:
+            observations = await match_obs_links(self, ctx, message.content)
+            if observations:
                 # Only output if an observation is found
                 async with self.inat_client.set_ctx_from_user(ctx) as inat_client:
                     ctx.inat_client = inat_client
-                    embed = await self.make_obs_embed(
-                        ctx, obs, url, preview=autoobs_preview
-                    )
-                    # Add extra sound embeds to the menu initial message if any
-                    initial_message_params = {}
-                    if obs.sounds:
-                        async with self.sound_message_params(
-                            ctx.channel, obs.sounds, embed=embed
-                        ) as params:
-                            if params:
-                                initial_message_params = params
-                    if not initial_message_params:
-                        initial_message_params["embed"] = embed
-
-                    await EmbedMenu(
-                        source=EmbedSource([embed]),
-                    ).start(ctx=ctx, **initial_message_params)
+                    if len(observations) > 1:
+                        dronefly_ctx = inat_client.ctx
+
+                        async def make_page_embed(page):
+                            # Pages after the first are made as they're shown,
+                            # in the tasks handling the buttons, so give each
+                            # the context captured here, which is only set for
+                            # that task, & the listener's priority.
+                            obs, url = page
+                            async with self.inat_client.set_ctx_from_user(
+                                ctx, dronefly_ctx=dronefly_ctx
+                            ):
+                                with use_priority(Priority.LISTENER):
+                                    return await self.make_obs_embed(
+                                        ctx, obs, url, preview=settings.autoobs_preview
+                                    )
+
+                        # One page per observation, each only made if shown, as
+                        # each costs requests of its own. Sounds aren't attached,
+                        # as they can't be paged along with the embeds.
+                        await EmbedListMenu(
+                            source=LazyEmbedListSource(observations, make_page_embed),
+                        ).start(ctx=ctx)
+                    else:
+                        obs, url = observations[0]
+                        embed = await self.make_obs_embed(
+                            ctx, obs, url, preview=settings.autoobs_preview
+                        )
+                        # Add extra sound embeds to the menu initial message if any
+                        initial_message_params = {}
+                        if obs.sounds:
+                            async with self.sound_message_params(
+                                ctx.channel, obs.sounds, embed=embed
+                            ) as params:
+                                if params:
+                                    initial_message_params = params
+                        if not initial_message_params:
+                            initial_message_params["embed"] = embed
+
+                        await EmbedMenu(
+                            source=EmbedSource([embed]),
+                        ).start(ctx=ctx, **initial_message_params)
                     self.bot.dispatch("commandstats_action", ctx)
 
-        channel_dot_taxon = not guild or await self.config.channel(channel).dot_taxon()
-        if channel_dot_taxon is None:
-            dot_taxon = await guild_config.dot_taxon()
-        else:
-            dot_taxon = channel_dot_taxon
-
-        if dot_taxon:
+        if settings.dot_taxon and MessageClass.DOT_TAXON in message_class:
             mat = re.search(DOT_TAXON_PAT, message.content)
             if mat:
                 ctx = PartialContext(
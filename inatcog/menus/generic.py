@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Awaitable, Callable, Dict
 
 import discord
 from discord.ext import commands
@@ -13,6 +13,8 @@ from dronefly.discord.menus import (
     StopButton,
 )
 
+from ..embeds.common import sorry
+
 
 class EmbedSource(list[discord.Embed]):
     def __init__(self, iterable=()):
@@ -36,6 +38,34 @@ class EmbedListSource(ListPageSource):
         super().__init__(entries=entries, per_page=per_page)
 
 
+class LazyEmbedListSource(EmbedListSource):
+    """List of entries, each made into an embed only when its page is shown.
+
+    A page that can't be made (i.e. `make_embed` raises LookupError, which
+    includes running out of budget) is shown as an apology instead, and made
+    again the next time it is shown.
+    """
+
+    def __init__(
+        self, entries: list, make_embed: Callable[[Any], Awaitable[discord.Embed]]
+    ):
+        super().__init__(entries=entries, per_page=1)
+        self.make_embed = make_embed
+        self._embeds: Dict[int, discord.Embed] = {}
+
+    def is_made(self, page_number: int) -> bool:
+        return page_number in self._embeds
+
+    async def get_page(self, page_number: int) -> discord.Embed:
+        if page_number not in self._embeds:
+            entry = await super().get_page(page_number)
+            try:
+                self._embeds[page_number] = await self.make_embed(entry)
+            except LookupError as err:
+                return sorry(apology=str(err))
+        return self._embeds[page_number]
+
+
 class EmbedMenu(DiscordBaseMenu, CoreBaseMenu):
     """Generic single page view of embed(s) with stop button."""
 
@@ -112,6 +142,13 @@ class EmbedListMenu(EmbedMenu):
     async def show_page(
         self, page_number: int, interaction: discord.Interaction, selected: int = 0
     ):
+        if (
+            isinstance(self.source, LazyEmbedListSource)
+            and not self.source.is_made(page_number)
+            and not interaction.response.is_done()
+        ):
+            # Making the page may outlast the time allowed to respond.
+            await interaction.response.defer()
         embed = await self.source.get_page(page_number)
         self.current_page = page_number
         if interaction.response.is_done():
@@ -0,0 +1,136 @@
+"""Module for iNat API request metrics."""
+from bisect import bisect_left
+from collections import deque
+import re
+from time import monotonic
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+from attrs import define, field
+
+# Upper bounds in seconds of the latency histogram buckets, the last of which
+# counts everything slower:
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+# Metrics are kept in slots of this many seconds ...
+SLOT_SECONDS = 60
+# ... for the latest this many slots (i.e. a rolling hour):
+SLOTS = 60
+
+PAT_ID_SEGMENT = re.compile(r"/[\d,]+(?=/|$)")
+
+
+def get_endpoint(full_url: str) -> str:
+    """Return the url's path with ids replaced, e.g. `/v1/places/{id}`."""
+    return PAT_ID_SEGMENT.sub("/{id}", urlsplit(full_url).path)
+
+
+@define
+class EndpointMetrics:
+    """Request metrics for one endpoint."""
+
+    # Requests sent, counted by status code, or "error" if no response:
+    statuses: Dict[Union[int, str], int] = field(factory=dict)
+    # Requests answered without sending one (e.g. from the store, the
+    # negative cache, or an identical request in flight):
+    cached: int = 0
+    # Attempts beyond the first to send requests (see RETRY_EXCEPTIONS):
+    retries: int = 0
+    # Counts of requests sent, by latency (see LATENCY_BUCKETS):
+    latencies: List[int] = field(factory=lambda: [0] * len(LATENCY_BUCKETS))
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    # Seconds requests waited on the rate limiter before they were sent:
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups answered without a request."""
+        lookups = self.cached + self.requests
+        return self.cached / lookups if lookups else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.requests if self.requests else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """Return the bucket bound the fraction of latencies fall within."""
+        threshold = fraction * self.requests
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latencies):
+            seen += count
+            if count and seen >= threshold:
+                return min(bound, self.max_latency)
+        return 0.0
+
+    def add(self, other: "EndpointMetrics"):
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.cached += other.cached
+        self.retries += other.retries
+        self.latencies = [a + b for a, b in zip(self.latencies, other.latencies)]
+        self.total_latency += other.total_latency
+        self.max_latency = max(self.max_latency, other.max_latency)
+        self.total_wait += other.total_wait
+        self.max_wait = max(self.max_wait, other.max_wait)
+
+
+class RequestMetrics:
+    """Rolling metrics for API requests, by endpoint.
+
+    Metrics are recorded from the event loop only; threads must hand theirs
+    over with `loop.call_soon_threadsafe`.
+    """
+
+    def __init__(self, slot_seconds: float = SLOT_SECONDS, slots: int = SLOTS):
+        self.slot_seconds = slot_seconds
+        # (start of slot, endpoint -> metrics), oldest first
+        self._slots: deque = deque(maxlen=slots)
+
+    def _get(self, endpoint: str) -> EndpointMetrics:
+        now = monotonic()
+        if not self._slots or now - self._slots[-1][0] >= self.slot_seconds:
+            self._slots.append((now, {}))
+        return self._slots[-1][1].setdefault(endpoint, EndpointMetrics())
+
+    def record_request(
+        self,
+        endpoint: str,
+        status: Union[int, str],
+        latency: float,
+        wait: float = 0.0,
+    ):
+        """Record a request sent and its response status, or "error"."""
+        metrics = self._get(endpoint)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.latencies[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        metrics.total_latency += latency
+        metrics.max_latency = max(metrics.max_latency, latency)
+        metrics.total_wait += wait
+        metrics.max_wait = max(metrics.max_wait, wait)
+
+    def record_cached(self, endpoint: str):
+        """Record a lookup answered without sending a request."""
+        self._get(endpoint).cached += 1
+
+    def record_retry(self, endpoint: str):
+        self._get(endpoint).retries += 1
+
+    def summary(self, seconds: Optional[float] = None) -> Dict[str, EndpointMetrics]:
+        """Return metrics by endpoint for the latest seconds, or all kept."""
+        since = monotonic() - seconds if seconds else None
+        summary: Dict[str, EndpointMetrics] = {}
+        for started_at, slot in self._slots:
+            if since and started_at + self.slot_seconds < since:
+                continue
+            for endpoint, metrics in slot.items():
+                summary.setdefault(endpoint, EndpointMetrics()).add(metrics)
+        return summary
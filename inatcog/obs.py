@@ -1,6 +1,7 @@
 """Module to work with iNat observations."""
 from operator import itemgetter
 import re
+from typing import List, Tuple
 
 from dronefly.core.formatters.constants import WWW_BASE_URL
 from dronefly.core.parsers.url import PAT_OBS_LINK
@@ -8,6 +9,10 @@ from pyinaturalist.models import Observation
 
 from .utils import get_home
 
+# Most observation links looked up per message, all in a single request, so
+# that a message full of links can't spend much of the rate budget:
+MAX_OBS_LINKS = 5
+
 
 def obs_count_community_id(obs):
     idents_count = 0
@@ -68,10 +73,48 @@ async def maybe_match_obs(cog, ctx, content, id_permitted=False):
     return (obs, url)
 
 
+async def match_obs_links(
+    cog, ctx, content, max_links: int = MAX_OBS_LINKS
+) -> List[Tuple[Observation, str]]:
+    """Retrieve the observations linked to in content, in one request.
+
+    Observations are returned in the order first linked to, omitting any that
+    weren't found, up to `max_links` of them.
+    """
+    urls = {}
+    for mat in re.finditer(PAT_OBS_LINK, content):
+        urls.setdefault(int(mat["obs_id"]), mat["url"])
+        if len(urls) >= max_links:
+            break
+    if not urls:
+        return []
+    home = await get_home(ctx)
+    results = (
+        await cog.api.get_observations(
+            ",".join(str(obs_id) for obs_id in urls),
+            include_new_projects=1,
+            preferred_place_id=home,
+        )
+    )["results"]
+    observations = {result["id"]: Observation.from_json(result) for result in results}
+    return [
+        (observations[obs_id], url)
+        for obs_id, url in urls.items()
+        if obs_id in observations
+    ]
+
+
 def get_formatted_user_counts(
-    user_counts: dict, base_url: str, species_only: bool = False, view: str = "obs"
+    user_counts: dict,
+    base_url: str,
+    species_only: bool = False,
+    view: str = "obs",
+    first_rank: int = 1,
 ):
-    """Format per user observation & species counts."""
+    """Format per user observation & species counts.
+
+    The results may be any slice of the leaderboard, starting at `first_rank`.
+    """
 
     def format_observer_link(observer, species_only):
         user_id = observer["user_id"]
@@ -97,8 +140,8 @@ def get_formatted_user_counts(
 
     if view == "ids":
         identifier_links = [
-            "{}) {}".format(rank + 1, format_identifier_link(ider))
-            for rank, ider in enumerate(user_counts["results"])
+            "{}) {}".format(rank, format_identifier_link(ider))
+            for rank, ider in enumerate(user_counts["results"], first_rank)
         ]
         return identifier_links
 
@@ -111,7 +154,7 @@ def get_formatted_user_counts(
     else:
         sorted_observers = user_counts["results"]
     observer_links = [
-        "{}) {}".format(rank + 1, format_observer_link(observer, species_only))
-        for rank, observer in enumerate(sorted_observers)
+        "{}) {}".format(rank, format_observer_link(observer, species_only))
+        for rank, observer in enumerate(sorted_observers, first_rank)
     ]
     return observer_links
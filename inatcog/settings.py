@@ -0,0 +1,115 @@
+"""Module for the snapshot of message listener settings."""
+from typing import Dict, Iterable, Optional, Tuple
+
+from attrs import define
+import discord
+from redbot.core import Config
+
+# Settings read by the message listeners, which are kept in memory so that
+# deciding whether to ignore a message costs no Config reads:
+GUILD_KEYS = ("listen", "bot_prefixes", "autoobs", "autoobs_preview", "dot_taxon")
+# Channel settings are None when inherited from the server:
+CHANNEL_KEYS = ("autoobs", "autoobs_preview", "dot_taxon")
+
+
+def get_bot_prefixes(prefixes: Iterable[str]) -> Tuple[str, ...]:
+    """Return the prefixes as a tuple to match with `str.startswith`.
+
+    Each item iterated over is a prefix, i.e. each character of a str, which is
+    how `inat set bot_prefixes` stores them.
+    """
+    return tuple(dict.fromkeys(prefixes))
+
+
+def _get_value(key: str, value):
+    # Settings are snapshotted in the form the listeners use them in, i.e.
+    # prefixes ready to match, instead of compiled for every message.
+    if key == "bot_prefixes":
+        return get_bot_prefixes(value)
+    return value
+
+
+@define
+class ListenerConfig:
+    """Message listener settings for a channel, as inherited."""
+
+    # True (channels & threads), False (off), or None (threads only):
+    listen: Optional[bool]
+    # Messages starting with any of these are for other bots:
+    bot_prefixes: Tuple[str, ...]
+    autoobs: bool
+    autoobs_preview: bool
+    dot_taxon: bool
+
+
+# In DM with the bot, features are always on. Discord attaches a preview image
+# to the observation link, so the auto-display doesn't include one.
+DM_LISTENER_CONFIG = ListenerConfig(
+    listen=True, bot_prefixes=(), autoobs=True, autoobs_preview=False, dot_taxon=True
+)
+
+
+class ListenerSettings:
+    """Write-through snapshot of the guild & channel listener settings.
+
+    The snapshot is loaded once at startup. After that, the settings must be
+    changed through `set_guild`, `clear_guild`, and `set_channel` to keep it
+    up to date, not through Config directly.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        # id -> raw setting values of guilds & channels with non-default ones
+        self._guilds: Dict[int, dict] = {}
+        self._channels: Dict[int, dict] = {}
+        self._guild_defaults: dict = {}
+        self._channel_defaults: dict = {}
+
+    async def load(self):
+        guild_defaults = self.config.guild_from_id(0).defaults
+        channel_defaults = self.config.channel_from_id(0).defaults
+        self._guild_defaults = {
+            key: _get_value(key, guild_defaults[key]) for key in GUILD_KEYS
+        }
+        self._channel_defaults = {key: channel_defaults[key] for key in CHANNEL_KEYS}
+        self._guilds = {
+            int(guild_id): {
+                key: _get_value(key, values[key]) for key in GUILD_KEYS if key in values
+            }
+            for guild_id, values in (await self.config.all_guilds()).items()
+        }
+        self._channels = {
+            int(channel_id): {key: values[key] for key in CHANNEL_KEYS if key in values}
+            for channel_id, values in (await self.config.all_channels()).items()
+        }
+
+    def _get_guild(self, guild_id: int, key: str):
+        return self._guilds.get(guild_id, {}).get(key, self._guild_defaults[key])
+
+    def _get_channel(self, channel_id: int, key: str):
+        return self._channels.get(channel_id, {}).get(key, self._channel_defaults[key])
+
+    def get(
+        self, guild: Optional[discord.Guild], channel: discord.abc.Messageable
+    ) -> ListenerConfig:
+        """Return the listener settings of the channel, without any I/O."""
+        if not guild:
+            return DM_LISTENER_CONFIG
+        settings = {key: self._get_guild(guild.id, key) for key in GUILD_KEYS}
+        for key in CHANNEL_KEYS:
+            value = self._get_channel(channel.id, key)
+            if value is not None:
+                settings[key] = value
+        return ListenerConfig(**settings)
+
+    async def set_guild(self, guild: discord.Guild, key: str, value):
+        await self.config.guild(guild).set_raw(key, value=value)
+        self._guilds.setdefault(guild.id, {})[key] = _get_value(key, value)
+
+    async def clear_guild(self, guild: discord.Guild, key: str):
+        await self.config.guild(guild).clear_raw(key)
+        self._guilds.get(guild.id, {}).pop(key, None)
+
+    async def set_channel(self, channel: discord.abc.Messageable, key: str, value):
+        await self.config.channel(channel).set_raw(key, value=value)
+        self._channels.setdefault(channel.id, {})[key] = value
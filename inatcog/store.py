@@ -0,0 +1,223 @@
+"""Module for persistent storage of iNat API responses."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import sqlite3
+from time import time
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("red.dronefly." + __name__)
+
+# Pending writes are flushed in batches of this size, so that e.g. a bulk load
+# of thousands of users doesn't commit once per user.
+FLUSH_THRESHOLD = 100
+
+
+def _decode_key(encoded_key: str) -> Hashable:
+    key = json.loads(encoded_key)
+    return tuple(key) if isinstance(key, list) else key
+
+
+class ResponseStore:
+    """SQLite-backed store of API responses that survives cog reloads.
+
+    Entries are grouped by namespace (e.g. the name of an entity cache) and
+    stored with the time they were fetched, so that each namespace can honor
+    its own time-to-live when entries are read back.
+
+    The database is only ever used by the store's own thread, so that neither
+    sqlite nor JSON encoding & decoding holds up the event loop: it is read
+    once, by `load`, and after that changes are written behind in batches.
+    Until it is loaded, the store is empty.
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._db: Optional[sqlite3.Connection] = None
+        # One worker, so that writes are made in the order they're flushed:
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="inat_store"
+        )
+        # namespace -> encoded key -> (fetched_at, value), of namespaces not
+        # taken by a cache that keeps them in memory itself (see `take`)
+        self._entries: Dict[str, Dict[str, Tuple[float, Any]]] = {}
+        self._taken: Set[str] = set()
+        # (namespace, encoded key) -> (fetched_at, value, or None to delete)
+        self._pending = {}
+
+    @staticmethod
+    def _encode_key(key: Hashable) -> str:
+        # JSON keeps int user ids distinct from string logins & queries.
+        return json.dumps(key)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " value TEXT NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+        return self._db
+
+    def _read(self, ttls: Dict[str, float]) -> Dict[str, Dict[str, Tuple[float, Any]]]:
+        db = self._connect()
+        now = time()
+        db.execute(
+            "DELETE FROM responses WHERE namespace NOT IN ({})".format(
+                ",".join("?" * len(ttls))
+            ),
+            list(ttls),
+        )
+        db.executemany(
+            "DELETE FROM responses WHERE namespace = ? AND fetched_at <= ?",
+            [(namespace, now - ttl) for namespace, ttl in ttls.items()],
+        )
+        db.commit()
+        entries = {}
+        for namespace, key, fetched_at, value in db.execute(
+            "SELECT namespace, key, fetched_at, value FROM responses"
+            " ORDER BY fetched_at"
+        ):
+            try:
+                entries.setdefault(namespace, {})[key] = (fetched_at, json.loads(value))
+            except json.JSONDecodeError:
+                continue
+        return entries
+
+    async def load(self, ttls: Dict[str, float]):
+        """Read the stored entries younger than the ttl of their namespace.
+
+        Entries of other namespaces (e.g. ones no longer stored) are dropped.
+        """
+        try:
+            entries = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._read, ttls
+            )
+        except sqlite3.Error as err:
+            logger.error("Response store read failed: %s", err)
+            return
+        # Entries set while loading are newer than the stored ones:
+        for namespace, changed in self._entries.items():
+            entries.setdefault(namespace, {}).update(changed)
+        self._entries = {
+            namespace: namespace_entries
+            for namespace, namespace_entries in entries.items()
+            if namespace not in self._taken
+        }
+
+    def take(self, namespace: str) -> List[Tuple[Hashable, float, Any]]:
+        """Hand over the namespace's entries to a cache to keep from now on.
+
+        Returns (key, fetched_at, value) for each entry, oldest first. Changes
+        to the namespace are still written, but no longer kept by the store.
+        """
+        self._taken.add(namespace)
+        entries = self._entries.pop(namespace, {})
+        return [
+            (_decode_key(key), fetched_at, value)
+            for key, (fetched_at, value) in entries.items()
+        ]
+
+    def get(
+        self, namespace: str, key: Hashable, ttl: float
+    ) -> Optional[Tuple[Any, float]]:
+        """Return (value, age in seconds) if stored and younger than ttl."""
+        entry = self._entries.get(namespace, {}).get(self._encode_key(key))
+        if entry is None:
+            return None
+        fetched_at, value = entry
+        age = time() - fetched_at
+        if age >= ttl:
+            self.delete(namespace, key)
+            return None
+        return (value, age)
+
+    def set(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        fetched_at: Optional[float] = None,
+    ):
+        """Store value for key, fetched now unless otherwise specified."""
+        encoded_key = self._encode_key(key)
+        entry = (fetched_at or time(), value)
+        if namespace not in self._taken:
+            self._entries.setdefault(namespace, {})[encoded_key] = entry
+        self._pending[(namespace, encoded_key)] = entry
+        if len(self._pending) >= FLUSH_THRESHOLD:
+            self.flush()
+
+    def delete(self, namespace: str, key: Hashable):
+        encoded_key = self._encode_key(key)
+        self._entries.get(namespace, {}).pop(encoded_key, None)
+        self._pending[(namespace, encoded_key)] = (0, None)
+        if len(self._pending) >= FLUSH_THRESHOLD:
+            self.flush()
+
+    def _write(self, pending: dict):
+        # Values are encoded only now, so must not be changed once set, which
+        # cached API responses aren't.
+        try:
+            db = self._connect()
+            db.executemany(
+                "DELETE FROM responses WHERE namespace = ? AND key = ?",
+                [key for key, (_, value) in pending.items() if value is None],
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO responses (namespace, key, fetched_at, value)"
+                " VALUES (?, ?, ?, ?)",
+                [
+                    (*key, fetched_at, json.dumps(value))
+                    for key, (fetched_at, value) in pending.items()
+                    if value is not None
+                ],
+            )
+            db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as err:
+            logger.error("Response store write failed: %s", err)
+
+    def flush(self):
+        """Write all pending changes to disk, behind the caller's back."""
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = {}
+        self._executor.submit(self._write, pending)
+
+    def _purge(self, namespace: str, before: float):
+        try:
+            db = self._connect()
+            db.execute(
+                "DELETE FROM responses WHERE namespace = ? AND fetched_at <= ?",
+                (namespace, before),
+            )
+            db.commit()
+        except sqlite3.Error as err:
+            logger.error("Response store purge failed: %s", err)
+
+    def purge_expired(self, namespace: str, ttl: float):
+        """Drop entries in namespace older than ttl."""
+        before = time() - ttl
+        entries = self._entries.get(namespace, {})
+        for key in [key for key, entry in entries.items() if entry[0] <= before]:
+            del entries[key]
+        self.flush()
+        self._executor.submit(self._purge, namespace, before)
+
+    def _close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    async def close(self):
+        """Write all pending changes, then close the database."""
+        self.flush()
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close)
+        self._executor.shutdown()
@@ -5,6 +5,7 @@ from dronefly.core.formatters.generic import format_taxon_name
 from dronefly.core.query.query import Query, TaxonQuery
 from pyinaturalist.models import Taxon
 
+from .budget import BudgetExceeded, use_budget
 from .converters.base import NaturalQueryConverter
 from .taxa import get_taxon, match_taxon
 
@@ -60,6 +61,7 @@ class INatTaxonQuery:
         taxon = None
         records_read = 0
         total_records = 0
+        budget = None
 
         if locale:
             kwargs["locale"] = locale
@@ -74,45 +76,51 @@ class INatTaxonQuery:
                 kwargs["rank"] = ",".join(taxon_query.ranks)
             if ancestor_id:
                 kwargs["taxon_id"] = ancestor_id
-            for page in range(11):
-                if page == 0:
-                    per_page = 30
-                    endpoint = ctx.inat_client.taxa.autocomplete
-                else:
-                    # restart numbering, as we are using a different endpoint
-                    # now with different page size:
-                    if page == 1:
-                        records_read = 0
-                    kwargs["page"] = page
-                    per_page = 200
-                    endpoint = ctx.inat_client.taxa.search
-                kwargs["per_page"] = per_page
-                paginator = endpoint(limit=per_page, **kwargs)
-                if paginator:
-                    records = await paginator.async_all()
-                    total_records = paginator.count()
-                if not records:
-                    break
-                records_read += len(records)
-                taxon = match_taxon(
-                    taxon_query,
-                    records,
-                    scientific_name=scientific_name,
-                    locale=locale,
-                )
-                if taxon:
-                    break
-                if records_read >= total_records:
-                    break
+            with use_budget() as budget:
+                for page in range(11):
+                    if page == 0:
+                        per_page = 30
+                        endpoint = ctx.inat_client.taxa.autocomplete
+                    else:
+                        # restart numbering, as we are using a different endpoint
+                        # now with different page size:
+                        if page == 1:
+                            records_read = 0
+                        kwargs["page"] = page
+                        per_page = 200
+                        endpoint = ctx.inat_client.taxa.search
+                    kwargs["per_page"] = per_page
+                    paginator = endpoint(limit=per_page, **kwargs)
+                    try:
+                        if paginator:
+                            records = await paginator.async_all()
+                            total_records = await ctx.inat_client.async_count(paginator)
+                    except BudgetExceeded:
+                        break
+                    if not records:
+                        break
+                    records_read += len(records)
+                    taxon = match_taxon(
+                        taxon_query,
+                        records,
+                        scientific_name=scientific_name,
+                        locale=locale,
+                    )
+                    if taxon:
+                        break
+                    if records_read >= total_records:
+                        break
 
         if not taxon:
-            if records_read >= total_records:
+            exceeded = budget and budget.exceeded
+            if records_read >= total_records and not exceeded:
                 raise LookupError("No matching taxon found.")
 
             raise LookupError(
                 f"No {'exact ' if taxon_query.phrases else ''}match "
                 f"found in {'scientific name of ' if scientific_name else ''}{records_read}"
-                f" of {total_records} total records containing those terms."
+                f" of {total_records} total records containing those terms"
+                + (f" ({budget.message})." if exceeded else ".")
             )
 
         return taxon
@@ -0,0 +1,209 @@
+"""Stand-in iNat API server for offline tests and benchmarks."""
+import asyncio
+from collections import deque
+import hashlib
+import json
+from pathlib import Path
+import random
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from aiohttp import ClientSession, web
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+# Collections of records served by the endpoints that return them, filtered
+# by id where the path has them, and otherwise paged:
+COLLECTIONS = {
+    "/v1/observations": "observations",
+    "/v1/observations/observers": "observers",
+    "/v1/observations/species_counts": "species_counts",
+    "/v1/places": "places",
+    "/v1/places/autocomplete": "places",
+    "/v1/projects": "projects",
+    "/v1/projects/autocomplete": "projects",
+    "/v1/search": "search",
+    "/v1/taxa": "taxa",
+    "/v1/taxa/autocomplete": "taxa",
+    "/v1/users": "users",
+    "/v1/users/autocomplete": "users",
+}
+DEFAULT_PER_PAGE = 30
+MAX_PER_PAGE = 500
+
+
+def get_recording_name(path: str, query: Dict[str, str]) -> str:
+    """Return the fixture file name for a recorded response."""
+    key = path + "?" + "&".join(f"{k}={query[k]}" for k in sorted(query))
+    return hashlib.sha1(key.encode()).hexdigest() + ".json"
+
+
+def get_result_id(result: dict) -> Optional[int]:
+    # Observers & species counts are keyed by the id of their user or taxon.
+    if "id" in result:
+        return result["id"]
+    for key in ("user", "taxon"):
+        if key in result:
+            return result[key]["id"]
+    return None
+
+
+class FakeINatServer:
+    """Serve the iNat v1 endpoints the cog uses from fixtures.
+
+    A response recorded for the exact request (see `upstream`) is served if
+    there is one. Otherwise, the endpoint's collection of records (see
+    COLLECTIONS) is served: filtered by the ids in the path (e.g.
+    `/v1/places/1,2`) or the `user_id` parameter, and paged by `page` or
+    `id_above`, and `per_page`.
+
+    Parameters
+    ----------
+    fixtures_dir: Path
+        Directory of the collections (e.g. `places.json`), and of recorded
+        responses in `recorded/`.
+    latency: float or Callable[[], float]
+        Seconds to wait before each response, or a function returning them,
+        e.g. `lambda: random.uniform(0.1, 1.0)`.
+    error_rate: float
+        Fraction of requests answered with HTTP 500.
+    rate_limit: Tuple[int, float]
+        Most requests answered per period of seconds, after which requests
+        are answered with HTTP 429 and a Retry-After header.
+    upstream: str
+        Base url of the real API to forward requests to that aren't recorded
+        yet, recording their responses for replay.
+    seed: int
+        Seed for the random errors.
+    """
+
+    def __init__(
+        self,
+        fixtures_dir: Path = FIXTURES_DIR,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[Tuple[int, float]] = None,
+        upstream: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.upstream = upstream
+        self.random = random.Random(seed)
+        # path -> requests received, for assertions & benchmark reports
+        self.requests: Dict[str, int] = {}
+        self._answered: deque = deque()
+        self._collections: Dict[str, List[dict]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _get_collection(self, name: str) -> List[dict]:
+        if name not in self._collections:
+            path = self.fixtures_dir / f"{name}.json"
+            self._collections[name] = (
+                json.loads(path.read_text())["results"] if path.exists() else []
+            )
+        return self._collections[name]
+
+    def _is_rate_limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+        max_requests, period = self.rate_limit
+        now = monotonic()
+        while self._answered and self._answered[0] <= now - period:
+            self._answered.popleft()
+        if len(self._answered) >= max_requests:
+            return True
+        self._answered.append(now)
+        return False
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        path = "/" + request.match_info["path"]
+        query = dict(request.query)
+        self.requests[path] = self.requests.get(path, 0) + 1
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            await asyncio.sleep(latency)
+        if self._is_rate_limited():
+            return web.json_response(
+                {"error": "Too Many Requests", "status": 429},
+                status=429,
+                headers={"Retry-After": str(self.rate_limit[1])},
+            )
+        if self.error_rate and self.random.random() < self.error_rate:
+            return web.json_response(
+                {"error": "Internal Server Error", "status": 500}, status=500
+            )
+        recording = self.fixtures_dir / "recorded" / get_recording_name(path, query)
+        if recording.exists():
+            return web.json_response(json.loads(recording.read_text()))
+        if self.upstream:
+            return await self._record(path, query, recording)
+        return self._serve_collection(path, query)
+
+    async def _record(self, path: str, query: Dict[str, str], recording: Path):
+        async with ClientSession() as session:
+            async with session.get(self.upstream + path, params=query) as response:
+                json_data = await response.json()
+                if response.status == 200:
+                    recording.parent.mkdir(parents=True, exist_ok=True)
+                    recording.write_text(json.dumps(json_data))
+                return web.json_response(json_data, status=response.status)
+
+    def _serve_collection(self, path: str, query: Dict[str, str]) -> web.Response:
+        base, _, last = path.rpartition("/")
+        ids = []
+        if path not in COLLECTIONS and base in COLLECTIONS:
+            # Lookup by ids (or user login) in the path, e.g. /v1/places/1,2,
+            # answered like the API, with only the records found.
+            ids = last.split(",")
+            path = base
+        name = COLLECTIONS.get(path)
+        if not name:
+            return web.json_response({"error": "Not found", "status": 404}, status=404)
+        results = self._get_collection(name)
+        if not ids:
+            ids = [_id for _id in query.get("user_id", "").split(",") if _id]
+        if ids:
+            results = [
+                result
+                for result in results
+                if str(get_result_id(result)) in ids or result.get("login") in ids
+            ]
+        if "id_above" in query:
+            results = [r for r in results if get_result_id(r) > int(query["id_above"])]
+        per_page = min(int(query.get("per_page", DEFAULT_PER_PAGE)), MAX_PER_PAGE)
+        page = 1 if "id_above" in query else int(query.get("page", 1))
+        start = (page - 1) * per_page
+        end = start + per_page
+        return web.json_response(
+            {
+                "total_results": len(results),
+                "page": page,
+                "per_page": per_page,
+                "results": results[start:end],
+            }
+        )
@@ -1,9 +1,22 @@
 """Test inatcog.api."""
+import asyncio
+import json
+from time import monotonic
 from unittest import IsolatedAsyncioTestCase
-from unittest.mock import AsyncMock, MagicMock, patch
-from aiohttp import ClientSession
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from aiohttp import ClientSession, ServerDisconnectedError
 
-from inatcog.api import INatAPI
+from inatcog.api import (
+    API_BASE_URL,
+    CACHE_LIMITS,
+    NOT_RESPONDING_MSG,
+    THROTTLED_ATTEMPTS,
+    INatAPI,
+)
+from inatcog.breaker import FAILURE_THRESHOLD, BreakerState, CircuitBreaker
+from inatcog.budget import BudgetExceeded, use_budget
+from inatcog.embeds.inat import INatEmbeds
+from inatcog.limiter import Priority, PriorityLimiter, use_priority
 
 API_REQUESTS_PATCH = patch("aiohttp_retry.RetryClient.get")
 
@@ -11,17 +24,47 @@ API_REQUESTS_PATCH = patch("aiohttp_retry.RetryClient.get")
 class ResponseMock:
     def __init__(self, expected_result):
         self.status = 200
+        self.headers = {}
+        self.content_type = "application/json"
         self.expected_result = expected_result
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, *error_info):
-        return self
+        return None
 
     async def json(self):
         return self.expected_result
 
+    async def read(self):
+        return json.dumps(self.expected_result).encode()
+
+
+class ThrottledResponseMock(ResponseMock):
+    def __init__(self, retry_after="0"):
+        super().__init__({"error": "Too Many Requests", "status": 429})
+        self.status = 429
+        self.headers = {"Retry-After": retry_after}
+
+
+class ServerErrorResponseMock(ResponseMock):
+    def __init__(self):
+        super().__init__({"error": "Internal Server Error", "status": 500})
+        self.status = 500
+
+
+class UnavailableResponseMock(ResponseMock):
+    def __init__(self):
+        super().__init__({"error": "Service Unavailable", "status": 503})
+        self.status = 503
+
+
+class NotModifiedResponseMock(ResponseMock):
+    def __init__(self):
+        super().__init__(None)
+        self.status = 304
+
 
 # For api calls that support rate-limiting (e.g. api.get_users()):
 class AsyncSleep(MagicMock):
@@ -108,3 +151,478 @@ class TestAPI(IsolatedAsyncioTestCase):
             mock_get.return_value = ResponseMock(expected_result)
             users = await self.api.get_users("Ben Armstrong", refresh_cache=True)
             self.assertEqual(users["results"][1]["login"], "bensomebodyelse")
+
+    async def test_get_users_login_unlinked_on_expiry(self):
+        """Test login lookaside is dropped with its user entry."""
+        expected_result = {"results": [{"id": 545640, "login": "benarmstrong"}]}
+
+        with SESSION_PATCH, SLEEP_PATCH, API_REQUESTS_PATCH as mock_get:
+            mock_get.return_value = ResponseMock(expected_result)
+            await self.api.get_users(545640)
+            self.assertEqual(self.api.users_login_cache.peek("benarmstrong"), 545640)
+            del self.api.users_cache[545640]
+            self.assertIsNone(self.api.users_login_cache.peek("benarmstrong"))
+
+    async def test_get_places_revalidated(self):
+        """Test refreshing an unchanged place is answered from its validators."""
+        expected_result = {"results": [{"id": 1, "name": "Earth"}]}
+        response = ResponseMock(expected_result)
+        response.headers = {"ETag": '"abc"'}
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = [response, NotModifiedResponseMock()]
+            await self.api.get_places(1)
+            place = await self.api.get_places(1, refresh_cache=True)
+            self.assertEqual(place["results"][0]["name"], "Earth")
+            self.assertEqual(
+                mock_get.call_args.kwargs["headers"], {"If-None-Match": '"abc"'}
+            )
+            self.assertEqual(self.api.request_stats.not_modified, 1)
+
+    async def test_get_places_validators_without_body(self):
+        """Test validators are kept without the body, which is cached already."""
+        expected_result = {"results": [{"id": 1, "name": "Earth"}]}
+        response = ResponseMock(expected_result)
+        response.headers = {"ETag": '"abc"'}
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.return_value = response
+            await self.api.get_places([1, 2])
+            (validators,) = [
+                self.api.validators_cache[key] for key in self.api.validators_cache
+            ]
+            self.assertEqual(
+                validators, {"etag": '"abc"', "last_modified": None, "ids": [1]}
+            )
+            # Without the place to answer a 304 with, it's requested in full:
+            del self.api.places_cache[1]
+            await self.api.get_places([1, 2], refresh_cache=True)
+            self.assertEqual(mock_get.call_args.kwargs["headers"], {})
+
+    async def test_get_places_missing_skipped(self):
+        """Test places omitted from a batch response aren't requested again."""
+        expected_result = {"results": [{"id": 1, "name": "Earth"}]}
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.return_value = ResponseMock(expected_result)
+            places = await self.api.get_places([1, 2])
+            self.assertEqual(list(places), [1])
+            places = await self.api.get_places([1, 2])
+            self.assertEqual(list(places), [1])
+            with self.assertRaises(LookupError):
+                await self.api.get_places(2)
+            self.assertEqual(mock_get.call_count, 1)
+
+    async def test_get_places_missing_refreshed(self):
+        """Test refreshing a batch of places requests known missing ones, too."""
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.return_value = ResponseMock({"results": [{"id": 1}]})
+            await self.api.get_places([1, 2])
+            mock_get.return_value = ResponseMock({"results": [{"id": 1}, {"id": 2}]})
+            places = await self.api.get_places([1, 2], refresh_cache=True)
+            self.assertEqual(
+                mock_get.call_args.args[0], f"{API_BASE_URL}/v1/places/1,2"
+            )
+            self.assertEqual(list(places), [1, 2])
+            place = await self.api.get_places(2)
+            self.assertEqual(place["results"][0]["id"], 2)
+            self.assertEqual(mock_get.call_count, 2)
+
+    async def test_get_places_stale_refreshed(self):
+        """Test a stale place is returned at once and refreshed after."""
+        stale_place = {"results": [{"id": 1, "name": "Earth"}]}
+        fresh_place = {"results": [{"id": 1, "name": "Terra"}]}
+        stored_at = monotonic() - CACHE_LIMITS["places"][1] - 1
+        self.api.places_cache._insert(1, stale_place, stored_at)
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.return_value = ResponseMock(fresh_place)
+            place = await self.api.get_places(1)
+            self.assertEqual(place["results"][0]["name"], "Earth")
+            self.assertEqual(mock_get.call_count, 0)
+            # Wait for the background refresh:
+            self.assertEqual(len(self.api._refresh_tasks), 1)
+            await asyncio.gather(*self.api._refresh_tasks)
+            self.assertEqual(self.api._refresh_tasks, set())
+            self.assertEqual(mock_get.call_count, 1)
+            place = await self.api.get_places(1)
+            self.assertEqual(place["results"][0]["name"], "Terra")
+
+    async def test_stale_refresh_failure_logged(self):
+        """Test a background refresh that fails is logged and let go."""
+        stale_place = {"results": [{"id": 1, "name": "Earth"}]}
+        stored_at = monotonic() - CACHE_LIMITS["places"][1] - 1
+        self.api.places_cache._insert(1, stale_place, stored_at)
+
+        with patch.object(
+            self.api, "_refresh_stale", AsyncMock(side_effect=RuntimeError("boom"))
+        ), self.assertLogs("red.dronefly.inatcog.api", "ERROR") as logs:
+            await self.api.get_places(1)
+            await asyncio.gather(*self.api._refresh_tasks, return_exceptions=True)
+            # Let the done callbacks run:
+            await asyncio.sleep(0)
+        self.assertEqual(self.api._refresh_tasks, set())
+        self.assertIn("Refresh of stale places failed", logs.output[0])
+        self.assertIn("RuntimeError: boom", logs.output[0])
+
+    async def test_get_users_stale_login_refreshed(self):
+        """Test a stale user looked up by login is refreshed by login."""
+        user = {"results": [{"id": 545640, "login": "benarmstrong"}]}
+        others = {
+            "results": [
+                {"id": 545640, "login": "benarmstrong"},
+                {"id": 1, "login": "benarmstrong2"},
+            ]
+        }
+
+        def get(url, **_kwargs):
+            return ResponseMock(others if "autocomplete" in url else user)
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = get
+            await self.api.get_users("BenArmstrong", by_login_id=True)
+            stored_at = monotonic() - CACHE_LIMITS["users"][1] - 1
+            # Made stale without replacing it, which would forget its request:
+            self.api.users_cache._entries["BenArmstrong"] = (stored_at, user)
+            self.assertEqual(
+                await self.api.get_users("BenArmstrong", by_login_id=True), user
+            )
+            # Wait for the background refresh:
+            await asyncio.gather(
+                *(
+                    task
+                    for task in asyncio.all_tasks()
+                    if task is not asyncio.current_task()
+                )
+            )
+            self.assertEqual(mock_get.call_count, 2)
+            self.assertEqual(
+                mock_get.call_args.args[0], f"{API_BASE_URL}/v1/users/BenArmstrong"
+            )
+            self.assertEqual(self.api.users_cache.peek("BenArmstrong"), user)
+
+    async def test_get_observations_coalesced(self):
+        """Test identical concurrent requests share one API call."""
+        expected_result = {"results": [{"id": 1}]}
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.return_value = ResponseMock(expected_result)
+            results = await asyncio.gather(
+                self.api.get_observations(1, include_new_projects=1),
+                self.api.get_observations(1, include_new_projects=1),
+                self.api.get_observations(2, include_new_projects=1),
+            )
+            self.assertEqual(results[0], expected_result)
+            self.assertEqual(mock_get.call_count, 2)
+            self.assertEqual(self.api.request_stats.coalesced, 1)
+
+    async def test_coalesced_request_promoted(self):
+        """Test joining a queued request makes it as urgent as the caller."""
+        # i.e. 100 per second, all of them used up at the start
+        self.api.api_v1_limiter = PriorityLimiter(max_rate=11, time_period=0.11)
+        for _ in range(11):
+            await self.api.api_v1_limiter.acquire(Priority.INTERACTIVE)
+        sent = []
+
+        def get(url, **_kwargs):
+            sent.append(url.rsplit("/", 1)[-1])
+            return ResponseMock({"results": [{"id": 1}]})
+
+        def request(obs_id, priority):
+            with use_priority(priority):
+                return asyncio.create_task(self.api.get_observations(obs_id))
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = get
+            bulk = request(1, Priority.BULK)
+            listener = request(2, Priority.LISTENER)
+            # Let both reach the limiter's queues:
+            for _ in range(5):
+                await asyncio.sleep(0)
+            self.assertEqual(self.api.api_v1_limiter.queue_depth(Priority.BULK), 1)
+            # A command joins the bulk request:
+            await self.api.get_observations(1)
+            self.assertEqual(sent, ["1"])
+            self.assertFalse(listener.done())
+            await asyncio.gather(bulk, listener)
+            self.assertEqual(sent, ["1", "2"])
+
+    async def test_iter_observations_by_id_above(self):
+        """Test observations are iterated with an id_above cursor."""
+        pages = [
+            {"total_results": 5, "results": [{"id": 1}, {"id": 2}]},
+            {"total_results": 5, "results": [{"id": 3}, {"id": 4}]},
+            {"total_results": 5, "results": [{"id": 5}]},
+        ]
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = [ResponseMock(page) for page in pages]
+            ids = [
+                obs["id"]
+                async for obs in self.api.iter_observations(per_page=2, user_id=1)
+            ]
+            self.assertEqual(ids, [1, 2, 3, 4, 5])
+            self.assertEqual(mock_get.call_args.kwargs["params"]["id_above"], 4)
+
+    async def test_iter_observations_max_records(self):
+        """Test iteration stops once max_records results are returned."""
+        pages = [
+            {"total_results": 6, "results": [{"id": 1}, {"id": 2}]},
+            {"total_results": 6, "results": [{"id": 3}, {"id": 4}]},
+        ]
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = [ResponseMock(page) for page in pages]
+            ids = [
+                observer["id"]
+                async for observer in self.api.iter_observations(
+                    "observers", max_records=3, per_page=2, project_id=1
+                )
+            ]
+            self.assertEqual(ids, [1, 2, 3])
+            self.assertEqual(mock_get.call_count, 2)
+            self.assertEqual(mock_get.call_args.kwargs["params"]["page"], 2)
+
+    async def test_get_leaderboard_as_needed(self):
+        """Test leaderboard pages are fetched only as far as needed."""
+
+        def observers(first_id, count):
+            return {
+                "total_results": 1200,
+                "results": [
+                    {"user_id": user_id, "observation_count": 1}
+                    for user_id in range(first_id, first_id + count)
+                ],
+            }
+
+        pages = [observers(1, 500), observers(501, 500), observers(1001, 200)]
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = [ResponseMock(page) for page in pages]
+            leaderboard = await self.api.get_leaderboard("observers", project_id=1)
+            self.assertFalse(leaderboard.complete)
+            self.assertEqual(mock_get.call_count, 1)
+            cached = await self.api.get_leaderboard(
+                "observers", user_id=600, project_id=1
+            )
+            self.assertIs(cached, leaderboard)
+            self.assertEqual(leaderboard.rank(600), 600)
+            self.assertEqual(mock_get.call_count, 2)
+            await self.api.get_leaderboard("observers", user_id=1201, project_id=1)
+            self.assertTrue(leaderboard.complete)
+            self.assertEqual(leaderboard.rank(1100), 1100)
+            self.assertIsNone(leaderboard.rank(1201))
+            await self.api.get_leaderboard("observers", records=1200, project_id=1)
+            self.assertEqual(mock_get.call_count, 3)
+            self.assertEqual(mock_get.call_args.kwargs["params"]["page"], 3)
+
+    async def test_rank_of_absent_user(self):
+        """Test looking up a user absent from the leaderboard costs 2 requests."""
+        observers = {
+            "total_results": 5000,
+            "results": [
+                {"user_id": user_id, "observation_count": 1000 - user_id}
+                for user_id in range(1, 501)
+            ],
+        }
+        counts = {600: 800, 601: 0}
+
+        def get(url, params, **_kwargs):
+            if url.endswith("/observers"):
+                return ResponseMock(observers)
+            return ResponseMock({"total_results": counts[int(params["user_id"])]})
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = get
+            cog = Mock(api=self.api)
+            stats = await INatEmbeds.get_user_project_stats(cog, 1, Mock(id=601))
+            self.assertEqual(stats, (0, "unranked"))
+            self.assertEqual(mock_get.call_count, 1)
+            stats = await INatEmbeds.get_user_project_stats(cog, 1, Mock(id=600))
+            self.assertEqual(stats, (800, ">500"))
+            self.assertEqual(mock_get.call_count, 3)
+
+    async def test_bulk_load_users_from_observers(self):
+        """Test users are loaded in concurrent chunks with progress reported."""
+
+        def observers(url, params, **_kwargs):
+            # Every requested user has observations, except user 600:
+            user_ids = [int(user_id) for user_id in params["user_id"].split(",")]
+            return ResponseMock(
+                {
+                    "results": [
+                        {"user": {"id": user_id, "login": f"user{user_id}"}}
+                        for user_id in user_ids
+                        if user_id != 600
+                    ]
+                }
+            )
+
+        progress = []
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = observers
+            users = await self.api.bulk_load_users_from_observers(
+                [*range(1, 601), 1],
+                on_progress=lambda users, missing: progress.append(
+                    (len(users), missing)
+                ),
+            )
+            self.assertEqual(mock_get.call_count, 2)
+            self.assertEqual(users["total_results"], 599)
+            self.assertEqual(sorted(progress), [(99, [600]), (500, [])])
+            self.assertIn(self.api._get_observer_key(600), self.api.missing_cache)
+            self.assertEqual(self.api.users_login_cache.peek("user600"), None)
+            self.assertEqual(self.api.users_login_cache.peek("user599"), 599)
+
+    async def test_throttled_request_retried(self):
+        """Test a throttled request backs off and is retried."""
+        expected_result = {"results": [{"id": 1}]}
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = [
+                ThrottledResponseMock(),
+                ResponseMock(expected_result),
+            ]
+            self.assertEqual(await self.api.get_observations(1), expected_result)
+            self.assertEqual(self.api.request_stats.throttled, 1)
+            self.assertLess(self.api.api_v1_limiter.rate_scale, 1)
+
+    async def test_unavailable_retried_alone(self):
+        """Test an unavailable API backs off only the request that failed."""
+        expected_result = {"results": [{"id": 1}]}
+
+        with API_REQUESTS_PATCH as mock_get, SLEEP_PATCH as mock_sleep:
+            mock_get.side_effect = [
+                UnavailableResponseMock(),
+                ResponseMock(expected_result),
+            ]
+            self.assertEqual(await self.api.get_observations(1), expected_result)
+            mock_sleep.assert_called_once_with(2)
+            self.assertEqual(self.api.api_v1_limiter.throttled, 0)
+            self.assertEqual(self.api.api_v1_limiter.rate_scale, 1)
+
+    async def test_server_error_not_retried(self):
+        """Test a server error is retried only if the API asks for it."""
+        expected_result = {"results": [{"id": 1}]}
+
+        with API_REQUESTS_PATCH as mock_get, SLEEP_PATCH as mock_sleep:
+            mock_get.return_value = ServerErrorResponseMock()
+            with self.assertRaisesRegex(LookupError, "Internal Server Error"):
+                await self.api.get_observations(1)
+            self.assertEqual(mock_get.call_count, 1)
+            mock_sleep.assert_not_called()
+            self.assertEqual(self.api.request_stats.throttled, 0)
+
+            retry_later = ServerErrorResponseMock()
+            retry_later.headers = {"Retry-After": "0"}
+            mock_get.return_value = None
+            mock_get.side_effect = [retry_later, ResponseMock(expected_result)]
+            self.assertEqual(await self.api.get_observations(2), expected_result)
+            self.assertEqual(mock_get.call_count, 3)
+            self.assertEqual(self.api.request_stats.throttled, 1)
+
+    async def test_breaker_fails_fast_until_probe_succeeds(self):
+        """Test requests fail fast while iNat is down, until a probe succeeds."""
+        self.api.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        expected_result = {"results": [{"id": 1}]}
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = ServerDisconnectedError()
+            for obs_id in (1, 2):
+                with self.assertRaisesRegex(LookupError, "after 6 attempts"):
+                    await self.api.get_observations(obs_id)
+            self.assertEqual(self.api.breaker.state, BreakerState.OPEN)
+            with self.assertRaisesRegex(LookupError, NOT_RESPONDING_MSG):
+                await self.api.get_observations(3)
+            self.assertEqual(mock_get.call_count, 2)
+
+            mock_get.side_effect = None
+            mock_get.return_value = ResponseMock(expected_result)
+            with patch("inatcog.breaker.monotonic", return_value=monotonic() + 30):
+                self.assertEqual(await self.api.get_observations(3), expected_result)
+            self.assertEqual(self.api.breaker.state, BreakerState.CLOSED)
+            self.assertEqual(self.api.breaker.stats.rejected, 1)
+
+    async def test_breaker_not_opened_by_one_query(self):
+        """Test a failing query counts at most once towards opening the breaker."""
+        with API_REQUESTS_PATCH as mock_get, SLEEP_PATCH:
+            # Unavailable each time it's retried counts as a single failure:
+            mock_get.side_effect = lambda *_args, **_kwargs: UnavailableResponseMock()
+            with self.assertRaisesRegex(LookupError, "Service Unavailable"):
+                await self.api.get_observations(1)
+            self.assertEqual(mock_get.call_count, THROTTLED_ATTEMPTS)
+            self.assertEqual(self.api.breaker.failures, 1)
+
+            # An error the query may get on its own isn't a failure at all:
+            mock_get.side_effect = lambda *_args, **_kwargs: ServerErrorResponseMock()
+            for obs_id in range(2, FAILURE_THRESHOLD + 2):
+                with self.assertRaisesRegex(LookupError, "Internal Server Error"):
+                    await self.api.get_observations(obs_id)
+            self.assertEqual(self.api.breaker.failures, 0)
+            self.assertEqual(self.api.breaker.state, BreakerState.CLOSED)
+
+    async def test_breaker_single_probe(self):
+        """Test the breaker lets through a single probe at a time."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        opened_at = monotonic()
+        with patch("inatcog.breaker.monotonic", return_value=opened_at):
+            # Admitted while closed, so not the probe:
+            self.assertEqual(breaker.admit(), (True, False))
+            breaker.record_failure("HTTP 502")
+            self.assertEqual(breaker.state, BreakerState.OPEN)
+            self.assertEqual(breaker.admit(), (False, False))
+        with patch("inatcog.breaker.monotonic", return_value=opened_at + 30):
+            self.assertEqual(breaker.admit(), (True, True))
+            self.assertEqual(breaker.state, BreakerState.HALF_OPEN)
+            self.assertEqual(breaker.admit(), (False, False))
+            # A probe ending without an answer (e.g. cancelled) lets another
+            # request probe instead:
+            breaker.release()
+            self.assertEqual(breaker.admit(), (True, True))
+            self.assertEqual(breaker.admit(), (False, False))
+            # A probe that fails opens the breaker again, for twice as long:
+            breaker.record_failure("HTTP 503")
+            breaker.release()
+            self.assertEqual(breaker.state, BreakerState.OPEN)
+            self.assertEqual(breaker.admit(), (False, False))
+        with patch("inatcog.breaker.monotonic", return_value=opened_at + 89):
+            self.assertEqual(breaker.admit(), (False, False))
+        with patch("inatcog.breaker.monotonic", return_value=opened_at + 90):
+            self.assertEqual(breaker.admit(), (True, True))
+            # A probe that succeeds closes the breaker:
+            breaker.record_success()
+            breaker.release()
+            self.assertEqual(breaker.state, BreakerState.CLOSED)
+            self.assertEqual(breaker.admit(), (True, False))
+            self.assertEqual(breaker.stats.opened, 2)
+
+    async def test_budget_limits_requests(self):
+        """Test only requests sent count against the budget."""
+        expected_result = {"results": [{"id": 1}]}
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.return_value = ResponseMock(expected_result)
+            with use_budget(max_requests=1) as budget:
+                await asyncio.gather(
+                    self.api.get_observations(1), self.api.get_observations(1)
+                )
+                with self.assertRaises(BudgetExceeded):
+                    await self.api.get_observations(2)
+            self.assertEqual(budget.requests, 1)
+            self.assertEqual(mock_get.call_count, 1)
+
+    async def test_request_metrics(self):
+        """Test requests sent and answered without sending are recorded."""
+        expected_result = {"results": [{"id": 1}]}
+
+        with API_REQUESTS_PATCH as mock_get:
+            mock_get.side_effect = [
+                ThrottledResponseMock(),
+                ResponseMock(expected_result),
+            ]
+            await asyncio.gather(
+                self.api.get_observations(1), self.api.get_observations(1)
+            )
+        metrics = self.api.metrics.summary()["/v1/observations/{id}"]
+        self.assertEqual(metrics.statuses, {429: 1, 200: 1})
+        self.assertEqual(metrics.cached, 1)
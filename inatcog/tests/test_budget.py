@@ -0,0 +1,34 @@
+"""Test inatcog.budget."""
+from unittest import TestCase
+from unittest.mock import patch
+
+from inatcog.budget import BudgetExceeded, get_budget, use_budget
+from inatcog.limiter import Priority, use_priority
+
+
+class TestRequestBudget(TestCase):
+    def test_requests_exceeded(self):
+        """Test requests over the budget raise, and say why."""
+        with use_budget(max_requests=2) as budget:
+            budget.spend()
+            budget.spend()
+            with self.assertRaisesRegex(BudgetExceeded, "after 2 iNat API requests"):
+                budget.spend()
+        self.assertEqual(budget.exceeded, "requests")
+        self.assertIsNone(get_budget())
+
+    def test_time_exceeded(self):
+        """Test requests after the deadline raise, and say why."""
+        with use_budget(timeout=10) as budget:
+            with patch("inatcog.budget.monotonic", return_value=budget.started_at + 10):
+                with self.assertRaisesRegex(BudgetExceeded, "after 10s"):
+                    budget.check()
+        self.assertEqual(budget.exceeded, "time")
+
+    def test_nested_and_bulk(self):
+        """Test an inner budget defers to the outer, and bulk requests are exempt."""
+        with use_budget(max_requests=1) as outer:
+            with use_budget(max_requests=10) as inner:
+                self.assertIs(inner, outer)
+            with use_priority(Priority.BULK):
+                self.assertIsNone(get_budget())
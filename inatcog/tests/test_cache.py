@@ -0,0 +1,155 @@
+"""Test inatcog.cache."""
+from contextlib import closing
+from pathlib import Path
+import sqlite3
+from tempfile import TemporaryDirectory
+from time import time
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from inatcog.cache import TTLCache
+from inatcog.store import ResponseStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.removed = []
+        self.cache = TTLCache(
+            "test",
+            max_size=2,
+            ttl=10,
+            on_remove=lambda key, value: self.removed.append(key),
+            timer=self.clock,
+        )
+
+    def test_hits_and_misses(self):
+        """Test membership tests are counted."""
+        self.cache[1] = "one"
+        self.assertIn(1, self.cache)
+        self.assertNotIn(2, self.cache)
+        self.assertEqual(self.cache.stats.hits, 1)
+        self.assertEqual(self.cache.stats.misses, 1)
+
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted when full."""
+        self.cache[1] = "one"
+        self.cache[2] = "two"
+        self.assertIn(1, self.cache)
+        self.cache[3] = "three"
+        self.assertEqual(list(self.cache), [1, 3])
+        self.assertEqual(self.removed, [2])
+        self.assertEqual(self.cache.stats.evictions, 1)
+
+    def test_expiry(self):
+        """Test entries expire after their time-to-live."""
+        self.cache[1] = "one"
+        self.clock.now = 10
+        self.assertIsNone(self.cache.peek(1))
+        self.assertNotIn(1, self.cache)
+        self.assertEqual(self.removed, [1])
+        self.assertEqual(self.cache.stats.expirations, 1)
+
+    def test_replace_notifies(self):
+        """Test replacing an entry reports the old value as removed."""
+        self.cache[1] = "one"
+        self.cache[1] = "uno"
+        self.assertEqual(self.removed, [1])
+        self.assertEqual(self.cache[1], "uno")
+
+    def test_stale_served_until_hard_ttl(self):
+        """Test stale entries are served & refreshed until the hard ttl."""
+        stale_keys = []
+        cache = TTLCache(
+            "test",
+            ttl=10,
+            stale_ttl=5,
+            on_stale=stale_keys.append,
+            timer=self.clock,
+        )
+        cache[1] = "one"
+        self.clock.now = 12
+        self.assertIn(1, cache)
+        self.assertEqual(stale_keys, [1])
+        self.assertEqual(cache.stats.stale, 1)
+        self.clock.now = 15
+        self.assertNotIn(1, cache)
+
+
+class TestTTLCacheStore(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "cache.sqlite3"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_survives_reload(self):
+        """Test entries are loaded from the store by a new cache."""
+        store = ResponseStore(self.path)
+        cache = TTLCache("users", ttl=10, store=store)
+        cache[545640] = {"results": [{"login": "benarmstrong"}]}
+        cache["benarmstrong"] = 545640
+        await store.close()
+
+        store = ResponseStore(self.path)
+        cache = TTLCache("users", ttl=10, store=store)
+        await store.load({"users": 10})
+        self.assertNotIn(545640, cache)
+        cache.load_stored()
+        self.assertIn(545640, cache)
+        self.assertEqual(cache[545640]["results"][0]["login"], "benarmstrong")
+        self.assertEqual(cache.peek("benarmstrong"), 545640)
+        self.assertNotIn("545640", cache)
+        # Taken by the cache, so not kept twice:
+        self.assertIsNone(store.get("users", 545640, 10))
+        await store.close()
+
+    async def test_store_honors_ttl(self):
+        """Test stored entries older than the ttl are not loaded."""
+        store = ResponseStore(self.path)
+        store.set("places", 1, {"results": []}, fetched_at=time() - 20)
+        store.set("places", 2, {"results": []})
+        store.set("validated", 3, {"results": []})
+        await store.close()
+
+        store = ResponseStore(self.path)
+        cache = TTLCache("places", ttl=10, store=store)
+        await store.load({"places": 10})
+        cache.load_stored()
+        self.assertNotIn(1, cache)
+        self.assertIn(2, cache)
+        await store.close()
+        # Expired & no longer stored entries are dropped:
+        with closing(sqlite3.connect(self.path)) as db:
+            rows = db.execute("SELECT namespace, key FROM responses").fetchall()
+        self.assertEqual(rows, [("places", "2")])
+
+    async def test_written_behind(self):
+        """Test responses stored are served from memory & written in batches."""
+        store = ResponseStore(self.path)
+        await store.load({"/v1/places/autocomplete": 10})
+        with patch("inatcog.store.FLUSH_THRESHOLD", 2):
+            store.set("/v1/places/autocomplete", "q=a", {"results": [1]})
+            self.assertEqual(
+                store.get("/v1/places/autocomplete", "q=a", 10)[0], {"results": [1]}
+            )
+            self.assertTrue(store._pending)
+            store.set("/v1/places/autocomplete", "q=b", {"results": [2]})
+            self.assertFalse(store._pending)
+        await store.close()
+
+        store = ResponseStore(self.path)
+        await store.load({"/v1/places/autocomplete": 10})
+        self.assertEqual(
+            store.get("/v1/places/autocomplete", "q=b", 10)[0], {"results": [2]}
+        )
+        await store.close()
@@ -0,0 +1,32 @@
+"""Test inatcog.decoder."""
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from inatcog.decoder import JSONDecoder
+
+
+class TestJSONDecoder(IsolatedAsyncioTestCase):
+    async def test_decode_small_on_loop(self):
+        """Test a small body is decoded without a worker thread."""
+        decoder = JSONDecoder(loads=json.loads, thread_threshold=1024)
+        with patch("asyncio.to_thread") as mock_to_thread:
+            result = await decoder.decode(b'{"results": []}')
+            mock_to_thread.assert_not_called()
+        self.assertEqual(result, {"results": []})
+
+    async def test_decode_large_in_thread(self):
+        """Test a large body is decoded in a worker thread."""
+        decoder = JSONDecoder(loads=json.loads, thread_threshold=8)
+        body = json.dumps({"results": [{"id": 1}] * 10}).encode()
+        with patch("asyncio.to_thread", wraps=asyncio.to_thread) as mock:
+            result = await decoder.decode(body)
+            mock.assert_called_once()
+        self.assertEqual(len(result["results"]), 10)
+
+    async def test_decode_error(self):
+        """Test either decoder raises the standard JSONDecodeError."""
+        decoder = JSONDecoder()
+        with self.assertRaises(json.JSONDecodeError):
+            await decoder.decode(b"{not json")
@@ -1,5 +1,9 @@
+from datetime import datetime
+from inatcog.cache import TTLCache
 from inatcog.embeds import common as embeds
+from inatcog.embeds.inat import INatEmbeds
 import unittest
+from unittest.mock import AsyncMock, Mock, patch
 
 
 class TestEmbeds(unittest.TestCase):
@@ -21,3 +25,29 @@ class TestEmbeds(unittest.TestCase):
 
         self.assertEqual("Sorry", test_sorry_2.title)
         self.assertEqual("x", test_sorry_2.description)
+
+
+class TestObsEmbedCache(unittest.IsolatedAsyncioTestCase):
+    async def test_make_obs_embed(self):
+        """Test observation embeds are reused until the observation is updated."""
+        cog = Mock(
+            obs_embed_cache=TTLCache("obs_embeds", 10, 60),
+            format_obs=AsyncMock(return_value=("Title", "Summary")),
+        )
+        obs = Mock(id=1, updated_at=datetime(2024, 1, 1), photos=[])
+        url = "https://www.inaturalist.org/observations/1"
+        with patch("inatcog.embeds.inat.get_lang", AsyncMock(return_value="en")):
+            for _ in range(2):
+                embed = await INatEmbeds.make_obs_embed(cog, None, obs, url, False)
+                self.assertEqual(embed.description, "Summary")
+            self.assertEqual(cog.format_obs.await_count, 1)
+            obs.updated_at = datetime(2024, 1, 2)
+            await INatEmbeds.make_obs_embed(cog, None, obs, url, False)
+            await INatEmbeds.make_obs_embed(cog, None, obs, url, True)
+            self.assertEqual(cog.format_obs.await_count, 3)
+            # Common names for a user elsewhere may differ:
+            dronefly_ctx = Mock()
+            dronefly_ctx.get_inat_defaults.return_value = {"preferred_place_id": 6712}
+            ctx = Mock(inat_client=Mock(ctx=dronefly_ctx))
+            await INatEmbeds.make_obs_embed(cog, ctx, obs, url, True)
+        self.assertEqual(cog.format_obs.await_count, 4)
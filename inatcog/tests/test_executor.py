@@ -0,0 +1,106 @@
+"""Test inatcog.executor."""
+import asyncio
+from contextvars import ContextVar
+import threading
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock
+
+from pyinaturalist.models import Taxon
+
+from inatcog.client import ExecutorPaginator, ExecutorPaginatorMixin, iNatClient
+from inatcog.executor import ClientExecutor
+
+caller = ContextVar("caller", default=None)
+
+
+class TestClientExecutor(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.executor = ClientExecutor(max_workers=1, max_queued=1, timeout=0.1)
+        self.release = threading.Event()
+
+    async def asyncTearDown(self):
+        self.release.set()
+        self.executor.shutdown()
+
+    async def test_run_in_callers_context(self):
+        """Test a call runs in a worker with the caller's context."""
+        caller.set("test")
+        result = await self.executor.run(
+            lambda: (caller.get(), threading.current_thread().name)
+        )
+        self.assertEqual(result[0], "test")
+        self.assertTrue(result[1].startswith("inat-client"))
+        self.assertEqual(self.executor.stats.completed, 1)
+        self.assertEqual(self.executor.active_workers, 0)
+
+    async def test_timed_out_calls(self):
+        """Test timed out calls are abandoned or cancelled, and queue is bounded."""
+        ran = []
+        running = asyncio.create_task(self.executor.run(self.release.wait))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(self.executor.run(ran.append, 1))
+        await asyncio.sleep(0)
+        self.assertEqual(self.executor.active_workers, 1)
+        self.assertEqual(self.executor.queue_depth, 1)
+        with self.assertRaisesRegex(LookupError, "too busy"):
+            await self.executor.run(ran.append, 2)
+        for task in (running, queued):
+            with self.assertRaisesRegex(LookupError, "timed out"):
+                await task
+        self.assertEqual(self.executor.stats.abandoned, 1)
+        self.assertEqual(self.executor.stats.cancelled, 1)
+        self.assertEqual(self.executor.stats.rejected, 1)
+        self.assertEqual(self.executor.queue_depth, 0)
+        self.release.set()
+        self.assertTrue(await self.executor.run(lambda: True))
+        self.assertEqual(ran, [])
+
+    async def test_paginator_in_executor(self):
+        """Test paginators fetch their pages in the caller's context."""
+
+        def get_taxa(**params):
+            return {
+                "results": [{"id": 1, "name": caller.get()}],
+                "total_results": 1,
+                "page": 1,
+                "per_page": 30,
+            }
+
+        caller.set("test")
+        paginator = ExecutorPaginator(
+            get_taxa, Taxon, client=Mock(executor=self.executor)
+        )
+        taxa = await paginator.async_all()
+        self.assertEqual([taxon.name for taxon in taxa], ["test"])
+        self.assertEqual(self.executor.stats.completed, 1)
+
+    async def test_client_paginators_in_executor(self):
+        """Test the client's paginators all fetch their pages in its executor."""
+        client = iNatClient(executor=self.executor)
+        for paginator in (
+            client.taxa.from_ids(1),
+            client.taxa.autocomplete(q="test"),
+            client.observations.search(user_id=1),
+            client.projects.from_ids(1),
+        ):
+            self.assertIsInstance(paginator, ExecutorPaginatorMixin)
+            self.assertIs(paginator.client, client)
+
+    async def test_client_ctx_per_task(self):
+        """Test each task, and its calls in the executor, sees its own client ctx."""
+        client = iNatClient(executor=self.executor)
+
+        async def command(dronefly_ctx):
+            client.ctx = dronefly_ctx
+            await asyncio.sleep(0)
+            return (client.ctx, await self.executor.run(lambda: client.ctx))
+
+        first, second = Mock(), Mock()
+        results = await asyncio.gather(command(first), command(second))
+        self.assertEqual(results, [(first, first), (second, second)])
+
+        async def menu_button():
+            return (client.ctx, await self.executor.run(lambda: client.ctx))
+
+        # Tasks that never set it see none, not whichever was set last:
+        self.assertEqual(await asyncio.create_task(menu_button()), (None, None))
@@ -0,0 +1,71 @@
+"""Test inatcog against the stand-in iNat API server."""
+import asyncio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, Mock, patch
+
+from pyinaturalist.constants import API_V1
+
+from inatcog.api import INatAPI
+from inatcog.obs import match_obs_links
+from inatcog.tests.fake_inat import FakeINatServer
+from inatcog.transport import SharedSession
+
+
+class TestFakeINatServer(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeINatServer(rate_limit=(2, 0.2))
+        await self.server.start()
+        self.api = INatAPI(base_url=self.server.url)
+
+    async def asyncTearDown(self):
+        await self.api.close()
+        await self.server.stop()
+
+    async def test_get_places(self):
+        """Test places are looked up by id offline, and missing ones omitted."""
+        places = await self.api.get_places([1, 6712, 999])
+        self.assertEqual(sorted(places), [1, 6712])
+        self.assertEqual(self.server.requests, {"/v1/places/1,6712,999": 1})
+
+    async def test_rate_limited(self):
+        """Test requests throttled by the server are retried."""
+        users = await asyncio.gather(
+            *(self.api.get_users(user_id) for user_id in (1, 477, 545640))
+        )
+        self.assertEqual(
+            [user["results"][0]["login"] for user in users],
+            ["kueda", "loarie", "benarmstrong"],
+        )
+        self.assertEqual(self.api.request_stats.throttled, 1)
+
+    async def test_match_obs_links(self):
+        """Test all observations linked to are looked up in one request."""
+        content = " ".join(
+            f"https://www.inaturalist.org/observations/{obs_id}"
+            for obs_id in (100003, 999, 100001, 100003, 100002)
+        )
+        with patch("inatcog.obs.get_home", AsyncMock(return_value=1)):
+            observations = await match_obs_links(
+                Mock(api=self.api), None, content, max_links=3
+            )
+        self.assertEqual([obs.id for obs, _url in observations], [100003, 100001])
+        self.assertEqual(
+            self.server.requests, {"/v1/observations/100003,999,100001": 1}
+        )
+
+    async def test_client_session(self):
+        """Test the client's requests are sent to the server too."""
+        with TemporaryDirectory() as tmpdir:
+            session = SharedSession(
+                self.api,
+                asyncio.get_running_loop(),
+                cache_file=Path(tmpdir) / "api_requests.db",
+            )
+            response = await asyncio.to_thread(
+                session.get, f"{API_V1}/taxa/autocomplete", params={"q": "birds"}
+            )
+            session.close()
+        self.assertEqual(response.json()["total_results"], 4)
+        self.assertEqual(self.server.requests, {"/v1/taxa/autocomplete": 1})
@@ -0,0 +1,74 @@
+"""Test inatcog.limiter."""
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from inatcog.limiter import Priority, PriorityLimiter, use_priority
+
+
+class TestPriorityLimiter(IsolatedAsyncioTestCase):
+    async def test_interactive_jumps_queue(self):
+        """Test more urgent requests are served first when throttled."""
+        # i.e. 100 per second, all of them used up at the start
+        limiter = PriorityLimiter(max_rate=11, time_period=0.11)
+        for _ in range(11):
+            await limiter.acquire(Priority.INTERACTIVE)
+        served = []
+
+        async def request(priority):
+            with use_priority(priority):
+                async with limiter:
+                    served.append(priority)
+
+        tasks = [
+            asyncio.create_task(request(priority))
+            for priority in (Priority.BULK, Priority.LISTENER, Priority.INTERACTIVE)
+        ]
+        await asyncio.sleep(0)
+        self.assertEqual(limiter.queue_depth(Priority.BULK), 1)
+        await asyncio.gather(*tasks)
+        self.assertEqual(
+            served, [Priority.INTERACTIVE, Priority.LISTENER, Priority.BULK]
+        )
+        self.assertEqual(limiter.queue_depth(Priority.BULK), 0)
+        self.assertGreater(limiter.stats[Priority.BULK].max_wait, 0)
+
+    async def test_promoted_request_jumps_queue(self):
+        """Test a promoted task's requests are served as the more urgent class."""
+        # i.e. 100 per second, all of them used up at the start
+        limiter = PriorityLimiter(max_rate=11, time_period=0.11)
+        for _ in range(11):
+            await limiter.acquire(Priority.INTERACTIVE)
+        served = []
+
+        async def request(name, priority, count=1):
+            for _ in range(count):
+                async with limiter:
+                    served.append(name)
+
+        with use_priority(Priority.BULK):
+            bulk = asyncio.create_task(request("bulk", Priority.BULK, count=2))
+        with use_priority(Priority.LISTENER):
+            listener = asyncio.create_task(request("listener", Priority.LISTENER))
+        await asyncio.sleep(0)
+        limiter.promote(bulk, Priority.INTERACTIVE)
+        self.assertEqual(limiter.queue_depth(Priority.BULK), 0)
+        self.assertEqual(limiter.queue_depth(Priority.INTERACTIVE), 1)
+        # Promoting it again, or to a less urgent class, changes nothing:
+        limiter.promote(bulk, Priority.LISTENER)
+        self.assertEqual(limiter.queue_depth(Priority.INTERACTIVE), 1)
+        await asyncio.gather(bulk, listener)
+        # The bulk task's later request is made with its promoted priority:
+        self.assertEqual(served, ["bulk", "bulk", "listener"])
+        self.assertEqual(limiter.stats[Priority.BULK].acquired, 0)
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test a cancelled request is no longer counted as queued."""
+        limiter = PriorityLimiter(max_rate=1, time_period=60)
+        await limiter.acquire(Priority.INTERACTIVE)
+        task = asyncio.create_task(limiter.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        self.assertEqual(limiter.queue_depth(Priority.INTERACTIVE), 1)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(limiter.queue_depth(Priority.INTERACTIVE), 0)
@@ -0,0 +1,44 @@
+"""Test inatcog.listeners."""
+import re
+from unittest import TestCase
+
+from dronefly.core.parsers.url import PAT_OBS_LINK
+
+from inatcog.listeners import DOT_TAXON_PAT, MessageClass, classify_message
+
+MESSAGES = [
+    "",
+    "hi",
+    "Good morning, everyone.",
+    "...",
+    ".boom.",
+    "what is this? .birds. in my yard",
+    "Is this right? https://www.inaturalist.org/observations/12345",
+    "HTTPS://INATURALIST.CA/OBSERVATIONS/1",
+    "https://argentinat.org/observations/1 .ants.",
+    "https://www.inaturalist.org/taxa/47219",
+    "see inaturalist.org/observations/ for more",
+]
+
+
+class TestClassifyMessage(TestCase):
+    def test_no_false_negatives(self):
+        """Test every message the listeners would act on is a candidate."""
+        for content in MESSAGES:
+            message_class = classify_message(content)
+            if re.search(PAT_OBS_LINK, content):
+                self.assertIn(MessageClass.OBS_LINK, message_class, content)
+            if re.search(DOT_TAXON_PAT, content):
+                self.assertIn(MessageClass.DOT_TAXON, message_class, content)
+
+    def test_classes(self):
+        self.assertFalse(classify_message("Good morning"))
+        self.assertEqual(str(classify_message("Good morning")), "none")
+        self.assertEqual(
+            classify_message("https://inaturalist.ca/observations/12345"),
+            MessageClass.OBS_LINK,
+        )
+        self.assertEqual(
+            str(classify_message("https://argentinat.org/observations/1 .ants.")),
+            "obs_link+dot_taxon",
+        )
@@ -1,4 +1,5 @@
 """Test maps module."""
+import json
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import AsyncMock, MagicMock, patch
 from aiohttp import ClientSession
@@ -12,6 +13,8 @@ API_REQUESTS_PATCH = patch("aiohttp_retry.RetryClient.get")
 class ResponseMock:
     def __init__(self, expected_result):
         self.status = 200
+        self.headers = {}
+        self.content_type = "application/json"
         self.expected_result = expected_result
 
     async def __aenter__(self):
@@ -23,6 +26,9 @@ class ResponseMock:
     async def json(self):
         return self.expected_result
 
+    async def read(self):
+        return json.dumps(self.expected_result).encode()
+
 
 class AsyncSleep(MagicMock):
     async def __call__(self, *args, **kwargs):
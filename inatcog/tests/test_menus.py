@@ -0,0 +1,35 @@
+"""Test inatcog.menus.generic."""
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock
+
+from inatcog.budget import BudgetExceeded
+from inatcog.menus.generic import LazyEmbedListSource
+
+
+class TestLazyEmbedListSource(IsolatedAsyncioTestCase):
+    async def test_made_when_shown(self):
+        """Test each page is made only once, and only when shown."""
+        make_embed = AsyncMock(side_effect=lambda entry: f"embed {entry}")
+        source = LazyEmbedListSource(["a", "b", "c"], make_embed)
+        self.assertEqual(source.get_max_pages(), 3)
+        make_embed.assert_not_awaited()
+        self.assertEqual(await source.get_page(0), "embed a")
+        self.assertEqual(await source.get_page(0), "embed a")
+        make_embed.assert_awaited_once_with("a")
+        self.assertFalse(source.is_made(2))
+        self.assertEqual(await source.get_page(2), "embed c")
+        self.assertTrue(source.is_made(2))
+        self.assertEqual(make_embed.await_count, 2)
+
+    async def test_page_not_made(self):
+        """Test a page that can't be made is an apology, and made again later."""
+        make_embed = AsyncMock(
+            side_effect=[BudgetExceeded("stopped after 20 iNat API requests"), "b"]
+        )
+        source = LazyEmbedListSource(["a", "b"], make_embed)
+        embed = await source.get_page(1)
+        self.assertEqual(embed.title, "Sorry")
+        self.assertEqual(embed.description, "stopped after 20 iNat API requests")
+        self.assertFalse(source.is_made(1))
+        self.assertEqual(await source.get_page(1), "b")
+        self.assertTrue(source.is_made(1))
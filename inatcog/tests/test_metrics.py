@@ -0,0 +1,39 @@
+"""Test inatcog.metrics."""
+from unittest import TestCase
+from unittest.mock import patch
+
+from inatcog.metrics import RequestMetrics, get_endpoint
+
+
+class TestRequestMetrics(TestCase):
+    def test_get_endpoint(self):
+        """Test ids in urls are replaced to group requests by endpoint."""
+        self.assertEqual(
+            get_endpoint("https://api.inaturalist.org/v1/places/1,2,3?per_page=3"),
+            "/v1/places/{id}",
+        )
+        self.assertEqual(
+            get_endpoint("https://api.inaturalist.org/v1/observations/species_counts"),
+            "/v1/observations/species_counts",
+        )
+
+    def test_rolling_summary(self):
+        """Test metrics are summarized over recent slots only."""
+        metrics = RequestMetrics(slot_seconds=60, slots=3)
+        with patch("inatcog.metrics.monotonic", return_value=1000):
+            metrics.record_request("/v1/taxa", 200, 3.0)
+        with patch("inatcog.metrics.monotonic", return_value=1200):
+            for latency in (0.05, 0.2, 0.2, 0.7):
+                metrics.record_request("/v1/taxa", 200, latency, wait=0.5)
+            metrics.record_request("/v1/taxa", 429, 0.05)
+            metrics.record_cached("/v1/taxa")
+            metrics.record_retry("/v1/taxa")
+            taxa = metrics.summary(120)["/v1/taxa"]
+        self.assertEqual(taxa.statuses, {200: 4, 429: 1})
+        self.assertEqual(taxa.requests, 5)
+        self.assertAlmostEqual(taxa.hit_ratio, 1 / 6)
+        self.assertEqual(taxa.percentile(0.5), 0.25)
+        self.assertEqual(taxa.percentile(0.95), 0.7)
+        self.assertAlmostEqual(taxa.mean_wait, 0.4)
+        self.assertEqual(taxa.retries, 1)
+        self.assertEqual(metrics.summary()["/v1/taxa"].requests, 6)
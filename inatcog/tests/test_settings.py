@@ -0,0 +1,111 @@
+"""Test inatcog.settings."""
+import re
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, Mock
+
+from inatcog.settings import DM_LISTENER_CONFIG, ListenerSettings, get_bot_prefixes
+
+GUILD_DEFAULTS = {
+    "autoobs": False,
+    "autoobs_preview": False,
+    "dot_taxon": False,
+    "bot_prefixes": [],
+    "listen": True,
+    "home": 97394,
+}
+CHANNEL_DEFAULTS = {"autoobs": None, "autoobs_preview": None, "dot_taxon": None}
+
+
+def make_config():
+    config = Mock()
+    config.guild_from_id.return_value = Mock(defaults=GUILD_DEFAULTS)
+    config.channel_from_id.return_value = Mock(defaults=CHANNEL_DEFAULTS)
+    config.all_guilds = AsyncMock(
+        return_value={"1": dict(GUILD_DEFAULTS, autoobs=True, listen=None)}
+    )
+    config.all_channels = AsyncMock(
+        return_value={"10": dict(CHANNEL_DEFAULTS, autoobs=False, dot_taxon=True)}
+    )
+    config.guild.return_value = Mock(set_raw=AsyncMock(), clear_raw=AsyncMock())
+    config.channel.return_value = Mock(set_raw=AsyncMock())
+    return config
+
+
+class TestListenerSettings(IsolatedAsyncioTestCase):
+    async def test_get(self):
+        """Test channel settings override their guild's, unless inherited."""
+        settings = ListenerSettings(make_config())
+        await settings.load()
+        guild = Mock(id=1)
+        channel = settings.get(guild, Mock(id=10))
+        self.assertIs(channel.listen, None)
+        self.assertFalse(channel.autoobs)
+        self.assertTrue(channel.dot_taxon)
+        inherited = settings.get(guild, Mock(id=11))
+        self.assertTrue(inherited.autoobs)
+        self.assertFalse(inherited.dot_taxon)
+        default = settings.get(Mock(id=2), Mock(id=20))
+        self.assertTrue(default.listen)
+        self.assertFalse(default.autoobs)
+        self.assertIs(settings.get(None, Mock(id=30)), DM_LISTENER_CONFIG)
+
+    async def test_write_through(self):
+        """Test changed settings are both stored and seen without a reload."""
+        config = make_config()
+        settings = ListenerSettings(config)
+        await settings.load()
+        guild = Mock(id=2)
+        channel = Mock(id=20)
+        await settings.set_guild(guild, "bot_prefixes", "!?")
+        await settings.set_channel(channel, "autoobs", True)
+        config.guild(guild).set_raw.assert_awaited_with("bot_prefixes", value="!?")
+        config.channel(channel).set_raw.assert_awaited_with("autoobs", value=True)
+        self.assertEqual(settings.get(guild, channel).bot_prefixes, ("!", "?"))
+        self.assertTrue(settings.get(guild, channel).autoobs)
+        await settings.clear_guild(guild, "bot_prefixes")
+        config.guild(guild).clear_raw.assert_awaited_with("bot_prefixes")
+        self.assertEqual(settings.get(guild, channel).bot_prefixes, ())
+
+    async def test_set_preview_keeps_autoobs(self):
+        """Test setting a channel's preview override leaves its autoobs alone."""
+        config = make_config()
+        settings = ListenerSettings(config)
+        await settings.load()
+        guild = Mock(id=1)
+        channel = Mock(id=10)
+        await settings.set_channel(channel, "autoobs_preview", True)
+        config.channel(channel).set_raw.assert_awaited_once_with(
+            "autoobs_preview", value=True
+        )
+        # Still overridden to off, not inherited from the guild's on:
+        self.assertFalse(settings.get(guild, channel).autoobs)
+        self.assertTrue(settings.get(guild, channel).autoobs_preview)
+
+    async def test_preview_override_inherits_autoobs(self):
+        """Test a channel's preview override doesn't turn its autoobs off.
+
+        Before the snapshot, the listener took autoobs from the channel alone
+        whenever it had a preview override, i.e. off unless also overridden.
+        """
+        settings = ListenerSettings(make_config())
+        await settings.load()
+        guild = Mock(id=1)
+        channel = Mock(id=11)
+        await settings.set_channel(channel, "autoobs_preview", True)
+        # Inherited from the guild's on:
+        self.assertTrue(settings.get(guild, channel).autoobs)
+        self.assertTrue(settings.get(guild, channel).autoobs_preview)
+
+    def test_bot_prefixes(self):
+        """Test prefixes match as the regex they replace did."""
+        for prefixes in ("!?.", ["!", "$$", "&!"], "", []):
+            bot_prefixes = get_bot_prefixes(prefixes)
+            pattern = re.compile(
+                r"^({})".format("|".join(re.escape(prefix) for prefix in prefixes))
+            )
+            for content in ("!help", "$help", "$$help", "&!x", "&x", "hi", ""):
+                self.assertEqual(
+                    bool(bot_prefixes and content.startswith(bot_prefixes)),
+                    bool(prefixes and pattern.match(content)),
+                    (prefixes, content),
+                )
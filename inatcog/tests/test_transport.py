@@ -0,0 +1,62 @@
+"""Test inatcog.transport."""
+import asyncio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import ClientSession
+from requests import Request, Response
+
+from inatcog.api import INatAPI
+from inatcog.limiter import Priority, use_priority
+from inatcog.transport import SharedSession
+
+SESSION_PATCH = patch(
+    "aiohttp_retry.ClientSession", return_value=AsyncMock(ClientSession)
+)
+
+
+class TestSharedSession(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = TemporaryDirectory()
+        with SESSION_PATCH:
+            self.api = INatAPI()
+        self.session = SharedSession(
+            self.api,
+            asyncio.get_running_loop(),
+            cache_file=Path(self.tmpdir.name) / "api_requests.db",
+        )
+
+    async def asyncTearDown(self):
+        self.session.close()
+        await self.api.close()
+        self.tmpdir.cleanup()
+
+    async def test_shared_rate_budget(self):
+        """Test client requests in worker threads draw on INatAPI's limiter."""
+        with use_priority(Priority.BULK):
+            await asyncio.to_thread(self.session.limiter.acquire)
+        self.assertEqual(self.api.api_v1_limiter.stats[Priority.BULK].acquired, 1)
+
+    async def test_shared_rate_budget_timeout(self):
+        """Test client requests stop waiting for a token, and give up their place."""
+        self.api.api_v1_limiter.throttle(60)
+        with patch("inatcog.transport.CALL_TIMEOUT", 0.1):
+            with self.assertRaisesRegex(LookupError, "timed out"):
+                await asyncio.to_thread(self.session.limiter.acquire)
+        await asyncio.sleep(0)
+        self.assertEqual(self.api.api_v1_limiter.queue_depth(Priority.INTERACTIVE), 0)
+
+    async def test_shared_entities(self):
+        """Test entities fetched by the client are cached for INatAPI."""
+        response = Response()
+        response.status_code = 200
+        response._content = b'{"results": [{"id": 1, "name": "Earth"}]}'
+        response.request = Request(
+            "GET", "https://api.inaturalist.org/v1/places/1"
+        ).prepare()
+        await asyncio.to_thread(self.session._share_response, response)
+        await asyncio.sleep(0)
+        place = self.api.places_cache.peek(1)
+        self.assertEqual(place["results"][0]["name"], "Earth")
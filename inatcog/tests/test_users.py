@@ -1,3 +1,91 @@
 """Test inatcogs.users."""
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock
 
-# FIXME: add tests
+from inatcog.users import INatUserTable
+
+
+class TestUsers(IsolatedAsyncioTestCase):
+    async def test_get_member_pairs_as_users_load(self):
+        """Test members are yielded as the chunk with their user lands."""
+        users_cache = {}
+        chunks_landed = asyncio.Event()
+
+        async def bulk_load_users_from_observers(user_ids, on_progress):
+            # The first user's chunk lands, then the rest wait on the test:
+            users_cache[1] = {"results": [{"id": 1, "login": "user1"}]}
+            on_progress([{"id": 1}], [])
+            await chunks_landed.wait()
+            users_cache[2] = {"results": [{"id": 2, "login": "user2"}]}
+            on_progress([{"id": 2}], [])
+
+        async def get_users(user_id):
+            return users_cache[user_id]
+
+        cog = MagicMock()
+        cog.api.users_cache = users_cache
+        cog.api.bulk_load_users_from_observers = bulk_load_users_from_observers
+        cog.api.get_users = get_users
+        guild = MagicMock(id=1)
+        guild.get_member.side_effect = lambda discord_id: f"member{discord_id}"
+        users = {
+            discord_id: {"known_in": [1], "inat_user_id": discord_id}
+            for discord_id in (1, 2)
+        }
+        waits = []
+
+        async def on_wait():
+            waits.append(len(logins))
+            if logins:
+                chunks_landed.set()
+
+        logins = []
+        async for member, user in INatUserTable(cog).get_member_pairs(
+            guild, users, anywhere=False, on_wait=on_wait
+        ):
+            logins.append((member, user.login))
+        self.assertEqual(logins, [("member1", "user1"), ("member2", "user2")])
+        # The first member was yielded before the second user's chunk landed:
+        self.assertEqual(waits[-1], 1)
+
+    async def test_get_member_pairs_chunk_lands_during_wait(self):
+        """Test a chunk landing while on_wait is suspended isn't missed."""
+        users_cache = {}
+
+        async def bulk_load_users_from_observers(user_ids, on_progress):
+            for user_id, delay in ((1, 0.01), (2, 0.02)):
+                await asyncio.sleep(delay)
+                users_cache[user_id] = {
+                    "results": [{"id": user_id, "login": f"user{user_id}"}]
+                }
+                on_progress([{"id": user_id}], [])
+
+        async def get_users(user_id):
+            return users_cache[user_id]
+
+        cog = MagicMock()
+        cog.api.users_cache = users_cache
+        cog.api.bulk_load_users_from_observers = bulk_load_users_from_observers
+        cog.api.get_users = get_users
+        guild = MagicMock(id=1)
+        guild.get_member.side_effect = lambda discord_id: f"member{discord_id}"
+        users = {
+            discord_id: {"known_in": [1], "inat_user_id": discord_id}
+            for discord_id in (1, 2)
+        }
+
+        async def on_wait():
+            # Both chunks land, and the load finishes, during this wait:
+            await asyncio.sleep(0.05)
+
+        async def list_logins():
+            return [
+                (member, user.login)
+                async for member, user in INatUserTable(cog).get_member_pairs(
+                    guild, users, anywhere=False, on_wait=on_wait
+                )
+            ]
+
+        logins = await asyncio.wait_for(list_logins(), timeout=1)
+        self.assertEqual(logins, [("member1", "user1"), ("member2", "user2")])
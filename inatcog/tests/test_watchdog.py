@@ -0,0 +1,55 @@
+"""Test inatcog.watchdog."""
+import asyncio
+from time import sleep
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock
+
+from inatcog.watchdog import LoopWatchdog, Stall
+
+
+class TestLoopWatchdog(IsolatedAsyncioTestCase):
+    async def test_stall_attributed_to_command(self):
+        """Test a blocking command is caught in the act."""
+        watchdog = LoopWatchdog(
+            asyncio.get_running_loop(), interval=0.01, threshold=0.1
+        )
+        watchdog.start()
+
+        async def bonap(ctx):
+            sleep(0.3)
+
+        try:
+            await asyncio.sleep(0.05)
+            await bonap(Mock(command=Mock(qualified_name="taxon bonap")))
+            await asyncio.sleep(0.05)
+        finally:
+            watchdog.stop()
+        self.assertTrue(watchdog.stalls)
+        stall = watchdog.worst(1)[0]
+        self.assertEqual(stall.source, "command taxon bonap")
+        self.assertTrue(stall.ended)
+        self.assertGreaterEqual(stall.duration, 0.25)
+        self.assertIn("sleep(0.3)", "".join(stall.stack))
+        self.assertGreaterEqual(watchdog.stats.max_lag, 0.2)
+
+    async def test_worst_kept(self):
+        """Test a long stall is kept over many shorter ones after it."""
+        watchdog = LoopWatchdog(asyncio.get_running_loop(), history=3)
+        for duration in (5.0, 1.0, 2.0, 0.5, 3.0, 0.7):
+            watchdog._keep(Stall(0.0, "other code", [], duration=duration))
+        self.assertEqual(
+            [stall.duration for stall in watchdog.worst()], [5.0, 3.0, 2.0]
+        )
+
+    async def test_restart(self):
+        """Test stopping and starting again leaves a single watchdog thread."""
+        watchdog = LoopWatchdog(asyncio.get_running_loop(), interval=0.01)
+        watchdog.start()
+        first_thread = watchdog._thread
+        watchdog.stop()
+        watchdog.start()
+        try:
+            self.assertFalse(first_thread.is_alive())
+            self.assertTrue(watchdog._thread.is_alive())
+        finally:
+            watchdog.stop()
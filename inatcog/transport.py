@@ -0,0 +1,149 @@
+"""Module for the transport shared by INatAPI and the pyinaturalist client."""
+import asyncio
+import concurrent.futures
+from contextlib import contextmanager
+import logging
+import threading
+from time import monotonic
+from typing import Optional
+
+from dronefly.core.constants import CACHE_FILE
+from pyinaturalist import ClientSession
+from pyrate_limiter import MemoryListBucket
+from requests import PreparedRequest, Response
+
+from .api import API_BASE_URL, INatAPI, get_entity_name
+from .budget import get_budget
+from .executor import CALL_TIMEOUT
+from .limiter import Priority, PriorityLimiter, api_priority
+from .metrics import get_endpoint
+
+logger = logging.getLogger("red.dronefly." + __name__)
+
+
+class SharedLimiter:
+    """Rate limiter for the pyinaturalist session that draws on INatAPI's.
+
+    Provides only the part of pyrate_limiter's Limiter interface that the
+    session uses, so that requests the client sends from worker threads wait
+    their turn for the same tokens as INatAPI's requests on the event loop.
+    """
+
+    def __init__(self, limiter: PriorityLimiter, loop: asyncio.AbstractEventLoop):
+        self.limiter = limiter
+        self.loop = loop
+        # Seconds the calling thread last waited for a token, for metrics:
+        self.waited = threading.local()
+
+    def acquire(self, priority: Optional[Priority] = None):
+        """Wait for a token, blocking only the calling thread.
+
+        Raises BudgetExceeded if the request is over its budget, including
+        if its time runs out while waiting, or LookupError if it waits longer
+        than any call may.
+        """
+        budget = get_budget()
+        if budget:
+            budget.spend()
+        if priority is None:
+            priority = api_priority.get()
+        try:
+            on_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            on_loop = False
+        self.waited.seconds = 0.0
+        if on_loop:
+            # A synchronous call on the event loop can't wait for the loop to
+            # hand it a token without deadlocking, so it takes one regardless.
+            self.limiter.acquire_nowait(priority)
+            return
+        queued_at = monotonic()
+        future = asyncio.run_coroutine_threadsafe(
+            self.limiter.acquire(priority), self.loop
+        )
+        # Never wait past the budget, nor forever, e.g. for a loop that has
+        # stopped during a cog unload, which would hang the bot's exit:
+        timeout = budget.remaining() if budget else None
+        try:
+            future.result(CALL_TIMEOUT if timeout is None else timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            if budget:
+                budget.exceed("time")
+            raise LookupError("iNaturalist API request timed out")
+        self.waited.seconds = monotonic() - queued_at
+
+    @contextmanager
+    def ratelimit(self, *_identities, delay: bool = True, max_delay=None):
+        self.acquire()
+        yield
+
+
+class SharedSession(ClientSession):
+    """Session for the pyinaturalist client that shares INatAPI's resources.
+
+    - Requests draw from INatAPI's rate limiter, so both clients together
+      stay within one budget, and the client's requests are served by
+      priority along with INatAPI's.
+    - Throttled (429) responses back off the shared limiter for both.
+    - Places, projects, and users fetched by id are added to INatAPI's
+      entity caches, so that INatAPI doesn't fetch them again.
+    - Requests are recorded in INatAPI's metrics.
+    - Requests go to INatAPI's base url, e.g. that of a stand-in server.
+
+    Responses are still cached by requests-cache as well, as the client needs
+    whole responses, not just the entities in them.
+    """
+
+    def __init__(self, api: INatAPI, loop: asyncio.AbstractEventLoop, **kwargs):
+        self.api = api
+        self.loop = loop
+        super().__init__(
+            **{
+                "cache_file": CACHE_FILE,
+                # Only the refresh limiter uses these, and it needn't persist:
+                "bucket_class": MemoryListBucket,
+                "ratelimit_path": None,
+                "lock_path": None,
+                "limiter": SharedLimiter(api.api_v1_limiter, loop),
+                **kwargs,
+            }
+        )
+        self.hooks["response"].append(self._share_response)
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        if self.api.base_url != API_BASE_URL and request.url.startswith(API_BASE_URL):
+            # pyinaturalist's urls are fixed, so only here can they be changed.
+            request.url = request.url.replace(API_BASE_URL, self.api.base_url, 1)
+        self.limiter.waited.seconds = 0.0
+        response = super().send(request, **kwargs)
+        endpoint = get_endpoint(request.url)
+        if getattr(response, "from_cache", False):
+            self.loop.call_soon_threadsafe(self.api.metrics.record_cached, endpoint)
+        else:
+            self.loop.call_soon_threadsafe(
+                self.api.metrics.record_request,
+                endpoint,
+                response.status_code,
+                response.elapsed.total_seconds(),
+                self.limiter.waited.seconds,
+            )
+        return response
+
+    def _fill_bucket(self, request: PreparedRequest):
+        logger.warning("iNat client request throttled: %s", request.url)
+        self.loop.call_soon_threadsafe(self.api.api_v1_limiter.throttle)
+
+    def _share_response(self, response: Response, *args, **kwargs):
+        if getattr(response, "from_cache", False) or response.status_code != 200:
+            return response
+        if not get_entity_name(response.request.url):
+            return response
+        try:
+            json_data = response.json()
+        except ValueError:
+            return response
+        self.loop.call_soon_threadsafe(
+            self.api.cache_response, response.request.url, json_data
+        )
+        return response
@@ -1,6 +1,7 @@
 """Module to handle users."""
+import asyncio
 import re
-from typing import AsyncIterator, Tuple, Union
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple, Union
 
 import discord
 from pyinaturalist.models import User
@@ -46,23 +47,28 @@ class INatUserTable:
         users,
         anywhere: True,
         mock_users_without_observations=True,
+        on_wait: Optional[Callable[[], Awaitable[None]]] = None,
     ) -> AsyncIterator[Tuple[discord.Member, User]]:
         """
         yields:
             discord.Member, User
 
+        Members are yielded as soon as the users they're paired with are
+        loaded, so callers can start on them while the rest load.
+
         Parameters
         ----------
         users: dict
             discord_id -> inat_id mapping
+
+        on_wait: Callable[[], Awaitable[None]]
+            - Awaited whenever the next member waits on users still loading,
+              e.g. to show the members yielded so far.
         """
 
         known_users = []
         uncached_known_user_ids = []
         for discord_id in users:
-            user_json = None
-            inat_user = None
-
             discord_member = guild.get_member(discord_id)
             if guild.id in users[discord_id].get("known_in") or (
                 anywhere and users[discord_id].get("known_all")
@@ -76,36 +82,71 @@ class INatUserTable:
                         uncached_known_user_ids.append(inat_user_id)
                     known_users.append([discord_member or discord_id, inat_user_id])
 
-        if uncached_known_user_ids:
+        # Ids of uncached users whose chunk of the bulk load hasn't landed yet:
+        loading_user_ids = set(uncached_known_user_ids)
+        progress = asyncio.Event()
+
+        def on_progress(users, missing_user_ids):
+            loading_user_ids.difference_update(user["id"] for user in users)
+            loading_user_ids.difference_update(missing_user_ids)
+            progress.set()
+
+        async def load_users():
             try:
-                # cache all the remaining known users in one call
+                # cache all the remaining known users in as few calls as possible
                 await self.cog.api.bulk_load_users_from_observers(
-                    user_ids=uncached_known_user_ids
+                    user_ids=uncached_known_user_ids, on_progress=on_progress
                 )
             except LookupError:
                 pass
+            finally:
+                loading_user_ids.clear()
+                progress.set()
 
-        for (discord_member, inat_user_id) in known_users:
-            if (
-                inat_user_id not in self.cog.api.users_cache
-                and mock_users_without_observations
-            ):
-                # Optimize listing these users:
-                # - yield the registered user's user_id, but don't look up the
-                #   user as this can be quite costly when iterating over all of
-                #   them
-                inat_user = User(id=inat_user_id, login=str(inat_user_id))
-            else:
-                try:
-                    user_json = await self.cog.api.get_users(inat_user_id)
-                except LookupError:
-                    continue
-                if user_json:
-                    results = user_json["results"]
-                    if results:
-                        inat_user = User.from_json(results[0])
-            if inat_user:
-                yield (discord_member, inat_user)
+        loading = (
+            asyncio.ensure_future(load_users()) if uncached_known_user_ids else None
+        )
+        try:
+            for discord_member, inat_user_id in known_users:
+                # Wait only for the chunk this user is in, so that users from
+                # chunks that have landed are yielded while the rest load.
+                while inat_user_id in loading_user_ids:
+                    # Clear before awaiting anything, so a chunk landing while
+                    # on_wait runs still wakes the wait below.
+                    progress.clear()
+                    if on_wait:
+                        await on_wait()
+                    await progress.wait()
+                pair = await self._get_member_pair(
+                    discord_member, inat_user_id, mock_users_without_observations
+                )
+                if pair:
+                    yield pair
+        finally:
+            if loading and not loading.done():
+                loading.cancel()
+
+    async def _get_member_pair(
+        self, discord_member, inat_user_id, mock_users_without_observations
+    ) -> Optional[Tuple[discord.Member, User]]:
+        """Pair member with their iNat user, or None if the user isn't found."""
+        if (
+            inat_user_id not in self.cog.api.users_cache
+            and mock_users_without_observations
+        ):
+            # Optimize listing these users:
+            # - yield the registered user's user_id, but don't look up the
+            #   user as this can be quite costly when iterating over all of
+            #   them
+            return (discord_member, User(id=inat_user_id, login=str(inat_user_id)))
+        try:
+            user_json = await self.cog.api.get_users(inat_user_id)
+        except LookupError:
+            return None
+        results = user_json and user_json["results"]
+        if results:
+            return (discord_member, User.from_json(results[0]))
+        return None
 
 
 async def get_inat_user(ctx: Context, user: str):
@@ -0,0 +1,207 @@
+"""Module for detecting event loop stalls caused by blocking code."""
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import sys
+import threading
+import traceback
+from time import monotonic, time
+from types import FrameType
+from typing import List, Optional, Tuple
+
+from attrs import define
+
+logger = logging.getLogger("red.dronefly." + __name__)
+
+# Seconds between heartbeats from the event loop:
+HEARTBEAT_INTERVAL = 0.05
+# Seconds without a heartbeat after which the loop is considered stalled:
+STALL_THRESHOLD = 0.5
+# Longest stalls kept for owners to review:
+STALL_HISTORY = 20
+# Frames of the stalled stack kept, innermost last:
+STACK_LIMIT = 15
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@define
+class Stall:
+    """A period the event loop was blocked, and the code blocking it."""
+
+    # Wall-clock time the stall was detected:
+    detected_at: float
+    # Code that was running, e.g. "command taxon bonap":
+    source: str
+    # Formatted frames of the loop thread's stack when it was detected:
+    stack: List[str]
+    # Seconds the loop was blocked, updated until the stall ends:
+    duration: float = 0.0
+    ended: bool = False
+
+
+@define
+class LagStats:
+    """Event loop lag, measured by heartbeats arriving late."""
+
+    heartbeats: int = 0
+    total_lag: float = 0.0
+    max_lag: float = 0.0
+    stalls: int = 0
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.heartbeats if self.heartbeats else 0.0
+
+
+def _is_package_frame(frame: FrameType) -> bool:
+    filename = os.path.abspath(frame.f_code.co_filename)
+    return filename.startswith(PACKAGE_DIR + os.sep)
+
+
+def get_stall_source(frame: Optional[FrameType]) -> str:
+    """Describe the cog's command or listener running in the stack, if any."""
+    source = None
+    while frame:
+        if _is_package_frame(frame):
+            ctx = frame.f_locals.get("ctx")
+            command = getattr(ctx, "command", None)
+            if command is not None:
+                # Don't look further, as an outer command may have invoked it.
+                return f"command {command.qualified_name}"
+            # The outermost of the cog's functions is the command or listener.
+            name = frame.f_code.co_name
+            kind = "listener" if name.startswith("on_") else "function"
+            source = f"{kind} {name}"
+        frame = frame.f_back
+    return source or "other code"
+
+
+class LoopWatchdog:
+    """Detect when blocking code stalls the event loop.
+
+    A task on the loop sends a heartbeat every `interval` seconds, recording
+    how late each one arrives as the loop's lag. Meanwhile, a watchdog thread
+    checks for heartbeats. If none has arrived within `threshold` seconds, it
+    captures the stack of the loop thread, which is then still running the
+    blocking code, and attributes it to the cog's command or listener in it.
+
+    The longest `history` stalls are kept once they end, and `worst()` ranks
+    them, so that a long stall isn't pushed out by many short ones after it.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        interval: float = HEARTBEAT_INTERVAL,
+        threshold: float = STALL_THRESHOLD,
+        history: int = STALL_HISTORY,
+    ):
+        self.loop = loop
+        self.interval = interval
+        self.threshold = threshold
+        self.stats = LagStats()
+        self.history = history
+        # Min-heap of (duration, sequence, stall) of the longest stalls ended,
+        # so the shortest kept is the one replaced by a longer one:
+        self.stalls: List[Tuple[float, int, Stall]] = []
+        self._sequence = itertools.count()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = monotonic()
+        self._stall: Optional[Stall] = None
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None
+
+    def start(self):
+        """Start watching the loop; must be called from the loop."""
+        if self.running:
+            return
+        if self._thread and self._thread.is_alive():
+            # Let the thread of a previous start exit before it can see the
+            # stop signal cleared, or two would be left watching.
+            self._thread.join()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = monotonic()
+        self._stopping.clear()
+        self._heartbeat_task = self.loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="inat-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching the loop."""
+        if not self.running:
+            return
+        self._stopping.set()
+        self._heartbeat_task.cancel()
+        self._heartbeat_task = None
+        if self._stall:
+            self._keep(self._stall)
+            self._stall = None
+
+    def worst(self, count: Optional[int] = None) -> List[Stall]:
+        """Return the stalls kept, longest first."""
+        stalls = [stall for _duration, _sequence, stall in sorted(self.stalls)]
+        stalls.reverse()
+        return stalls[:count] if count else stalls
+
+    def _keep(self, stall: Stall):
+        item = (stall.duration, next(self._sequence), stall)
+        if len(self.stalls) < self.history:
+            heapq.heappush(self.stalls, item)
+        else:
+            heapq.heappushpop(self.stalls, item)
+
+    async def _heartbeat(self):
+        while True:
+            expected = monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = monotonic()
+            lag = max(now - expected, 0.0)
+            self.stats.heartbeats += 1
+            self.stats.total_lag += lag
+            self.stats.max_lag = max(self.stats.max_lag, lag)
+            stall = self._stall
+            if stall:
+                stall.duration = now - self._last_beat
+                stall.ended = True
+                self._stall = None
+                self._keep(stall)
+                logger.warning(
+                    "Event loop blocked for %.2fs by %s", stall.duration, stall.source
+                )
+            self._last_beat = now
+
+    def _watch(self):
+        while not self._stopping.wait(self.interval):
+            blocked = monotonic() - self._last_beat
+            stall = self._stall
+            if stall:
+                stall.duration = max(stall.duration, blocked)
+            elif blocked >= self.threshold:
+                self._capture(blocked)
+
+    def _capture(self, blocked: float):
+        last_beat = self._last_beat
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        try:
+            source = get_stall_source(frame)
+            stack = traceback.format_stack(frame, limit=STACK_LIMIT)
+        finally:
+            del frame
+        if self._last_beat != last_beat:
+            # The loop caught up meanwhile, so the stack is of other code.
+            return
+        stall = Stall(detected_at=time(), source=source, stack=stack, duration=blocked)
+        self.stats.stalls += 1
+        self._stall = stall